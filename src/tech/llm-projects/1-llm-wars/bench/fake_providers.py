@@ -0,0 +1,249 @@
+"""
+Fake Providers - Local stand-ins for the OpenAI, Anthropic and xAI APIs
+
+One server answers all three under path prefixes, so each provider can get
+its own latency and error profile:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8900/openai/v1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8900/anthropic
+    GROK_BASE_URL=http://127.0.0.1:8900/xai/v1
+
+Run with: python -m bench.fake_providers --port 8900 --latency-ms 400
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import NamedTuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+PROVIDERS = ("openai", "anthropic", "xai")
+
+REPLY_WORDS = (
+    "honestly that take is bold but the evidence points the other way and I will die on this hill "
+    "because every great debate needs someone willing to say the quiet part out loud"
+).split()
+
+
+class StubBehaviour(NamedTuple):
+    """Latency and failure profile of one fake provider"""
+
+    latency_ms: float = 400.0  # median time to first token (lognormal)
+    latency_sigma: float = 0.5  # lognormal shape; 0 = fixed latency
+    token_delay_ms: float = 15.0  # gap between streamed chunks
+    reply_words: int = 40
+    error_rate: float = 0.0  # share of requests answered with a 5xx
+    rate_limit_rate: float = 0.0  # share answered with 429 + Retry-After
+
+    def sample_latency(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency_sigma <= 0:
+            return self.latency_ms / 1000
+        return random.lognormvariate(math.log(self.latency_ms), self.latency_sigma) / 1000
+
+
+def _reply(words: int) -> list[str]:
+    start = random.randrange(len(REPLY_WORDS))
+    return [REPLY_WORDS[(start + i) % len(REPLY_WORDS)] + " " for i in range(words)]
+
+
+def _prompt_tokens(body: dict) -> int:
+    """Rough input size, close enough for usage accounting"""
+    return len(json.dumps(body.get("messages", []))) // 4 + len(str(body.get("system", ""))) // 4
+
+
+def _sse(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _failure(behaviour: StubBehaviour, provider: str) -> JSONResponse | None:
+    """Injected 429/5xx, in each API's error envelope"""
+    roll = random.random()
+    if roll < behaviour.rate_limit_rate:
+        status, kind, message = 429, "rate_limit_error", "Rate limit reached (stub)"
+        headers = {"retry-after-ms": "200"}
+    elif roll < behaviour.rate_limit_rate + behaviour.error_rate:
+        status, kind, message = (529, "overloaded_error", "Overloaded (stub)") if provider == "anthropic" else (
+            500, "server_error", "Internal error (stub)"
+        )
+        headers = {}
+    else:
+        return None
+    if provider == "anthropic":
+        body = {"type": "error", "error": {"type": kind, "message": message}}
+    else:
+        body = {"error": {"message": message, "type": kind, "code": None, "param": None}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def create_app(behaviours: dict[str, StubBehaviour] | None = None) -> FastAPI:
+    """Stub app; `behaviours` maps "openai"/"anthropic"/"xai" to a profile (default StubBehaviour())"""
+    behaviours = behaviours or {}
+    app = FastAPI(title="LLM Wars fake providers")
+    app.state.requests = {provider: 0 for provider in PROVIDERS}
+
+    def behaviour_for(provider: str) -> StubBehaviour:
+        app.state.requests[provider] += 1
+        return behaviours.get(provider, StubBehaviour())
+
+    @app.get("/{provider}/v1/models")
+    async def list_models(provider: str) -> dict:
+        # Union of the OpenAI and Anthropic list shapes; each SDK ignores the other's fields
+        return {
+            "object": "list",
+            "data": [{"id": "stub-model", "object": "model", "type": "model", "created": 0, "owned_by": provider,
+                      "display_name": "Stub", "created_at": "2025-01-01T00:00:00Z"}],
+            "has_more": False,
+            "first_id": "stub-model",
+            "last_id": "stub-model",
+        }
+
+    @app.post("/{provider}/v1/chat/completions")
+    async def chat_completions(provider: str, request: Request):
+        behaviour = behaviour_for(provider)
+        body = await request.json()
+        if failure := _failure(behaviour, provider):
+            return failure
+        await asyncio.sleep(behaviour.sample_latency())
+
+        words = _reply(behaviour.reply_words)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        usage = {
+            "prompt_tokens": _prompt_tokens(body),
+            "completion_tokens": len(words),
+            "total_tokens": _prompt_tokens(body) + len(words),
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+        base = {"id": completion_id, "created": int(time.time()), "model": body.get("model", "stub-model")}
+
+        if not body.get("stream"):
+            return {
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(words)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }
+
+        async def chunks():
+            chunk = {**base, "object": "chat.completion.chunk"}
+            for word in words:
+                yield _sse({**chunk, "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]})
+                await asyncio.sleep(behaviour.token_delay_ms / 1000)
+            yield _sse({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield _sse({**chunk, "choices": [], "usage": usage})
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    @app.post("/{provider}/v1/messages")
+    async def messages(provider: str, request: Request):
+        behaviour = behaviour_for(provider)
+        body = await request.json()
+        if failure := _failure(behaviour, provider):
+            return failure
+        await asyncio.sleep(behaviour.sample_latency())
+
+        words = _reply(behaviour.reply_words)
+        usage = {
+            "input_tokens": _prompt_tokens(body),
+            "output_tokens": len(words),
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+        }
+        message = {
+            "id": f"msg_{uuid.uuid4().hex[:12]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub-model"),
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+        }
+
+        if not body.get("stream"):
+            return {**message, "content": [{"type": "text", "text": "".join(words)}], "usage": usage}
+
+        async def events():
+            yield _sse({"type": "message_start", "message": {
+                **message, "content": [], "stop_reason": None, "usage": {**usage, "output_tokens": 0},
+            }}, "message_start")
+            yield _sse({"type": "content_block_start", "index": 0,
+                        "content_block": {"type": "text", "text": ""}}, "content_block_start")
+            for word in words:
+                yield _sse({"type": "content_block_delta", "index": 0,
+                            "delta": {"type": "text_delta", "text": word}}, "content_block_delta")
+                await asyncio.sleep(behaviour.token_delay_ms / 1000)
+            yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+            yield _sse({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                        "usage": {"output_tokens": len(words)}}, "message_delta")
+            yield _sse({"type": "message_stop"}, "message_stop")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats() -> dict:
+        return {"requests": app.state.requests}
+
+    return app
+
+
+def add_behaviour_arguments(parser: argparse.ArgumentParser) -> None:
+    """Stub profile flags, shared with the load test"""
+    defaults = StubBehaviour()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="median time to first token")
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma, help="lognormal sigma")
+    parser.add_argument("--token-delay-ms", type=float, default=defaults.token_delay_ms)
+    parser.add_argument("--reply-words", type=int, default=defaults.reply_words)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate)
+    parser.add_argument(
+        "--provider-latency-ms",
+        action="append",
+        default=[],
+        metavar="PROVIDER=MS",
+        help="override the median latency for one of openai/anthropic/xai (repeatable)",
+    )
+
+
+def behaviours_from_args(args: argparse.Namespace) -> dict[str, StubBehaviour]:
+    base = StubBehaviour(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        token_delay_ms=args.token_delay_ms,
+        reply_words=args.reply_words,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+    behaviours = {provider: base for provider in PROVIDERS}
+    for override in args.provider_latency_ms:
+        provider, _, value = override.partition("=")
+        if provider not in PROVIDERS:
+            raise SystemExit(f"Unknown provider {provider!r} (expected one of {', '.join(PROVIDERS)})")
+        behaviours[provider] = base._replace(latency_ms=float(value))
+    return behaviours
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(behaviours_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Load Test - Offline end-to-end benchmark of the battle API
+
+Starts the fake providers and the API (uvicorn, SQLite in a temp dir) as
+subprocesses, then runs battles at a fixed concurrency: create, stream or
+run, vote, read votes. Reports battles/sec, p50/p95/p99 per endpoint and
+the API's event-loop lag (sampled from /metrics). No real provider is called.
+
+Run from the project root:
+    python -m bench.load --battles 200 --concurrency 20
+    python -m bench.load --app-url http://127.0.0.1:8000   # against a running API
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from .fake_providers import add_behaviour_arguments
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ENDPOINTS = ("create", "stream", "stream_first_event", "run", "vote", "votes")
+VOTE_CHOICES = ("openai", "claude", "grok")
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100); 0.0 for no samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class LoadResults:
+    """Latencies and errors per endpoint, plus event-loop lag samples"""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.loop_lag: list[float] = []
+        self.battles_completed = 0
+        self.elapsed = 0.0
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True) -> None:
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def summary(self) -> dict:
+        return {
+            "battles_completed": self.battles_completed,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "battles_per_second": round(self.battles_completed / self.elapsed, 3) if self.elapsed else 0.0,
+            "endpoints": {
+                endpoint: {
+                    "count": len(samples),
+                    "errors": self.errors[endpoint],
+                    **{f"p{q}_ms": round(percentile(samples, q) * 1000, 1) for q in (50, 95, 99)},
+                }
+                for endpoint in ENDPOINTS
+                if (samples := self.latencies.get(endpoint))
+            },
+            "event_loop_lag_ms": {
+                "samples": len(self.loop_lag),
+                **{f"p{q}": round(percentile(self.loop_lag, q) * 1000, 1) for q in (50, 99)},
+                "max": round(max(self.loop_lag, default=0.0) * 1000, 1),
+            },
+        }
+
+
+def format_report(summary: dict) -> str:
+    lines = [
+        f"Battles: {summary['battles_completed']} in {summary['elapsed_seconds']}s "
+        f"({summary['battles_per_second']} battles/sec)",
+        "",
+        f"{'endpoint':<20}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    for endpoint, stats in summary["endpoints"].items():
+        lines.append(
+            f"{endpoint:<20}{stats['count']:>7}{stats['errors']:>8}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+    lag = summary["event_loop_lag_ms"]
+    lines += ["", f"Event-loop lag: p50 {lag['p50']} ms, p99 {lag['p99']} ms, max {lag['max']} ms ({lag['samples']} samples)"]
+    return "\n".join(lines)
+
+
+def battle_request(rounds: int, cache_mode: str) -> dict:
+    return {
+        "topic": "Is a hot dog a sandwich?",
+        "rounds": rounds,
+        "cache_mode": cache_mode,
+        "llms": [
+            {"provider": "openai", "persona": "Mischievous troublemaker"},
+            {"provider": "claude", "persona": "Polite peacemaker"},
+            {"provider": "grok", "persona": "Chaotic wildcard"},
+        ],
+    }
+
+
+async def _timed(results: LoadResults, endpoint: str, call) -> httpx.Response | None:
+    start = time.perf_counter()
+    try:
+        response = await call()
+    except httpx.HTTPError as e:
+        results.record(endpoint, time.perf_counter() - start, ok=False)
+        print(f"⚠️  {endpoint} failed: {e!r}")
+        return None
+    results.record(endpoint, time.perf_counter() - start, ok=response.is_success)
+    return response
+
+
+async def _stream(client: httpx.AsyncClient, results: LoadResults, battle_id: str, tokens: bool) -> bool:
+    """Consume the SSE stream to completion; the first event's latency is recorded separately"""
+    start = time.perf_counter()
+    ok = False
+    first_event = True
+    try:
+        async with client.stream("GET", f"/api/battle/{battle_id}/stream", params={"pace": 0, "tokens": tokens}) as response:
+            if response.is_success:
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    if first_event:
+                        results.record("stream_first_event", time.perf_counter() - start)
+                        first_event = False
+                    event_type = json.loads(line[len("data: "):]).get("type")
+                    if event_type == "complete":
+                        ok = True
+                    elif event_type == "error":
+                        break
+    except httpx.HTTPError as e:
+        print(f"⚠️  stream failed: {e!r}")
+    results.record("stream", time.perf_counter() - start, ok=ok)
+    return ok
+
+
+async def run_battle(
+    client: httpx.AsyncClient, results: LoadResults, mode: str, rounds: int, tokens: bool, cache_mode: str,
+) -> None:
+    response = await _timed(results, "create", lambda: client.post("/api/battle/", json=battle_request(rounds, cache_mode)))
+    if response is None or not response.is_success:
+        return
+    battle_id = response.json()["id"]
+
+    if mode == "stream":
+        ok = await _stream(client, results, battle_id, tokens)
+    else:
+        response = await _timed(results, "run", lambda: client.post(f"/api/battle/{battle_id}/run"))
+        ok = response is not None and response.is_success and response.json()["status"] == "completed"
+    if not ok:
+        return
+
+    vote = {"provider": VOTE_CHOICES[results.battles_completed % len(VOTE_CHOICES)]}
+    await _timed(results, "vote", lambda: client.post(f"/api/battle/{battle_id}/vote", json=vote))
+    await _timed(results, "votes", lambda: client.get(f"/api/battle/{battle_id}/votes"))
+    results.battles_completed += 1
+
+
+async def sample_loop_lag(client: httpx.AsyncClient, results: LoadResults, interval: float = 0.5) -> None:
+    """Poll the API's event_loop_lag_seconds gauge"""
+    while True:
+        try:
+            response = await client.get("/metrics")
+            for line in response.text.splitlines():
+                if line.startswith("event_loop_lag_seconds "):
+                    results.loop_lag.append(float(line.split()[1]))
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+
+
+async def run_load(
+    app_url: str,
+    battles: int,
+    concurrency: int,
+    mode: str = "mixed",
+    rounds: int = 2,
+    tokens: bool = False,
+    cache_mode: str = "fresh",
+) -> LoadResults:
+    """Run `battles` battles with `concurrency` in flight; mode is stream, run or mixed (alternating)"""
+    results = LoadResults()
+    modes = itertools.cycle(("stream", "run") if mode == "mixed" else (mode,))
+    remaining = iter(range(battles))
+    timeout = httpx.Timeout(300.0, connect=10.0)
+    limits = httpx.Limits(max_connections=concurrency + 2)
+
+    async with httpx.AsyncClient(base_url=app_url, timeout=timeout, limits=limits) as client:
+        async def worker() -> None:
+            for _ in remaining:
+                await run_battle(client, results, next(modes), rounds, tokens, cache_mode)
+
+        lag_task = asyncio.create_task(sample_loop_lag(client, results))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        results.elapsed = time.perf_counter() - start
+        lag_task.cancel()
+    return results
+
+
+def _stub_command(args: argparse.Namespace) -> list[str]:
+    command = [
+        sys.executable, "-m", "bench.fake_providers",
+        "--port", str(args.stub_port),
+        "--latency-ms", str(args.latency_ms),
+        "--latency-sigma", str(args.latency_sigma),
+        "--token-delay-ms", str(args.token_delay_ms),
+        "--reply-words", str(args.reply_words),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate),
+    ]
+    for override in args.provider_latency_ms:
+        command += ["--provider-latency-ms", override]
+    return command
+
+
+def _app_env(args: argparse.Namespace, workdir: Path) -> dict[str, str]:
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "stub-openai-key",
+        "ANTHROPIC_API_KEY": "stub-anthropic-key",
+        "GROK_API_KEY": "stub-grok-key",
+        "OPENAI_BASE_URL": f"{stub_url}/openai/v1",
+        "ANTHROPIC_BASE_URL": f"{stub_url}/anthropic",
+        "GROK_BASE_URL": f"{stub_url}/xai/v1",
+        "DATABASE_URL": args.database_url or f"sqlite+aiosqlite:///{workdir / 'bench.db'}",
+        "GALILEO_API_KEY": "",
+        "STREAM_PACE_SECONDS": "0",
+        "SURPRISE_POOL_SIZE": "0",
+        "RESPONSE_CACHE_DISK_MAX_MB": "0",
+    }
+    if not args.keep_rate_limits:
+        # Measure the API, not the account quotas it is configured for
+        for provider in ("openai", "claude", "grok"):
+            env[f"{provider.upper()}_REQUESTS_PER_MINUTE"] = "0"
+            env[f"{provider.upper()}_TOKENS_PER_MINUTE"] = "0"
+            env[f"{provider.upper()}_MAX_CONCURRENCY"] = str(max(args.concurrency * 3, 10))
+    return env
+
+
+async def _wait_ready(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode}")
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    processes: list[subprocess.Popen] = []
+    with tempfile.TemporaryDirectory(prefix="llm-wars-bench-") as tmp:
+        workdir = Path(tmp)
+        try:
+            app_url = args.app_url
+            if not app_url:
+                log = open(workdir / "app.log", "w")
+                stub = subprocess.Popen(_stub_command(args), cwd=PROJECT_ROOT)
+                processes.append(stub)
+                await _wait_ready(f"http://127.0.0.1:{args.stub_port}/stats", stub)
+
+                app = subprocess.Popen(
+                    [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(args.app_port), "--log-level", "warning"],
+                    cwd=PROJECT_ROOT,
+                    env=_app_env(args, workdir),
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                )
+                processes.append(app)
+                app_url = f"http://127.0.0.1:{args.app_port}"
+                await _wait_ready(f"{app_url}/health", app)
+
+            print(f"🏁 {args.battles} battles ({args.mode}, {args.rounds} rounds) at concurrency {args.concurrency}")
+            results = await run_load(
+                app_url, args.battles, args.concurrency, args.mode, args.rounds, args.tokens, args.cache_mode,
+            )
+            return results.summary()
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                process.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--battles", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--mode", choices=("stream", "run", "mixed"), default="mixed")
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--tokens", action="store_true", help="stream token deltas (?tokens=true)")
+    parser.add_argument("--cache-mode", choices=("fresh", "cached"), default="fresh")
+    parser.add_argument("--app-url", help="benchmark an already running API instead of starting one")
+    parser.add_argument("--app-port", type=int, default=8901)
+    parser.add_argument("--stub-port", type=int, default=8900)
+    parser.add_argument("--database-url", help="default: SQLite in a temp dir")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="keep the configured provider rate limits")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    print(json.dumps(summary, indent=2) if args.json else format_report(summary))
+
+
+if __name__ == "__main__":
+    main()
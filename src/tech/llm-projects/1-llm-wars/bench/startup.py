@@ -0,0 +1,156 @@
+"""
+Startup - Cold start benchmark with a budget
+
+Measures what a fresh Render/Railway instance pays before it can serve:
+`python -X importtime -c "import src.main"` (total and heaviest
+dependencies) and the time from launching uvicorn to the first 200 from /health.
+Exits with status 1 when either is over budget, so it can gate CI.
+
+Run from the project root:
+    python -m bench.startup
+    python -m bench.startup --import-budget-ms 1500 --health-budget-ms 3000 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from .load import PROJECT_ROOT
+
+# No real provider or tracing backend is contacted while measuring
+OFFLINE_ENV = {
+    "OPENAI_API_KEY": "startup-bench",
+    "ANTHROPIC_API_KEY": "startup-bench",
+    "GROK_API_KEY": "startup-bench",
+    "OPENAI_BASE_URL": "http://127.0.0.1:9/v1",
+    "ANTHROPIC_BASE_URL": "http://127.0.0.1:9",
+    "GROK_BASE_URL": "http://127.0.0.1:9/v1",
+    "GALILEO_API_KEY": "",
+    "DATABASE_URL": "",
+    "SURPRISE_POOL_SIZE": "0",
+}
+
+
+def parse_importtime(output: str) -> list[tuple[str, int, int]]:
+    """(module, depth, cumulative µs) for each line of -X importtime output"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), depth, int(cumulative)))
+    return modules
+
+
+def heaviest_imports(
+    modules: list[tuple[str, int, int]], exclude: str = "src", limit: int = 8
+) -> list[tuple[str, float]]:
+    """Packages (other than `exclude`) by the cumulative time of their costliest import, in ms"""
+    totals: dict[str, int] = {}
+    for name, _, cumulative in modules:
+        package = name.split(".")[0]
+        if package != exclude:
+            totals[package] = max(totals.get(package, 0), cumulative)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [(package, cumulative / 1000) for package, cumulative in ranked[:limit]]
+
+
+def measure_imports(module: str, env: dict[str, str]) -> tuple[float, list[tuple[str, float]]]:
+    """Cumulative import time of `module` in a fresh interpreter, in ms, and its heaviest imports"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    modules = parse_importtime(result.stderr)
+    total = next(cumulative for name, _, cumulative in reversed(modules) if name == module)
+    return total / 1000, heaviest_imports(modules, exclude=module.split(".")[0])
+
+
+async def measure_health(port: int, env: dict[str, str], timeout: float = 60.0) -> float:
+    """Seconds from launching uvicorn to the first successful GET /health"""
+    start = time.perf_counter()
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        async with httpx.AsyncClient(timeout=1.0) as client:
+            while time.perf_counter() - start < timeout:
+                if app.poll() is not None:
+                    raise RuntimeError(f"API exited with code {app.returncode} before /health answered")
+                try:
+                    if (await client.get(f"http://127.0.0.1:{port}/health")).status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.02)
+        raise RuntimeError(f"/health did not answer within {timeout}s")
+    finally:
+        app.terminate()
+        app.wait(timeout=10)
+
+
+def run(args: argparse.Namespace) -> dict:
+    env = {**os.environ, **OFFLINE_ENV}
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+
+    import_runs = [measure_imports(args.module, env) for _ in range(args.runs)]
+    health_runs = [asyncio.run(measure_health(args.port, env)) * 1000 for _ in range(args.runs)]
+    import_ms = statistics.median(total for total, _ in import_runs)
+    health_ms = statistics.median(health_runs)
+    return {
+        "module": args.module,
+        "import_ms": round(import_ms, 1),
+        "import_budget_ms": args.import_budget_ms,
+        "heaviest_imports": [(package, round(ms, 1)) for package, ms in import_runs[-1][1]],
+        "health_ms": round(health_ms, 1),
+        "health_budget_ms": args.health_budget_ms,
+        "over_budget": import_ms > args.import_budget_ms or health_ms > args.health_budget_ms,
+    }
+
+
+def format_report(summary: dict) -> str:
+    def verdict(value: float, budget: float) -> str:
+        return "✅" if value <= budget else "❌ over budget"
+
+    lines = [
+        f"{'import ' + summary['module']:<17} {summary['import_ms']:>8.1f} ms  (budget {summary['import_budget_ms']} ms) "
+        f"{verdict(summary['import_ms'], summary['import_budget_ms'])}",
+        f"first /health     {summary['health_ms']:>8.1f} ms  (budget {summary['health_budget_ms']} ms) "
+        f"{verdict(summary['health_ms'], summary['health_budget_ms'])}",
+        "",
+        "heaviest imports:",
+    ]
+    lines += [f"  {package:<20} {ms:>8.1f} ms" for package, ms in summary["heaviest_imports"]]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--runs", type=int, default=3, help="report the median of N cold starts")
+    parser.add_argument("--import-budget-ms", type=float, default=2000)
+    parser.add_argument("--health-budget-ms", type=float, default=4000)
+    parser.add_argument("--port", type=int, default=8902)
+    parser.add_argument("--database-url", help="default: no database")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    summary = run(args)
+    print(json.dumps(summary, indent=2) if args.json else format_report(summary))
+    sys.exit(1 if summary["over_budget"] else 0)
+
+
+if __name__ == "__main__":
+    main()
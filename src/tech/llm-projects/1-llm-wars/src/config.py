@@ -18,10 +18,100 @@ class Settings(BaseSettings):
   openai_api_key: str = ""
   anthropic_api_key: str = ""
   grok_api_key: str = ""
+  # Provider API endpoints (blank = SDK default); point these at bench/fake_providers.py to load-test
+  openai_base_url: str = ""
+  anthropic_base_url: str = ""
+  grok_base_url: str = "https://api.x.ai/v1"
   database_url: str = ""  # Automatically reads from DATABASE_URL env var (case-insensitive)
+  # Request pool per worker; the postgres state backend opens one more connection, outside it, to LISTEN
+  db_pool_size: int = 5
+  db_max_overflow: int = 10
+  db_pool_timeout: float = 30
+  db_pool_recycle: int = 1800
+  # Votes are group-committed every N ms or M votes, whichever comes first
+  vote_flush_interval_ms: int = 50
+  vote_flush_max_batch: int = 100
+  # In-memory battle cache (IN_PROGRESS battles are never evicted)
+  battle_store_max_size: int = 1000
+  battle_store_ttl_seconds: float = 3600
+  # Claims and live battle events across API workers: memory (single worker), postgres
+  # (LISTEN/NOTIFY) or auto (postgres whenever DATABASE_URL is PostgreSQL)
+  state_backend: str = "auto"
   environment: str = "development"
   # Optional: set to enable Galileo tracing (project "LLM-Wars", log stream "default")
   galileo_api_key: str = ""
+  # Traces are queued (oldest dropped when full) and exported in batches in the background;
+  # sampling is per battle
+  trace_sample_rate: float = 1.0
+  trace_queue_size: int = 1000
+  trace_batch_size: int = 50
+  trace_flush_interval_seconds: float = 2.0
+  # Connection pool per LLM provider (one shared httpx transport each)
+  provider_max_connections: int = 50
+  provider_max_keepalive_connections: int = 20
+  # Per-provider rate limits (0 = unlimited); set to your account's quota tier
+  openai_requests_per_minute: int = 500
+  openai_tokens_per_minute: int = 30000
+  openai_max_concurrency: int = 10
+  claude_requests_per_minute: int = 50
+  claude_tokens_per_minute: int = 30000
+  claude_max_concurrency: int = 10
+  grok_requests_per_minute: int = 60
+  grok_tokens_per_minute: int = 100000
+  grok_max_concurrency: int = 10
+  # Requests queue FIFO per provider; beyond this depth they are rejected
+  provider_max_queue_depth: int = 200
+  # 429/5xx/connection errors are retried with exponential backoff (or Retry-After)
+  provider_max_retries: int = 4
+  provider_backoff_base_seconds: float = 0.5
+  provider_backoff_max_seconds: float = 30.0
+  # Timeout per HTTP request, and deadline for a whole turn on one model (queueing + retries)
+  provider_request_timeout_seconds: float = 20.0
+  provider_call_deadline_seconds: float = 60.0
+  # Streamed turns are cut (and the provider stream closed) after N sentences, or N emojis
+  # in emoji mode, instead of running to max_tokens (0 = no limit)
+  early_stop_sentences: int = 2
+  early_stop_max_emojis: int = 12
+  # Hedging: duplicate a turn still running after the provider's observed p95 round trip,
+  # unless requests are already queued for that provider. A hedged pair is billed twice.
+  hedge_requests: bool = False
+  hedge_min_samples: int = 20
+  # Fallback per provider as "provider/model" (e.g. "openai/gpt-4o-mini"); after N consecutive
+  # failures the primary is skipped for the cooldown
+  openai_fallback: str = ""
+  claude_fallback: str = ""
+  grok_fallback: str = ""
+  fallback_after_failures: int = 3
+  fallback_cooldown_seconds: float = 60.0
+  # SSE delivery: seconds between turns (0 = as soon as generated) and turns generated ahead
+  stream_pace_seconds: float = 2.0
+  stream_generate_ahead: int = 1
+  # Battles started by /start or /stream are broadcast to every viewer; the last N events
+  # are replayable via Last-Event-ID, and a finished battle's hub is kept this long
+  stream_replay_events: int = 2000
+  stream_hub_retention_seconds: float = 300
+  # POST /api/battle/batch: battles run on this many workers; new jobs get 429 while N are unfinished
+  batch_max_concurrency: int = 4
+  batch_max_jobs: int = 100
+  # Vote-based Elo leaderboard, kept in memory by every worker; each one checkpoints it to
+  # the ratings table (and reloads the table) every N seconds and on shutdown
+  leaderboard_k_factor: float = 32
+  leaderboard_initial_rating: float = 1000
+  leaderboard_checkpoint_seconds: float = 30
+  # History sent per turn is capped at this many tokens (0 = unlimited); the latest
+  # N turns stay verbatim and older ones are collapsed into a summary
+  context_budget_tokens: int = 1000
+  context_keep_recent_turns: int = 6
+  # "Surprise me" configs pre-generated in the background (0 disables the pool)
+  surprise_pool_size: int = 20
+  surprise_refill_concurrency: int = 2
+  # LLM reply cache: memory LRU plus JSON files (default data/battles/responses; 0 MB disables disk)
+  response_cache_dir: str = ""
+  response_cache_memory_entries: int = 1000
+  response_cache_disk_max_mb: int = 100
+  # Replies are cached only for battles run with cache_mode=cached, unless write-through also
+  # caches fresh turns (so a later cached run can replay them)
+  response_cache_write_through: bool = False
 
   class Config:
     case_sensitive = False
@@ -2,23 +2,65 @@
 LLM Wars - FastAPI application
 """
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from galileo import galileo_context
+from fastapi.responses import PlainTextResponse
 import uvicorn
 
 from src.config import get_settings
-from src.models.database import get_engine, get_session_factory, init_db
-from src.routes import battle
+from src.models.database import backfill_battle_messages, get_engine, get_session_factory, init_db
+from src.routes import battle, leaderboard
 from src.services.battle_service import BattleService
+from src.services.batch_runner import BatchRunner
+from src.services.metrics import (
+  BATCH_BATTLES,
+  BATCH_JOBS,
+  BATTLE_HUB_SUBSCRIBERS,
+  BATTLE_HUBS,
+  BATTLE_STORE_EVICTIONS_TOTAL,
+  BATTLE_STORE_LOOKUPS_TOTAL,
+  BATTLE_STORE_SIZE,
+  LEADERBOARD_VOTES,
+  PERSONA_REGISTRY_VERSION,
+  PERSONA_RELOAD_ERRORS_TOTAL,
+  PROVIDER_ADMISSION_WAIT_MAX_SECONDS,
+  PROVIDER_IN_FLIGHT,
+  PROVIDER_QUEUE_DEPTH,
+  PROVIDER_SCHEDULER_EVENTS_TOTAL,
+  REGISTRY,
+  RESPONSE_CACHE_DISK_BYTES,
+  RESPONSE_CACHE_ENTRIES,
+  RESPONSE_CACHE_LOOKUPS_TOTAL,
+  STATE_EVENTS_TOTAL,
+  STATE_SUBSCRIBERS,
+  SURPRISE_POOL_SIZE,
+  TRACING_QUEUE_DEPTH,
+  TRACING_SPANS_TOTAL,
+  monitor_event_loop_lag,
+)
+from src.services.persona_registry import get_persona_registry
+from src.services.surprise_service import SurpriseService
+from src.services.state_backend import create_state_backend, shared_backend_requested
+from src.services.tracing import get_tracer
 
 load_dotenv()
 
 
+async def migrate_legacy_messages(engine) -> None:
+  """Copy battles.messages JSON into battle_messages in the background"""
+  try:
+    migrated = await backfill_battle_messages(engine)
+    if migrated:
+      print(f"✅ Migrated messages of {migrated} battles to battle_messages")
+  except Exception as e:
+    print(f"⚠️  Message backfill failed (legacy JSON is still readable): {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
   """Application lifespan events"""
@@ -42,41 +84,88 @@ async def lifespan(app: FastAPI):
   else:
     print(f"✅ GROK_API_KEY loaded ({settings.grok_api_key[:8]}...)")
 
-  # Galileo for LLM tracing (GALILEO_API_KEY assumed set).
-  # Set env so request-handler tasks (different asyncio tasks) see the project;
-  # context vars set in lifespan don't propagate to other tasks.
-  os.environ.setdefault("GALILEO_PROJECT", "LLM-Wars")
-  os.environ.setdefault("GALILEO_LOG_STREAM", "development")
-  galileo_context.init(project=os.environ.get("GALILEO_PROJECT"), log_stream=os.environ.get("GALILEO_LOG_STREAM"))
-  print(f"✅ Galileo tracing enabled (project: {os.environ.get('GALILEO_PROJECT')}, log stream: {os.environ.get('GALILEO_LOG_STREAM')})")
+  # Galileo for LLM tracing; traces are exported by a background task, never in a request.
+  # Set env so the exporter's worker thread sees the project.
+  tracer = get_tracer()
+  if tracer.enabled:
+    os.environ.setdefault("GALILEO_PROJECT", "LLM-Wars")
+    os.environ.setdefault("GALILEO_LOG_STREAM", "development")
+    from galileo import galileo_context  # Slow to import; only loaded when tracing is on
+
+    galileo_context.init(project=os.environ.get("GALILEO_PROJECT"), log_stream=os.environ.get("GALILEO_LOG_STREAM"))
+    tracer.start()
+    print(f"✅ Galileo tracing enabled (project: {os.environ.get('GALILEO_PROJECT')}, log stream: {os.environ.get('GALILEO_LOG_STREAM')})")
+  else:
+    print("⚠️  No GALILEO_API_KEY found - tracing disabled")
 
   # Initialize database if DATABASE_URL is provided
-  db_session = None
+  engine = None
+  session_factory = None
+  migration_task = None
   if settings.database_url:
     try:
       print("📦 Initializing database...")
-      engine = get_engine(settings.database_url)
-      init_db(engine)
-      SessionLocal = get_session_factory(engine)
-      db_session = SessionLocal()
+      engine = get_engine(
+        settings.database_url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+      )
+      await init_db(engine)
+      session_factory = get_session_factory(engine)
+      migration_task = asyncio.create_task(migrate_legacy_messages(engine))
       print("✅ Database connected and initialized")
     except Exception as e:
+      if engine:
+        await engine.dispose()
+      if shared_backend_requested(settings.state_backend, settings.database_url):
+        # A worker without the shared backend would run battles the other workers cannot see
+        raise RuntimeError(f"Database initialization failed and the shared state backend needs it: {e}") from e
       print(f"⚠️  Database connection failed: {e}")
       print("   Running without database persistence")
-      db_session = None
+      engine = None
+      session_factory = None
   else:
     print("⚠️  No DATABASE_URL found - running without database persistence")
 
-  # Initialize battle service with database session
-  battle_service = BattleService(db_session=db_session)
+  # Initialize battle service; it opens a fresh session per unit of work
+  state_backend = create_state_backend(settings.state_backend, engine, settings.database_url)
+  battle_service = BattleService(session_factory=session_factory, state_backend=state_backend)
   battle.set_battle_service(battle_service)
+  await battle_service.start()
+  batch_runner = BatchRunner(
+    battle_service,
+    concurrency=settings.batch_max_concurrency,
+    max_jobs=settings.batch_max_jobs,
+  )
+  battle.set_batch_runner(batch_runner)
+  print(f"✅ Battle state backend: {state_backend.stats()['backend']}")
+
+  # Provider SDKs and connections load in the background so /health answers right away
+  print("🔥 Warming up LLM provider connections in the background...")
+  warmup_task = asyncio.create_task(battle_service.warmup())
+  surprise_service = SurpriseService(llm_service=battle_service.llm_service)
+  battle.set_surprise_service(surprise_service)
+  surprise_service.start()
+
+  lag_monitor = asyncio.create_task(monitor_event_loop_lag())
 
   print("✅ LLM Wars API ready!")
   yield
   
+  lag_monitor.cancel()
+  warmup_task.cancel()
+  
   # Cleanup
-  if db_session:
-    db_session.close()
+  await batch_runner.aclose()
+  await surprise_service.aclose()
+  await battle_service.aclose()
+  await tracer.aclose()
+  if migration_task and not migration_task.done():
+    migration_task.cancel()
+  if engine:
+    await engine.dispose()
   print("👋 LLM Wars API shutting down...")
 
 
@@ -100,6 +189,7 @@ app.add_middleware(
 )
 
 app.include_router(battle.router)
+app.include_router(leaderboard.router)
 
 
 @app.get("/")
@@ -113,9 +203,76 @@ async def root():
 
 
 @app.get("/health")
-async def health():
-  """Health check endpoint"""
-  return {"status": "healthy"}
+async def health(response: Response):
+  """Health check: status and dependency checks only (counters are on /metrics)"""
+  checks = {"battle_service": "ok" if battle.battle_service else "down"}
+  if battle.battle_service:
+    checks.update(battle.battle_service.get_dependency_checks())
+  checks["tracing"] = "ok" if get_tracer().enabled else "disabled"
+  healthy = all(check != "down" for check in checks.values())
+  if not healthy:
+    response.status_code = 503
+  return {"status": "healthy" if healthy else "degraded", "checks": checks}
+
+
+def collect_metrics() -> None:
+  """Copy the services' own counters into the registry before a scrape"""
+  service = battle.battle_service
+  if service:
+    for provider, stats in service.get_scheduler_stats().items():
+      PROVIDER_QUEUE_DEPTH.set(stats["queue_depth"], provider=provider)
+      PROVIDER_IN_FLIGHT.set(stats["in_flight"], provider=provider)
+      PROVIDER_ADMISSION_WAIT_MAX_SECONDS.set(stats["wait_seconds_max"], provider=provider)
+      for event in ("requests", "retries", "failures", "rejected"):
+        PROVIDER_SCHEDULER_EVENTS_TOTAL.set_total(stats[event], provider=provider, event=event)
+
+    store = service.get_store_stats()
+    BATTLE_STORE_SIZE.set(store["size"])
+    BATTLE_STORE_LOOKUPS_TOTAL.set_total(store["hits"], result="hit")
+    BATTLE_STORE_LOOKUPS_TOTAL.set_total(store["misses"], result="miss")
+    BATTLE_STORE_EVICTIONS_TOTAL.set_total(store["evictions"])
+
+    cache = service.get_cache_stats()
+    RESPONSE_CACHE_ENTRIES.set(cache["memory_size"], tier="memory")
+    RESPONSE_CACHE_ENTRIES.set(cache["disk_size"], tier="disk")
+    RESPONSE_CACHE_DISK_BYTES.set(cache["disk_bytes"])
+    RESPONSE_CACHE_LOOKUPS_TOTAL.set_total(cache["memory_hits"], result="memory_hit")
+    RESPONSE_CACHE_LOOKUPS_TOTAL.set_total(cache["disk_hits"], result="disk_hit")
+    RESPONSE_CACHE_LOOKUPS_TOTAL.set_total(cache["misses"], result="miss")
+
+    state = service.get_state_backend_stats()
+    STATE_SUBSCRIBERS.set(state["subscribers"])
+    for event in ("published", "dropped", "received"):
+      if event in state:
+        STATE_EVENTS_TOTAL.set_total(state[event], event=event)
+
+    hubs = service.get_hub_stats()
+    BATTLE_HUBS.set(hubs["running"], state="running")
+    BATTLE_HUBS.set(hubs["hubs"] - hubs["running"], state="done")
+    BATTLE_HUB_SUBSCRIBERS.set(hubs["subscribers"])
+    LEADERBOARD_VOTES.set(service.get_leaderboard_stats()["votes"])
+
+  personas = get_persona_registry().stats()
+  PERSONA_REGISTRY_VERSION.set(personas["version"])
+  PERSONA_RELOAD_ERRORS_TOTAL.set_total(personas["reload_errors"])
+  if battle.batch_runner:
+    batch = battle.batch_runner.stats()
+    BATCH_JOBS.set(batch["jobs"])
+    BATCH_BATTLES.set(batch["queued"], state="queued")
+    BATCH_BATTLES.set(batch["running"], state="running")
+  if battle.surprise_service:
+    SURPRISE_POOL_SIZE.set(battle.surprise_service.get_pool_stats()["size"])
+  tracing = get_tracer().stats()
+  TRACING_QUEUE_DEPTH.set(tracing["queued"])
+  for outcome in ("exported", "dropped", "failed", "sampled_out"):
+    TRACING_SPANS_TOTAL.set_total(tracing[outcome], outcome=outcome)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+  """Prometheus metrics (text exposition format)"""
+  collect_metrics()
+  return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
@@ -5,23 +5,45 @@ Battle models
 from .battle import (
     LLMProvider,
     BattleMode,
+    RoundMode,
+    CacheMode,
     BattleStatus,
     LLMConfig,
     BattleConfig,
     BattleMessage,
+    BattleEventType,
+    BattleEvent,
     BattleState,
     BattleRequest,
     BattleResponse,
+    BattlePage,
+    BatchRequest,
+    BatchJobStatus,
+    BatchBattleResult,
+    BatchJobResponse,
+    LeaderboardEntry,
+    LeaderboardResponse,
 )
 
 __all__ = [
     "LLMProvider",
     "BattleMode",
+    "RoundMode",
+    "CacheMode",
     "BattleStatus",
     "LLMConfig",
     "BattleConfig",
     "BattleMessage",
+    "BattleEventType",
+    "BattleEvent",
     "BattleState",
     "BattleRequest",
     "BattleResponse",
+    "BattlePage",
+    "BatchRequest",
+    "BatchJobStatus",
+    "BatchBattleResult",
+    "BatchJobResponse",
+    "LeaderboardEntry",
+    "LeaderboardResponse",
 ]
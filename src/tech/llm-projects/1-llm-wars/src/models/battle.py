@@ -2,6 +2,7 @@
 Pydantic models for LLM Battle system
 """
 
+from datetime import datetime
 from enum import Enum
 from uuid import uuid4
 
@@ -23,6 +24,20 @@ class BattleMode(str, Enum):
     EMOJI = "emoji"
 
 
+class RoundMode(str, Enum):
+    """How participants take their turns within a round"""
+
+    SEQUENTIAL = "sequential"  # Each LLM sees the replies before it in the same round
+    SIMULTANEOUS = "simultaneous"  # All LLMs answer the previous round concurrently
+
+
+class CacheMode(str, Enum):
+    """Whether turns may be served from the response cache"""
+
+    FRESH = "fresh"  # Always call the provider (the reply is cached only with RESPONSE_CACHE_WRITE_THROUGH)
+    CACHED = "cached"  # Reuse a cached reply for an identical request, caching new ones
+
+
 class Language(str, Enum):
     """Supported languages for responses"""
 
@@ -83,6 +98,14 @@ class BattleConfig(BaseModel):
         ge=1,
         le=10,
     )
+    round_mode: RoundMode = Field(
+        default=RoundMode.SEQUENTIAL,
+        description="Whether participants answer in turn or all at once each round",
+    )
+    cache_mode: CacheMode = Field(
+        default=CacheMode.FRESH,
+        description="Reuse cached replies for identical turns instead of calling providers",
+    )
     llms: list[LLMConfig] = Field(
         ...,
         description="List of LLM participants (exactly 3)",
@@ -100,6 +123,25 @@ class BattleMessage(BaseModel):
     round_number: int
 
 
+class BattleEventType(str, Enum):
+    """Kinds of token-level stream events"""
+
+    MESSAGE_START = "message_start"
+    DELTA = "delta"
+    MESSAGE_END = "message_end"
+
+
+class BattleEvent(BaseModel):
+    """A token-level stream event for a single battle message"""
+
+    type: BattleEventType
+    provider: LLMProvider
+    name: str
+    round_number: int
+    delta: str | None = None
+    content: str | None = None
+
+
 class BattleState(BaseModel):
     """Current state of a battle"""
 
@@ -109,6 +151,8 @@ class BattleState(BaseModel):
     current_round: int = Field(default=0)
     status: BattleStatus = Field(default=BattleStatus.PENDING)
     error_message: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    context_tokens_saved: int = Field(default=0)  # History tokens not sent thanks to windowing
 
 
 class BattleRequest(BaseModel):
@@ -118,6 +162,8 @@ class BattleRequest(BaseModel):
     mode: BattleMode = BattleMode.TEXT
     language: Language = Field(default=Language.ENGLISH)
     rounds: int = Field(default=3, ge=1, le=10)
+    round_mode: RoundMode = RoundMode.SEQUENTIAL
+    cache_mode: CacheMode = CacheMode.FRESH
     llms: list[LLMConfig]
 
 
@@ -130,3 +176,70 @@ class BattleResponse(BaseModel):
     total_rounds: int
     messages: list[BattleMessage]
     error_message: str | None = None
+    created_at: datetime | None = None
+    context_tokens_saved: int = 0
+
+
+class BattlePage(BaseModel):
+    """One page of the battle listing, newest first"""
+
+    items: list[BattleResponse]
+    next_cursor: str | None = Field(
+        default=None,
+        description="Pass as ?cursor= to fetch the next page; null on the last page",
+    )
+
+
+class BatchRequest(BaseModel):
+    """API request to run many battles as one background job"""
+
+    battles: list[BattleRequest] = Field(..., min_length=1, max_length=500)
+
+
+class BatchJobStatus(str, Enum):
+    """Progress of a batch job"""
+
+    PENDING = "pending"  # Queued behind other jobs' battles
+    RUNNING = "running"
+    COMPLETED = "completed"  # Every battle finished (completed or error)
+
+
+class BatchBattleResult(BaseModel):
+    """Outcome of one battle in a batch job"""
+
+    battle_id: str
+    status: BattleStatus
+    error_message: str | None = None
+
+
+class BatchJobResponse(BaseModel):
+    """API response for batch job progress and per-battle results"""
+
+    id: str
+    status: BatchJobStatus
+    total: int
+    completed: int
+    failed: int
+    battles: list[BatchBattleResult]
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
+class LeaderboardEntry(BaseModel):
+    """Elo rating of a provider, or of a provider playing a persona"""
+
+    provider: LLMProvider
+    persona: str | None = None
+    rating: float
+    games: int
+    wins: int
+    win_rate: float
+
+
+class LeaderboardResponse(BaseModel):
+    """API response for the vote-based leaderboard, best first"""
+
+    providers: list[LeaderboardEntry]
+    personas: list[LeaderboardEntry]
+    votes: int
+    updated_at: datetime | None = None
@@ -2,16 +2,44 @@
 Database models for LLM Wars
 """
 
-from datetime import datetime
+from datetime import UTC, datetime
 from uuid import uuid4
 
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, String, create_engine
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    exists,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime, like the DateTime columns store"""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+# Advisory lock key shared by every worker, so schema changes and backfills run one worker at a time
+MIGRATION_LOCK_KEY = 0x4C4C4D57  # "LLMW"
+
+
 class Battle(Base):
     """Battle table in PostgreSQL"""
 
@@ -21,10 +49,63 @@ class Battle(Base):
     config = Column(JSON, nullable=False)  # BattleConfig as JSON
     messages = Column(JSON, nullable=False, default=list)  # List of BattleMessage as JSON
     status = Column(String, nullable=False)
+    language = Column(String, nullable=True)  # Copied from config for filtering
     current_round = Column(String, default="0")  # Stored as string for JSON compatibility
     error_message = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    context_tokens_saved = Column(Integer, nullable=True, default=0)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
+
+    # Keyset pagination walks (created_at, id) newest-first, optionally within a filter
+    __table_args__ = (
+        Index("ix_battles_created_at_id", "created_at", "id"),
+        Index("ix_battles_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_battles_language_created_at_id", "language", "created_at", "id"),
+    )
+
+
+class BattleMessageRow(Base):
+    """Append-only log of battle turns; one row per BattleMessage"""
+
+    __tablename__ = "battle_messages"
+
+    battle_id = Column(String, ForeignKey("battles.id"), primary_key=True)
+    seq = Column(Integer, primary_key=True)  # Position in BattleState.messages
+    provider = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    content = Column(String, nullable=False)
+    round_number = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+
+
+class BattleParticipant(Base):
+    """One row per LLM seat in a battle, for filtering and aggregating by provider/persona"""
+
+    __tablename__ = "battle_participants"
+
+    battle_id = Column(String, ForeignKey("battles.id"), primary_key=True)
+    seat = Column(Integer, primary_key=True)  # Position in BattleConfig.llms
+    provider = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    persona = Column(String, nullable=False)
+
+    __table_args__ = (
+        Index("ix_battle_participants_provider_battle_id", "provider", "battle_id"),
+    )
+
+
+def participant_rows(battle_id: str, config: dict) -> list[dict]:
+    """battle_participants rows for a BattleConfig dump"""
+    return [
+        {
+            "battle_id": battle_id,
+            "seat": seat,
+            "provider": llm["provider"],
+            "name": llm.get("name") or "",
+            "persona": llm["persona"],
+        }
+        for seat, llm in enumerate(config.get("llms", []))
+    ]
 
 
 class Vote(Base):
@@ -35,19 +116,214 @@ class Vote(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     battle_id = Column(String, ForeignKey("battles.id"), nullable=False, index=True)
     provider = Column(String, nullable=False)  # 'openai', 'claude', or 'grok'
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+
+
+class VoteCount(Base):
+    """Per-(battle, provider) vote counter, incremented in the same transaction as the votes"""
+
+    __tablename__ = "vote_counts"
+
+    battle_id = Column(String, ForeignKey("battles.id"), primary_key=True)
+    provider = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class Rating(Base):
+    """Leaderboard checkpoint: Elo rating per provider (persona "") or (provider, persona)"""
+
+    __tablename__ = "ratings"
+
+    provider = Column(String, primary_key=True)
+    persona = Column(String, primary_key=True, default="")
+    rating = Column(Float, nullable=False)
+    games = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=utcnow, nullable=False)
+
+
+def _dialect_insert(session: AsyncSession, table):
+    """INSERT with the session's dialect ON CONFLICT support (SQLite or PostgreSQL)"""
+    dialect_insert = sqlite.insert if session.bind.dialect.name == "sqlite" else postgresql.insert
+    return dialect_insert(table)
+
+
+async def increment_vote_counts(session: AsyncSession, counts: dict[tuple[str, str], int]) -> None:
+    """Atomically add to vote counters with INSERT ... ON CONFLICT DO UPDATE"""
+    if not counts:
+        return
+    # Sorted rows keep lock order stable across concurrent flushes
+    rows = [
+        {"battle_id": battle_id, "provider": provider, "count": count}
+        for (battle_id, provider), count in sorted(counts.items())
+    ]
+    stmt = _dialect_insert(session, VoteCount).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[VoteCount.battle_id, VoteCount.provider],
+        set_={"count": VoteCount.count + stmt.excluded.count},
+    )
+    await session.execute(stmt)
+
+
+async def upsert_ratings(session: AsyncSession, rows: list[dict]) -> None:
+    """Write rating rows; an existing row is only replaced by one with at least as many games"""
+    if not rows:
+        return
+    stmt = _dialect_insert(session, Rating).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Rating.provider, Rating.persona],
+        set_={column: stmt.excluded[column] for column in ("rating", "games", "wins", "updated_at")},
+        where=Rating.games <= stmt.excluded.games,
+    )
+    await session.execute(stmt)
+
+
+def _add_missing_columns_and_indexes(sync_conn) -> None:
+    """create_all only creates missing tables; bring existing tables up to date"""
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=sync_conn.dialect)
+                sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
+async def _backfill_battle_filters(conn) -> None:
+    """Fill language and participant rows for battles saved before they existed"""
+    await conn.execute(
+        update(Battle)
+        .where(Battle.language.is_(None))
+        .values(language=func.coalesce(Battle.config["language"].as_string(), "en"))
+    )
+    missing = await conn.execute(
+        select(Battle.id, Battle.config).where(
+            ~exists().where(BattleParticipant.battle_id == Battle.id)
+        )
+    )
+    rows = [row for battle_id, config in missing for row in participant_rows(battle_id, config)]
+    if rows:
+        await conn.execute(insert(BattleParticipant), rows)
+
+
+async def _backfill_vote_counts(conn) -> None:
+    """Seed vote_counts from existing votes the first time the table is created"""
+    has_counts = (await conn.execute(select(VoteCount.battle_id).limit(1))).first()
+    if has_counts:
+        return
+    totals = select(Vote.battle_id, Vote.provider, func.count()).group_by(Vote.battle_id, Vote.provider)
+    await conn.execute(
+        insert(VoteCount).from_select(["battle_id", "provider", "count"], totals)
+    )
+
+
+async def _lock_migrations(conn) -> None:
+    """Hold the migration lock until conn's transaction ends (PostgreSQL only; SQLite has one writer)"""
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+
+async def backfill_battle_messages(engine: AsyncEngine, batch_size: int = 100) -> int:
+    """
+    Copy legacy battles.messages JSON into battle_messages, a batch at a time.
+
+    Safe to run while serving: readers fall back to the JSON column for
+    battles that have no rows yet, and battles that already have rows are
+    skipped. Returns the number of battles migrated.
+    """
+    migrated = 0
+    last_id = ""
+    while True:
+        async with engine.begin() as conn:
+            await _lock_migrations(conn)
+            batch = (
+                await conn.execute(
+                    select(Battle.id, Battle.messages)
+                    .where(
+                        Battle.id > last_id,
+                        ~exists().where(BattleMessageRow.battle_id == Battle.id),
+                    )
+                    .order_by(Battle.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not batch:
+                return migrated
+
+            rows = [
+                {"battle_id": battle_id, "seq": seq, **message}
+                for battle_id, messages in batch
+                for seq, message in enumerate(messages or [])
+            ]
+            if rows:
+                await conn.execute(insert(BattleMessageRow), rows)
+            migrated += sum(1 for _, messages in batch if messages)
+            last_id = batch[-1][0]
+
+
+def is_postgres_url(database_url: str) -> bool:
+    return bool(database_url) and _async_url(database_url).get_backend_name() == "postgresql"
+
+
+def _async_url(database_url: str):
+    """Map a sync DATABASE_URL (postgres://, postgresql://) onto its async driver"""
+    url = make_url(database_url.replace("postgres://", "postgresql://", 1))
+    if url.drivername in ("postgresql", "postgresql+psycopg2"):
+        url = url.set(drivername="postgresql+asyncpg")
+    elif url.drivername == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
 
+def get_engine(
+    database_url: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    pool_recycle: int = 1800,
+    pooled: bool = True,
+) -> AsyncEngine:
+    """Create async SQLAlchemy engine with a bounded connection pool (or, unpooled, one connection per connect())"""
+    url = _async_url(database_url)
+    kwargs = {"pool_pre_ping": True}
+    if not pooled:
+        kwargs = {"poolclass": NullPool}
+    elif url.get_backend_name() != "sqlite":
+        kwargs.update(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+        )
+    # asyncpg takes ssl=..., not libpq's sslmode=... (Render/Railway URLs use the latter)
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"])
+        if sslmode != "disable":
+            kwargs["connect_args"] = {"ssl": sslmode}
+    return create_async_engine(url, **kwargs)
 
-def get_engine(database_url: str):
-    """Create SQLAlchemy engine"""
-    return create_engine(database_url, pool_pre_ping=True)
 
+def get_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    """Create session factory; open one session per request or unit of work"""
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
-def get_session_factory(engine):
-    """Create session factory"""
-    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async def init_db(engine: AsyncEngine) -> None:
+    """
+    Initialize database tables.
 
-def init_db(engine):
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    Safe for workers starting together: on PostgreSQL each takes the
+    migration lock, so one creates and migrates the tables while the rest
+    wait, then find the schema current and nothing left to backfill.
+    """
+    async with engine.begin() as conn:
+        await _lock_migrations(conn)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns_and_indexes)
+        await _backfill_battle_filters(conn)
+        await _backfill_vote_counts(conn)
@@ -2,22 +2,42 @@
 Battle routes - LLM battle API endpoints
 """
 
-import asyncio
 import json
 import traceback
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
 
-from ..models.battle import BattleConfig, BattleRequest, BattleResponse, BattleStatus
+from ..config import get_settings
+from ..models.battle import (
+    BattleConfig,
+    BattleEvent,
+    BattleEventType,
+    BattleMessage,
+    BattlePage,
+    BattleRequest,
+    BattleResponse,
+    BattleState,
+    BattleStatus,
+    BatchJobResponse,
+    BatchRequest,
+    Language,
+    LLMProvider,
+)
+from ..services.battle_hub import parse_event_id
 from ..services.battle_service import BattleService
+from ..services.batch_runner import BatchQueueFullError, BatchRunner
+from ..services.metrics import SSE_STREAMS_ACTIVE
+from ..services.pacing import DeliveryScheduler
+from ..services.state_backend import BattleNotPersistedError
 from ..services.surprise_service import SurpriseService
 
 router = APIRouter(prefix="/api/battle", tags=["battle"])
 
 # BattleService will be initialized in main.py with DB session
 battle_service: BattleService | None = None
-surprise_service = SurpriseService()
+batch_runner: BatchRunner | None = None
+surprise_service: SurpriseService | None = None
 
 
 def set_battle_service(service: BattleService) -> None:
@@ -26,16 +46,45 @@ def set_battle_service(service: BattleService) -> None:
     battle_service = service
 
 
+def set_surprise_service(service: SurpriseService) -> None:
+    """Set surprise service instance (called from main.py)"""
+    global surprise_service
+    surprise_service = service
+
+
+def set_batch_runner(runner: BatchRunner) -> None:
+    """Set batch runner instance (called from main.py)"""
+    global batch_runner
+    batch_runner = runner
+
+
+async def _claim_battle(state: BattleState) -> None:
+    """Claim a pending battle for this request; only one worker ever runs it"""
+    try:
+        claimed = await battle_service.claim_battle(state)
+    except BattleNotPersistedError as e:
+        raise HTTPException(status_code=500, detail=f"{e}; create the battle again")
+    if not claimed:
+        status = BattleStatus.IN_PROGRESS if state.status == BattleStatus.PENDING else state.status
+        raise HTTPException(
+            status_code=400,
+            detail=f"Battle already {status.value}",
+        )
+
+
 @router.get("/surprise")
 async def get_surprise_config() -> dict:
     """
-    Generate a random battle configuration using LLM.
+    Return a random battle configuration, pre-generated by LLM in the background.
     
     Returns a creative topic and 3 personas:
     - OpenAI: Mischievous troublemaker type
     - Claude: Polite peacemaker type  
     - Grok: Wildcard (anything creative!)
     """
+    if not surprise_service:
+        raise HTTPException(status_code=500, detail="Surprise service not initialized")
+
     return await surprise_service.generate_surprise()
 
 
@@ -53,41 +102,99 @@ async def create_battle(request: BattleRequest) -> BattleResponse:
             detail="Exactly 3 LLMs are required for a battle",
         )
 
-    state = battle_service.create_battle(request)
+    try:
+        state = await battle_service.create_battle(request)
+    except BattleNotPersistedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     return battle_service.get_battle_response(state)
 
 
-@router.get("/", response_model=list[BattleResponse])
-async def get_all_battles() -> list[BattleResponse]:
-    """Get all battles"""
-    return battle_service.get_all_battles()
+@router.get("/", response_model=BattlePage)
+async def list_battles(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    status: BattleStatus | None = None,
+    provider: LLMProvider | None = None,
+    language: Language | None = None,
+    include_messages: bool = True,
+) -> BattlePage:
+    """
+    List battles newest first, one page at a time.
+
+    Pass the returned next_cursor as ?cursor= to fetch the following page.
+    Filter by status, provider or language; ?include_messages=false omits
+    message bodies.
+    """
+    if not battle_service:
+        raise HTTPException(status_code=500, detail="Battle service not initialized")
+
+    try:
+        return await battle_service.list_battles(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            provider=provider,
+            language=language,
+            include_messages=include_messages,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/batch", response_model=BatchJobResponse, status_code=202)
+async def create_batch(request: BatchRequest) -> BatchJobResponse:
+    """
+    Run many battles as one background job.
+
+    The battles are created right away and run on the server's bounded
+    batch worker pool. Poll /api/battle/batch/{job_id} for progress and
+    per-battle results.
+    """
+    if not batch_runner:
+        raise HTTPException(status_code=500, detail="Batch runner not initialized")
+
+    if any(len(battle.llms) != 3 for battle in request.battles):
+        raise HTTPException(
+            status_code=400,
+            detail="Exactly 3 LLMs are required for a battle",
+        )
+
+    try:
+        job = await batch_runner.submit(request.battles)
+    except BatchQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.response()
+
+
+@router.get("/batch/{job_id}", response_model=BatchJobResponse)
+async def get_batch(job_id: str) -> BatchJobResponse:
+    """Get a batch job's progress and per-battle results"""
+    if not batch_runner:
+        raise HTTPException(status_code=500, detail="Batch runner not initialized")
+
+    job = batch_runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+
+    return job.response()
 
 
 @router.post("/{battle_id}/start", response_model=BattleResponse)
-async def start_battle(
-    battle_id: str,
-    background_tasks: BackgroundTasks,
-) -> BattleResponse:
+async def start_battle(battle_id: str) -> BattleResponse:
     """
     Start a battle (runs in background).
 
-    Poll /api/battle/{id} to get updates.
+    Poll /api/battle/{id} or watch /api/battle/{id}/stream to get updates.
     """
     if not battle_service:
         raise HTTPException(status_code=500, detail="Battle service not initialized")
     
-    state = battle_service.get_battle(battle_id)
+    state = await battle_service.get_battle(battle_id)
     if not state:
         raise HTTPException(status_code=404, detail="Battle not found")
 
-    if state.status != BattleStatus.PENDING:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Battle already {state.status.value}",
-        )
-
-    background_tasks.add_task(battle_service.run_battle, battle_id)
-    state.status = BattleStatus.IN_PROGRESS
+    await _claim_battle(state)
+    battle_service.start_battle_run(battle_id)
 
     return battle_service.get_battle_response(state)
 
@@ -102,55 +209,78 @@ async def run_battle_sync(battle_id: str) -> BattleResponse:
     if not battle_service:
         raise HTTPException(status_code=500, detail="Battle service not initialized")
     
-    state = battle_service.get_battle(battle_id)
+    state = await battle_service.get_battle(battle_id)
     if not state:
         raise HTTPException(status_code=404, detail="Battle not found")
 
-    if state.status != BattleStatus.PENDING:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Battle already {state.status.value}",
-        )
-
+    await _claim_battle(state)
     await battle_service.run_battle(battle_id)
     return battle_service.get_battle_response(state)
 
 
 @router.get("/{battle_id}/stream")
-async def stream_battle(battle_id: str) -> StreamingResponse:
+async def stream_battle(
+    battle_id: str,
+    tokens: bool = False,
+    pace: float | None = Query(default=None, ge=0, le=30),
+    last_event_id: str | None = Header(default=None),
+) -> StreamingResponse:
     """
-    Stream battle messages as Server-Sent Events (SSE).
+    Stream a battle as Server-Sent Events (SSE), starting it if it is pending.
 
-    Each message is sent as it's generated by the LLMs.
+    Any number of viewers can watch the same battle, live or after it ends.
+    Every event carries an SSE id; a client reconnecting with Last-Event-ID
+    resumes right after that event. With ?tokens=true, each message is
+    streamed as message_start, delta and message_end events. ?pace sets the
+    seconds between turns for this viewer (default from settings).
     """
     print(f"📡 Stream request for battle: {battle_id}")
     
     if not battle_service:
         raise HTTPException(status_code=500, detail="Battle service not initialized")
     
-    state = battle_service.get_battle(battle_id)
+    state = await battle_service.get_battle(battle_id)
     if not state:
         print(f"❌ Battle not found: {battle_id}")
         raise HTTPException(status_code=404, detail="Battle not found")
 
     print(f"📊 Battle status: {state.status.value}")
-    if state.status != BattleStatus.PENDING:
-        print(f"⚠️  Battle already {state.status.value}, cannot stream")
-        raise HTTPException(
-            status_code=400,
-            detail=f"Battle already {state.status.value}",
-        )
+    # The first viewer of a pending battle starts it; everyone else just watches
+    if state.status == BattleStatus.PENDING and await battle_service.claim_battle(state):
+        print(f"🚀 Starting battle run for: {battle_id}")
+        battle_service.start_battle_run(battle_id)
+
+    settings = get_settings()
+    scheduler = DeliveryScheduler(
+        pace_seconds=settings.stream_pace_seconds if pace is None else pace,
+        generate_ahead=settings.stream_generate_ahead,
+    )
+    after = parse_event_id(last_event_id)
+
+    async def viewer_events():
+        async for event in battle_service.watch_battle(battle_id, after):
+            if tokens:
+                yield event
+            elif event.item.type == BattleEventType.MESSAGE_END:
+                yield event._replace(item=BattleMessage(
+                    provider=event.item.provider,
+                    name=event.item.name,
+                    content=event.item.content,
+                    round_number=event.item.round_number,
+                ))
 
     async def event_generator():
+        SSE_STREAMS_ACTIVE.inc()
         try:
-            print(f"🚀 Starting battle stream for: {battle_id}")
             message_count = 0
-            async for message in battle_service.run_battle_streaming(battle_id):
+            async for event in scheduler.deliver(viewer_events()):
+                if isinstance(event.item, BattleEvent):
+                    yield f"id: {event.id}\ndata: {event.item.model_dump_json(exclude_none=True)}\n\n"
+                    continue
                 message_count += 1
-                print(f"📨 Yielding message #{message_count}: {message.provider} - {message.content[:50]}...")
-                data = json.dumps(message.model_dump())
-                yield f"data: {data}\n\n"
-                await asyncio.sleep(0.01)
+                print(f"📨 Yielding message #{message_count}: {event.item.provider} - {event.item.content[:50]}...")
+                data = json.dumps(event.item.model_dump())
+                yield f"id: {event.id}\ndata: {data}\n\n"
 
             print(f"✅ Battle stream complete. Total messages: {message_count}")
             yield f"data: {json.dumps({'type': 'complete'})}\n\n"
@@ -158,6 +288,8 @@ async def stream_battle(battle_id: str) -> StreamingResponse:
             print(f"❌ Stream error: {e}")
             traceback.print_exc()
             yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+        finally:
+            SSE_STREAMS_ACTIVE.dec()
 
     return StreamingResponse(
         event_generator(),
@@ -176,7 +308,7 @@ async def get_battle(battle_id: str) -> BattleResponse:
     if not battle_service:
         raise HTTPException(status_code=500, detail="Battle service not initialized")
     
-    state = battle_service.get_battle(battle_id)
+    state = await battle_service.get_battle(battle_id)
     if not state:
         raise HTTPException(status_code=404, detail="Battle not found")
 
@@ -189,7 +321,7 @@ async def get_battle_config(battle_id: str) -> BattleConfig:
     if not battle_service:
         raise HTTPException(status_code=500, detail="Battle service not initialized")
     
-    config = battle_service.get_battle_config(battle_id)
+    config = await battle_service.get_battle_config(battle_id)
     if not config:
         raise HTTPException(status_code=404, detail="Battle not found")
 
@@ -217,12 +349,12 @@ async def vote_for_battle(battle_id: str, request: dict) -> dict:
         raise HTTPException(status_code=400, detail="Invalid provider. Must be 'openai', 'claude', or 'grok'")
     
     # Verify battle exists
-    state = battle_service.get_battle(battle_id)
+    state = await battle_service.get_battle(battle_id)
     if not state:
         raise HTTPException(status_code=404, detail="Battle not found")
     
     try:
-        battle_service.save_vote(battle_id, provider)
+        await battle_service.save_vote(battle_id, provider)
         return {"success": True, "message": "Vote saved"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving vote: {str(e)}")
@@ -235,9 +367,9 @@ async def get_battle_votes(battle_id: str) -> dict:
         raise HTTPException(status_code=500, detail="Battle service not initialized")
     
     # Verify battle exists
-    state = battle_service.get_battle(battle_id)
+    state = await battle_service.get_battle(battle_id)
     if not state:
         raise HTTPException(status_code=404, detail="Battle not found")
     
-    vote_counts = battle_service.get_vote_counts(battle_id)
+    vote_counts = await battle_service.get_vote_counts(battle_id)
     return vote_counts
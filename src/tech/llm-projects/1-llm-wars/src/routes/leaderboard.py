@@ -0,0 +1,24 @@
+"""
+Leaderboard routes - Vote-based Elo ratings
+"""
+
+from fastapi import APIRouter, HTTPException
+
+from ..models.battle import LeaderboardResponse
+from . import battle
+
+router = APIRouter(prefix="/api/leaderboard", tags=["leaderboard"])
+
+
+@router.get("", response_model=LeaderboardResponse)
+async def get_leaderboard() -> LeaderboardResponse:
+    """
+    Elo ratings of providers and of (provider, persona) pairs, best first.
+
+    Ratings are updated in memory on every vote, so this only returns the
+    precomputed view.
+    """
+    if not battle.battle_service:
+        raise HTTPException(status_code=500, detail="Battle service not initialized")
+
+    return battle.battle_service.get_leaderboard()
@@ -0,0 +1,154 @@
+"""
+Batch Runner - Runs submitted batches of battles on a bounded worker pool
+"""
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from uuid import uuid4
+
+from ..models.battle import (
+    BatchBattleResult,
+    BatchJobResponse,
+    BatchJobStatus,
+    BattleRequest,
+    BattleStatus,
+)
+from ..models.database import utcnow
+from .battle_service import BattleService
+
+
+class BatchQueueFullError(Exception):
+    """Raised when `max_jobs` batches are already queued or running"""
+
+
+class BatchJob:
+    """One submitted batch and the result of each of its battles"""
+
+    def __init__(self, battle_ids: list[str]) -> None:
+        self.id = str(uuid4())
+        self.created_at = utcnow()
+        self.finished_at: datetime | None = None
+        self.started = False
+        self._results = {
+            battle_id: BatchBattleResult(battle_id=battle_id, status=BattleStatus.PENDING)
+            for battle_id in battle_ids
+        }
+        self._remaining = len(battle_ids)
+
+    @property
+    def done(self) -> bool:
+        return self._remaining == 0
+
+    def record(self, battle_id: str, status: BattleStatus, error_message: str | None = None) -> None:
+        self._results[battle_id] = BatchBattleResult(battle_id=battle_id, status=status, error_message=error_message)
+        if status in (BattleStatus.COMPLETED, BattleStatus.ERROR):
+            self._remaining -= 1
+            if self.done:
+                self.finished_at = utcnow()
+
+    def response(self) -> BatchJobResponse:
+        results = list(self._results.values())
+        if self.done:
+            status = BatchJobStatus.COMPLETED
+        else:
+            status = BatchJobStatus.RUNNING if self.started else BatchJobStatus.PENDING
+        return BatchJobResponse(
+            id=self.id,
+            status=status,
+            total=len(results),
+            completed=sum(1 for result in results if result.status == BattleStatus.COMPLETED),
+            failed=sum(1 for result in results if result.status == BattleStatus.ERROR),
+            battles=results,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+        )
+
+
+class BatchRunner:
+    """
+    Executes batch jobs with BattleService.run_battle on `concurrency` workers.
+
+    Battles from all jobs share one FIFO queue, so throughput is set by the
+    worker count (and the providers' rate limits), not by how many clients
+    are connected. Jobs live in this worker's memory: at most `max_jobs`
+    unfinished jobs are accepted, and finished ones are forgotten once more
+    than `max_jobs` are kept. Battles themselves are persisted like any other
+    battle.
+    """
+
+    def __init__(self, battle_service: BattleService, concurrency: int = 4, max_jobs: int = 100) -> None:
+        self._battle_service = battle_service
+        self._concurrency = max(concurrency, 1)
+        self._max_jobs = max_jobs
+        self._queue: asyncio.Queue[tuple[BatchJob, str]] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._jobs: OrderedDict[str, BatchJob] = OrderedDict()
+        self._running = 0
+
+    async def submit(self, requests: list[BattleRequest]) -> BatchJob:
+        """Create the batch's battles and queue them; returns immediately"""
+        if sum(1 for job in self._jobs.values() if not job.done) >= self._max_jobs:
+            raise BatchQueueFullError(f"{self._max_jobs} batch jobs are already queued or running")
+
+        battle_ids = [(await self._battle_service.create_battle(request)).id for request in requests]
+        job = BatchJob(battle_ids)
+        self._jobs[job.id] = job
+        self._forget_old_jobs()
+
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self._concurrency)]
+        for battle_id in battle_ids:
+            self._queue.put_nowait((job, battle_id))
+        print(f"📦 Batch {job.id} queued: {len(battle_ids)} battles")
+        return job
+
+    def get(self, job_id: str) -> BatchJob | None:
+        return self._jobs.get(job_id)
+
+    async def aclose(self) -> None:
+        """Stop the workers (queued battles stay pending; called on shutdown)"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "jobs": len(self._jobs),
+            "queued": self._queue.qsize(),
+            "running": self._running,
+            "concurrency": self._concurrency,
+        }
+
+    def _forget_old_jobs(self) -> None:
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done]:
+            if len(self._jobs) <= self._max_jobs:
+                break
+            del self._jobs[job_id]
+
+    async def _work(self) -> None:
+        while True:
+            job, battle_id = await self._queue.get()
+            self._running += 1
+            try:
+                await self._run(job, battle_id)
+            except Exception as e:
+                job.record(battle_id, BattleStatus.ERROR, str(e))
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: BatchJob, battle_id: str) -> None:
+        state = await self._battle_service.get_battle(battle_id)
+        if not state or not await self._battle_service.claim_battle(state):
+            job.record(battle_id, BattleStatus.ERROR, "Battle was started outside the batch")
+            return
+
+        job.started = True
+        job.record(battle_id, BattleStatus.IN_PROGRESS)
+        state = await self._battle_service.run_battle(battle_id)
+        job.record(battle_id, state.status, state.error_message)
+        if job.done:
+            response = job.response()
+            print(f"✅ Batch {job.id} finished: {response.completed} completed, {response.failed} failed")
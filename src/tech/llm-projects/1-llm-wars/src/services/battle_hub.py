@@ -0,0 +1,162 @@
+"""
+Battle Hub - Per-battle broadcast of stream events with a replay buffer
+"""
+
+import asyncio
+import sys
+from collections import deque
+from collections.abc import AsyncGenerator
+from typing import NamedTuple
+
+from ..models.battle import BattleEvent, BattleEventType, BattleMessage
+
+# Events are keyed (message seq, index within the message). message_start is
+# index 0, deltas count up from 1 and message_end is FINAL, so a finished
+# message has the same key whether it was streamed live or replayed from storage.
+EventKey = tuple[int, int]
+FINAL = sys.maxsize
+START: EventKey = (-1, FINAL)
+
+
+def format_event_id(key: EventKey) -> str:
+    """SSE id: "3" for message 3 as a whole, "3.7" for an event inside it"""
+    seq, index = key
+    return str(seq) if index == FINAL else f"{seq}.{index}"
+
+
+def parse_event_id(value: str | None) -> EventKey | None:
+    """Inverse of format_event_id; None for a missing or malformed Last-Event-ID"""
+    if not value:
+        return None
+    seq, _, index = value.strip().partition(".")
+    try:
+        return (int(seq), int(index) if index else FINAL)
+    except ValueError:
+        return None
+
+
+class HubEvent(NamedTuple):
+    """A stream event (or, for whole-message viewers, the finished message) and its SSE id"""
+
+    id: str
+    item: BattleEvent | BattleMessage
+
+
+class BattleHub:
+    """
+    Fan-out of one battle's stream events to any number of subscribers.
+
+    The producer appends to a ring buffer of the last `replay_size` events
+    and never waits on subscribers; each subscriber reads at its own pace
+    from its own cursor. A subscriber that falls behind the ring (or
+    reconnects late) catches up on the finished messages it missed, then
+    follows live events. Finished messages are kept in full, so nothing is
+    lost or sent twice.
+    """
+
+    def __init__(self, battle_id: str, replay_size: int = 2000) -> None:
+        self.battle_id = battle_id
+        self._ring: deque[tuple[EventKey, BattleEvent]] = deque(maxlen=max(replay_size, 1))
+        self._messages: list[BattleEvent] = []  # message_end of every finished message
+        self._seq = 0
+        self._index = 0
+        self._wakeup = asyncio.Event()
+        self.done = False
+        self.error: str | None = None
+        self.subscribers = 0
+
+    def publish(self, event: BattleEvent) -> None:
+        if event.type == BattleEventType.MESSAGE_START:
+            self._index = 0
+            key = (self._seq, 0)
+        elif event.type == BattleEventType.DELTA:
+            self._index += 1
+            key = (self._seq, self._index)
+        else:
+            key = (self._seq, FINAL)
+            self._messages.append(event)
+            self._seq += 1
+        self._ring.append((key, event))
+        self._notify()
+
+    def finish(self, error: str | None = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def subscribe(self, after: EventKey | None = None) -> AsyncGenerator[HubEvent, None]:
+        """Events after `after` (from the start if None) until the battle ends"""
+        cursor = after or START
+        self.subscribers += 1
+        try:
+            while True:
+                wakeup = self._wakeup
+                pending = self._pending(cursor)
+                for key, event in pending:
+                    cursor = key
+                    yield HubEvent(format_event_id(key), event)
+                if not pending:
+                    if self.done:
+                        return
+                    await wakeup.wait()
+        finally:
+            self.subscribers -= 1
+
+    def _pending(self, cursor: EventKey) -> list[tuple[EventKey, BattleEvent]]:
+        catch_up: list[tuple[EventKey, BattleEvent]] = []
+        partial_seq = None
+        if self._ring and cursor < self._ring[0][0]:
+            first = self._ring[0][0]
+            catch_up = [
+                ((seq, FINAL), message)
+                for seq, message in enumerate(self._messages)
+                if cursor < (seq, FINAL) < first
+            ]
+            if first[1] != 0:
+                partial_seq = first[0]  # Its start fell out of the ring; send only its message_end
+
+        # Scan from the newest end: live subscribers only need the last few events
+        live: list[tuple[EventKey, BattleEvent]] = []
+        for key, event in reversed(self._ring):
+            if key <= cursor:
+                break
+            if key[0] != partial_seq or key[1] == FINAL:
+                live.append((key, event))
+        live.reverse()
+        return catch_up + live
+
+    def _notify(self) -> None:
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+
+class BattleHubs:
+    """Hubs of the battles running in this worker, kept `retention_seconds` after they end"""
+
+    def __init__(self, replay_size: int = 2000, retention_seconds: float = 300) -> None:
+        self._replay_size = replay_size
+        self._retention_seconds = retention_seconds
+        self._hubs: dict[str, BattleHub] = {}
+
+    def get(self, battle_id: str) -> BattleHub | None:
+        return self._hubs.get(battle_id)
+
+    def create(self, battle_id: str) -> BattleHub:
+        hub = BattleHub(battle_id, self._replay_size)
+        self._hubs[battle_id] = hub
+        return hub
+
+    def retire(self, hub: BattleHub) -> None:
+        """Forget a finished hub after the retention period (late reconnects replay from it)"""
+        def drop() -> None:
+            if self._hubs.get(hub.battle_id) is hub:
+                del self._hubs[hub.battle_id]
+
+        asyncio.get_running_loop().call_later(self._retention_seconds, drop)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hubs": len(self._hubs),
+            "running": sum(1 for hub in self._hubs.values() if not hub.done),
+            "subscribers": sum(hub.subscribers for hub in self._hubs.values()),
+        }
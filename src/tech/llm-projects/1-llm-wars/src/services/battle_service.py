@@ -3,117 +3,575 @@ Battle Service - Orchestrates turn-based LLM battles
 """
 
 import asyncio
-from collections import Counter
-from collections.abc import AsyncGenerator
+import base64
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import Optional
 
-from galileo import galileo_context
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, exists, insert, select, tuple_, update
+from sqlalchemy.orm import defer
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from ..config import get_settings
 from ..models.battle import (
     BattleConfig,
+    BattleEvent,
+    BattleEventType,
     BattleMessage,
+    BattlePage,
     BattleRequest,
     BattleResponse,
     BattleState,
     BattleStatus,
+    Language,
     LLMConfig,
+    LeaderboardResponse,
+    LLMProvider,
+    RoundMode,
 )
-from ..models.database import Battle, Vote
+from ..models.database import (
+    Battle,
+    BattleMessageRow,
+    BattleParticipant,
+    VoteCount,
+    participant_rows,
+)
+from .battle_hub import FINAL, START, BattleHub, BattleHubs, EventKey, HubEvent, format_event_id
+from .battle_store import BattleStore
+from .context_window import ContextWindow, load_encoding
+from .leaderboard import Leaderboard, rebuild_leaderboard
 from .llm_service import LLMService
+from .metrics import BATTLE_ERRORS_TOTAL, BATTLES_ACTIVE, DB_OPERATION_SECONDS
+from .state_backend import BattleNotPersistedError, InProcessStateBackend
+from .tracing import trace_session
+from .vote_buffer import VoteBuffer
+
+
+def _encode_cursor(created_at: datetime, battle_id: str) -> str:
+    """Opaque keyset cursor for (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{battle_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, battle_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), battle_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
 
 
 class BattleService:
     """Service for orchestrating LLM battles"""
 
-    def __init__(self, db_session: Optional[Session] = None) -> None:
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        state_backend: InProcessStateBackend | None = None,
+    ) -> None:
+        settings = get_settings()
         self._llm_service = LLMService()
-        self._battles: dict[str, BattleState] = {}
-        self._db_session = db_session
-
-    def create_battle(self, request: BattleRequest) -> BattleState:
+        # Bounded cache; evicted battles are persisted and reloaded on demand
+        self._battles = BattleStore(
+            max_size=settings.battle_store_max_size,
+            ttl_seconds=settings.battle_store_ttl_seconds,
+        )
+        # Expired battles are also swept on a timer, so an idle worker lets them go too
+        self._sweep_seconds = min(settings.battle_store_ttl_seconds, 60)
+        self._sweep_task: asyncio.Task | None = None
+        self._context_window = ContextWindow(
+            budget_tokens=settings.context_budget_tokens,
+            keep_recent_turns=settings.context_keep_recent_turns,
+        )
+        # One AsyncSession per unit of work; sessions are never shared across tasks
+        self._session_factory = session_factory
+        self._vote_buffer: VoteBuffer | None = None
+        if session_factory:
+            self._vote_buffer = VoteBuffer(
+                session_factory,
+                flush_interval_ms=settings.vote_flush_interval_ms,
+                max_batch=settings.vote_flush_max_batch,
+            )
+        # Claims and live events shared with other API workers (see state_backend.py)
+        self._state_backend = state_backend or InProcessStateBackend()
+        self._follow_task: asyncio.Task | None = None
+        # Live stream fan-out for battles running in this worker
+        self._hubs = BattleHubs(
+            replay_size=settings.stream_replay_events,
+            retention_seconds=settings.stream_hub_retention_seconds,
+        )
+        self._run_tasks: set[asyncio.Task] = set()
+        # Vote-based Elo ratings; every worker applies every vote (see save_vote)
+        self._leaderboard = Leaderboard(settings.leaderboard_k_factor, settings.leaderboard_initial_rating)
+        self._checkpoint_seconds = settings.leaderboard_checkpoint_seconds
+        self._checkpoint_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Connect the state backend, follow other workers' changes and load the leaderboard"""
+        if self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep_battles())
+        await self._state_backend.start()
+        if self._state_backend.shared and self._follow_task is None:
+            self._follow_task = asyncio.create_task(self._follow_remote_events())
+        if self._session_factory and self._checkpoint_task is None:
+            await self._load_leaderboard()
+            self._checkpoint_task = asyncio.create_task(self._checkpoint_leaderboard())
+
+    @property
+    def llm_service(self) -> LLMService:
+        """Provider clients and schedulers, shared with other services that call providers"""
+        return self._llm_service
+
+    async def warmup(self) -> None:
+        """Pre-open provider connections and load the tokenizer (called from main.py at startup)"""
+        await asyncio.gather(self._llm_service.warmup(), asyncio.to_thread(load_encoding))
+
+    async def aclose(self) -> None:
+        """Flush buffered votes and release provider connection pools"""
+        if self._sweep_task:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+        if self._follow_task:
+            self._follow_task.cancel()
+            self._follow_task = None
+        await self._state_backend.aclose()
+        if self._vote_buffer:
+            await self._vote_buffer.close()
+        if self._checkpoint_task:
+            self._checkpoint_task.cancel()
+            self._checkpoint_task = None
+            await self._save_leaderboard()
+        await self._llm_service.aclose()
+
+    async def create_battle(self, request: BattleRequest) -> BattleState:
         """Create a new battle from request"""
         config = BattleConfig(
             topic=request.topic,
             mode=request.mode,
             language=request.language,
             rounds=request.rounds,
+            round_mode=request.round_mode,
+            cache_mode=request.cache_mode,
             llms=request.llms,
         )
         state = BattleState(config=config)
-        self._battles[state.id] = state
+        await self._cache_battle(state)
+        # Persist right away so the battle shows up in the database-backed listing. The shared
+        # backend claims battles by their row, so there a battle that could not be saved is an error.
+        if not await self.save_battle(state) and self._state_backend.shared:
+            self._battles.discard(state.id)
+            raise BattleNotPersistedError(f"Battle {state.id} could not be saved to the database")
         return state
 
-    def get_battle(self, battle_id: str) -> BattleState | None:
+    async def get_battle(self, battle_id: str) -> BattleState | None:
         """Get battle state by ID - checks memory first, then database"""
         # Check memory first (for active battles)
+        state = self._battles.get(battle_id)
+        if state:
+            return state
         if battle_id in self._battles:
-            return self._battles[battle_id]
+            await self._expire_battles()  # Expired: saved and dropped, then reloaded below
 
-        # Check database if session available
-        if self._db_session:
-            db_battle = self._db_session.query(Battle).filter(Battle.id == battle_id).first()
-            if db_battle:
-                return self._battle_from_db(db_battle)
+        # Check database if configured; reloaded battles go back in the cache
+        state = await self._load_battle(battle_id)
+        if state:
+            await self._cache_battle(state)
+        return state
 
-        return None
+    async def _load_battle(self, battle_id: str) -> BattleState | None:
+        """Read a battle from the database, bypassing the cache"""
+        if not self._session_factory:
+            return None
+        async with self._session("load_battle") as session:
+            db_battle = await session.get(Battle, battle_id)
+            if not db_battle:
+                return None
+            messages = await self._load_messages(session, [db_battle])
+            return self._battle_from_db(db_battle, messages[battle_id])
+
+    async def claim_battle(self, state: BattleState) -> bool:
+        """
+        Move a pending battle to IN_PROGRESS; False if it is not pending or
+        another worker claimed it first. Exactly one caller gets True.
+        Raises BattleNotPersistedError if the shared backend has no row for it.
+        """
+        if state.status != BattleStatus.PENDING:
+            return False
+        # Set before awaiting so a concurrent claim in this worker sees it
+        state.status = BattleStatus.IN_PROGRESS
+        try:
+            claimed = await self._state_backend.claim(state.id)
+        except BattleNotPersistedError:
+            state.status = BattleStatus.PENDING
+            raise
+        if not claimed:
+            state.status = BattleStatus.PENDING
+            self._battles.discard(state.id)  # Stale: reload the winner's progress from the database
+            return False
+        await self._publish_status(state)
+        return True
+
+    def subscribe(self, battle_id: str | None = None):
+        """Live StateEvents for a battle (or all battles), from any worker"""
+        return self._state_backend.subscribe(battle_id)
+
+    def start_battle_run(self, battle_id: str) -> BattleHub:
+        """
+        Run a claimed battle in the background, streaming tokens into a hub
+        that any number of viewers can watch (see watch_battle).
+        """
+        hub = self._hubs.create(battle_id)
+
+        async def run() -> None:
+            try:
+                async for event in self.run_battle_streaming(battle_id, stream_tokens=True):
+                    hub.publish(event)
+                hub.finish()
+            except Exception as e:
+                hub.finish(error=str(e))
+            finally:
+                self._hubs.retire(hub)
+
+        task = asyncio.create_task(run())
+        self._run_tasks.add(task)
+        task.add_done_callback(self._run_tasks.discard)
+        return hub
+
+    async def watch_battle(self, battle_id: str, after: EventKey | None = None) -> AsyncGenerator[HubEvent, None]:
+        """
+        Stream a battle's events after `after` (a parsed Last-Event-ID) until it ends.
+
+        Battles running in this worker stream token by token from their hub.
+        Otherwise (running on another worker, or finished) stored messages are
+        replayed and new ones followed through the state backend, one whole
+        message_end per turn. Raises RuntimeError if the battle errored.
+        """
+        hub = self._hubs.get(battle_id)
+        if hub:
+            async for event in hub.subscribe(after):
+                yield event
+            if hub.error:
+                raise RuntimeError(hub.error)
+            return
 
-    def _battle_from_db(self, db_battle: Battle) -> BattleState:
+        cursor = after or START
+        sent = cursor[0] + 1 if cursor[1] == FINAL else cursor[0]
+        async with self._state_backend.subscribe(battle_id) as updates:
+            state = await self.get_battle(battle_id)
+            if not state:
+                raise ValueError(f"Battle not found: {battle_id}")
+            messages, status, error = list(state.messages), state.status, state.error_message
+            while True:
+                for seq in range(sent, len(messages)):
+                    yield HubEvent(format_event_id((seq, FINAL)), self._message_end(messages[seq]))
+                sent = max(sent, len(messages))
+                if status == BattleStatus.COMPLETED:
+                    return
+                if status == BattleStatus.ERROR:
+                    raise RuntimeError(error or "Battle failed")
+
+                payload = (await updates.get()).payload
+                if payload["type"] == "message" and payload["seq"] == len(messages):
+                    messages.append(BattleMessage(**payload["message"]))
+                    continue
+                if payload["type"] == "vote":
+                    continue
+                # Status change, oversized NOTIFY or a missed message: re-read the source of truth
+                fresh = await self._load_battle(battle_id) or await self.get_battle(battle_id)
+                messages, status, error = list(fresh.messages), fresh.status, fresh.error_message
+
+    @staticmethod
+    def _message_end(message: BattleMessage) -> BattleEvent:
+        return BattleEvent(
+            type=BattleEventType.MESSAGE_END,
+            provider=message.provider,
+            name=message.name,
+            round_number=message.round_number,
+            content=message.content,
+        )
+
+    def get_hub_stats(self) -> dict[str, int]:
+        """Live battle hubs and their subscribers in this worker"""
+        return self._hubs.stats()
+
+    def get_dependency_checks(self) -> dict[str, str]:
+        """Database and state backend status for /health (ok, disabled or down)"""
+        return {
+            "database": "ok" if self._session_factory else "disabled",
+            "state_backend": "ok" if self._state_backend.connected else "down",
+        }
+
+    def get_state_backend_stats(self) -> dict:
+        """State backend kind, subscribers and event counters"""
+        return self._state_backend.stats()
+
+    async def _publish_status(self, state: BattleState) -> None:
+        await self._state_backend.publish(state.id, {
+            "type": "status",
+            "status": state.status.value,
+            "current_round": state.current_round,
+            "error_message": state.error_message,
+        })
+
+    async def _follow_remote_events(self) -> None:
+        """
+        Drop battles changed by another worker from the cache (the next read
+        reloads them) and apply its votes to the leaderboard
+        """
+        async with self._state_backend.subscribe() as events:
+            while True:
+                event = await events.get()
+                if not event.remote:
+                    continue
+                if event.payload["type"] == "vote":
+                    participants = [tuple(seat) for seat in event.payload["participants"]]
+                    self._record_vote(event.payload["provider"], participants)
+                else:
+                    self._battles.discard(event.battle_id)
+
+    async def _load_leaderboard(self) -> None:
+        """Restore the last checkpoint, or replay the votes table if there is none yet"""
+        try:
+            if not await self._leaderboard.load(self._session_factory):
+                await rebuild_leaderboard(self._session_factory, self._leaderboard)
+                await self._leaderboard.checkpoint(self._session_factory)
+            print(f"✅ Leaderboard loaded: {self._leaderboard.stats()}")
+        except Exception as e:
+            print(f"⚠️  Leaderboard load failed (starting from initial ratings): {e}")
+
+    async def _checkpoint_leaderboard(self) -> None:
+        """
+        Checkpoint the ratings now and then, and reload the table to catch up
+        on votes whose events this worker missed (e.g. while disconnected)
+        """
+        while True:
+            await asyncio.sleep(self._checkpoint_seconds)
+            await self._save_leaderboard()
+            try:
+                with DB_OPERATION_SECONDS.time(operation="load_leaderboard"):
+                    await self._leaderboard.load(self._session_factory)
+            except Exception as e:
+                print(f"Error reloading leaderboard: {e}")
+
+    async def _save_leaderboard(self) -> None:
+        if not self._leaderboard.dirty:
+            return
+        try:
+            with DB_OPERATION_SECONDS.time(operation="checkpoint_leaderboard"):
+                await self._leaderboard.checkpoint(self._session_factory)
+        except Exception as e:
+            print(f"Error checkpointing leaderboard: {e}")
+
+    def _record_vote(self, provider: str, participants: list[tuple[str, str]]) -> None:
+        """Apply a committed vote to the leaderboard; a failure here never loses the vote itself"""
+        try:
+            self._leaderboard.record_vote(provider, participants)
+        except Exception as e:
+            print(f"Error updating leaderboard: {e}")
+
+    def get_leaderboard(self) -> LeaderboardResponse:
+        """Precomputed provider and persona ratings, best first"""
+        return self._leaderboard.view()
+
+    def get_leaderboard_stats(self) -> dict[str, int]:
+        """Votes applied and number of rated providers/personas"""
+        return self._leaderboard.stats()
+
+    @asynccontextmanager
+    async def _session(self, operation: str) -> AsyncIterator[AsyncSession]:
+        """One unit-of-work session, timed as a DB operation"""
+        with DB_OPERATION_SECONDS.time(operation=operation):
+            async with self._session_factory() as session:
+                yield session
+
+    async def _cache_battle(self, state: BattleState) -> None:
+        """Add a battle to the memory store, persisting anything it evicts"""
+        for evicted in self._battles.put(state):
+            await self.save_battle(evicted)
+
+    async def _expire_battles(self) -> None:
+        """Drop battles idle for longer than the store's TTL, persisting them first"""
+        for expired in self._battles.expire():
+            await self.save_battle(expired)
+
+    async def _sweep_battles(self) -> None:
+        while True:
+            await asyncio.sleep(self._sweep_seconds)
+            try:
+                await self._expire_battles()
+            except Exception as e:
+                print(f"Error expiring battles: {e}")
+
+    def get_store_stats(self) -> dict[str, int]:
+        """Battle store size, hit and eviction counters"""
+        return self._battles.stats()
+
+    def get_token_usage(self) -> dict[str, dict[str, int]]:
+        """Per-provider token usage, including prompt-cache hits"""
+        return self._llm_service.get_usage_stats()
+
+    def get_early_stop_stats(self) -> dict[str, dict[str, float]]:
+        """Per-provider turns stopped at the sentence/emoji limit and what that saved"""
+        return self._llm_service.get_early_stop_stats()
+
+    def get_cache_stats(self) -> dict[str, int]:
+        """LLM response cache size and hit counters"""
+        return self._llm_service.get_cache_stats()
+
+    def get_scheduler_stats(self) -> dict[str, dict[str, float]]:
+        """Per-provider queue depth, retry and wait-time metrics"""
+        return self._llm_service.get_scheduler_stats()
+
+    async def _load_messages(
+        self, session: AsyncSession, db_battles: list[Battle]
+    ) -> dict[str, list[BattleMessage]]:
+        """Load messages from battle_messages, falling back to the legacy JSON column"""
+        battle_ids = [db_battle.id for db_battle in db_battles]
+        messages: dict[str, list[BattleMessage]] = {battle_id: [] for battle_id in battle_ids}
+        rows = await session.scalars(
+            select(BattleMessageRow)
+            .where(BattleMessageRow.battle_id.in_(battle_ids))
+            .order_by(BattleMessageRow.battle_id, BattleMessageRow.seq)
+        )
+        for row in rows:
+            messages[row.battle_id].append(
+                BattleMessage(
+                    provider=row.provider,
+                    name=row.name,
+                    content=row.content,
+                    round_number=row.round_number,
+                )
+            )
+
+        # Battles saved before battle_messages existed and not yet backfilled
+        for db_battle in db_battles:
+            if not messages[db_battle.id] and db_battle.messages:
+                messages[db_battle.id] = [BattleMessage(**msg) for msg in db_battle.messages]
+        return messages
+
+    def _battle_from_db(
+        self, db_battle: Battle, messages: list[BattleMessage] | None = None
+    ) -> BattleState:
         """Convert database Battle to BattleState"""
         config_dict = db_battle.config
         config = BattleConfig(**config_dict)
 
-        messages = [BattleMessage(**msg) for msg in db_battle.messages]
-
         state = BattleState(
             id=db_battle.id,
             config=config,
-            messages=messages,
+            messages=messages or [],
             current_round=int(db_battle.current_round),
             status=BattleStatus(db_battle.status),
             error_message=db_battle.error_message,
+            created_at=db_battle.created_at,
+            context_tokens_saved=db_battle.context_tokens_saved or 0,
         )
         return state
 
-    def save_battle(self, state: BattleState) -> None:
-        """Save battle to database"""
-        if not self._db_session:
-            return
+    async def save_battle(self, state: BattleState) -> bool:
+        """Save battle to database; False if there is none or the write failed"""
+        if not self._session_factory:
+            return False
+
+        async with self._session("save_battle") as session:
+            try:
+                await self._write_battle(session, state)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                print(f"Error saving battle to database: {e}")
+                return False
+        return True
+
+    async def _write_battle(self, session: AsyncSession, state: BattleState) -> None:
+        """Upsert the battle row within the caller's session (messages are appended per turn)"""
+        db_battle = await session.get(Battle, state.id)
+
+        battle_data = {
+            "id": state.id,
+            "config": state.config.model_dump(),
+            "status": state.status.value,
+            "language": state.config.language.value,
+            "current_round": str(state.current_round),
+            "error_message": state.error_message,
+            "created_at": state.created_at,
+            "context_tokens_saved": state.context_tokens_saved,
+        }
 
-        try:
-            db_battle = self._db_session.query(Battle).filter(Battle.id == state.id).first()
-
-            battle_data = {
-                "id": state.id,
-                "config": state.config.model_dump(),
-                "messages": [msg.model_dump() for msg in state.messages],
-                "status": state.status.value,
-                "current_round": str(state.current_round),
-                "error_message": state.error_message,
-            }
+        if db_battle:
+            # Update existing
+            for key, value in battle_data.items():
+                setattr(db_battle, key, value)
+        else:
+            # Create new
+            session.add(Battle(**battle_data, messages=[]))
+            await session.flush()
+            await session.execute(
+                insert(BattleParticipant), participant_rows(state.id, battle_data["config"])
+            )
+            if state.messages:
+                await session.execute(
+                    insert(BattleMessageRow),
+                    [self._message_row(state.id, seq, msg) for seq, msg in enumerate(state.messages)],
+                )
+
+    @staticmethod
+    def _message_row(battle_id: str, seq: int, message: BattleMessage) -> dict:
+        return {"battle_id": battle_id, "seq": seq, **message.model_dump(mode="json")}
+
+    async def _add_message(self, state: BattleState, message: BattleMessage) -> None:
+        """Append a turn to the battle, persist just that turn and publish it"""
+        seq = len(state.messages)
+        state.messages.append(message)
+        if self._session_factory:
+            await self._persist_message(state, seq, message)
+        await self._state_backend.publish(state.id, {
+            "type": "message", "seq": seq, "message": message.model_dump(mode="json"),
+        })
+
+    async def _persist_message(self, state: BattleState, seq: int, message: BattleMessage) -> None:
+        """Insert one turn and bump the battle's progress columns"""
+        async with self._session("add_message") as session:
+            try:
+                await session.execute(insert(BattleMessageRow).values(self._message_row(state.id, seq, message)))
+                await session.execute(
+                    update(Battle)
+                    .where(Battle.id == state.id)
+                    .values(
+                        status=state.status.value,
+                        current_round=str(state.current_round),
+                        context_tokens_saved=state.context_tokens_saved,
+                    )
+                )
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                print(f"Error saving battle message to database: {e}")
+
+    async def _clear_messages(self, state: BattleState) -> None:
+        """Drop a battle's turns before it is re-run"""
+        state.messages = []
+        if not self._session_factory:
+            return
 
-            if db_battle:
-                # Update existing
-                for key, value in battle_data.items():
-                    setattr(db_battle, key, value)
-            else:
-                # Create new
-                db_battle = Battle(**battle_data)
-                self._db_session.add(db_battle)
-
-            self._db_session.commit()
-        except Exception as e:
-            self._db_session.rollback()
-            print(f"Error saving battle to database: {e}")
+        async with self._session("clear_messages") as session:
+            try:
+                await session.execute(delete(BattleMessageRow).where(BattleMessageRow.battle_id == state.id))
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                print(f"Error clearing battle messages in database: {e}")
 
-    def get_battle_config(self, battle_id: str) -> BattleConfig | None:
+    async def get_battle_config(self, battle_id: str) -> BattleConfig | None:
         """Get battle config for replay (from database)"""
-        if not self._db_session:
+        if not self._session_factory:
             return None
 
-        db_battle = self._db_session.query(Battle).filter(Battle.id == battle_id).first()
-        if db_battle:
-            return BattleConfig(**db_battle.config)
+        async with self._session("load_config") as session:
+            db_battle = await session.get(Battle, battle_id)
+            if db_battle:
+                return BattleConfig(**db_battle.config)
         return None
 
     def get_battle_response(self, state: BattleState) -> BattleResponse:
@@ -125,15 +583,85 @@ class BattleService:
             total_rounds=state.config.rounds,
             messages=state.messages,
             error_message=state.error_message,
+            created_at=state.created_at,
+            context_tokens_saved=state.context_tokens_saved,
         )
 
+    async def list_battles(
+        self,
+        limit: int = 20,
+        cursor: str | None = None,
+        status: BattleStatus | None = None,
+        provider: LLMProvider | None = None,
+        language: Language | None = None,
+        include_messages: bool = True,
+    ) -> BattlePage:
+        """
+        List battles newest-first with keyset pagination on (created_at, id).
+
+        Served from the database when configured (each page is an index range
+        scan), otherwise from the in-memory store. Battles still cached in
+        memory are returned in their live state.
+        """
+        after = _decode_cursor(cursor) if cursor else None
+
+        if self._session_factory:
+            query = select(Battle)
+            if not include_messages:
+                query = query.options(defer(Battle.messages))
+            if after:
+                query = query.where(tuple_(Battle.created_at, Battle.id) < tuple_(*after))
+            if status:
+                query = query.where(Battle.status == status.value)
+            if language:
+                query = query.where(Battle.language == language.value)
+            if provider:
+                query = query.where(
+                    exists().where(
+                        BattleParticipant.battle_id == Battle.id,
+                        BattleParticipant.provider == provider.value,
+                    )
+                )
+            query = query.order_by(Battle.created_at.desc(), Battle.id.desc()).limit(limit + 1)
+
+            async with self._session("list_battles") as session:
+                db_battles = (await session.scalars(query)).all()
+                uncached = [db_battle for db_battle in db_battles if not self._battles.peek(db_battle.id)]
+                messages = await self._load_messages(session, uncached) if include_messages else {}
+                states = [
+                    self._battles.peek(db_battle.id)
+                    or self._battle_from_db(db_battle, messages.get(db_battle.id))
+                    for db_battle in db_battles
+                ]
+        else:
+            states = sorted(self._battles.values(), key=lambda st: (st.created_at, st.id), reverse=True)
+            states = [
+                st
+                for st in states
+                if (not after or (st.created_at, st.id) < after)
+                and (not status or st.status == status)
+                and (not language or st.config.language == language)
+                and (not provider or any(llm.provider == provider for llm in st.config.llms))
+            ][: limit + 1]
+
+        next_cursor = None
+        if len(states) > limit:
+            states = states[:limit]
+            next_cursor = _encode_cursor(states[-1].created_at, states[-1].id)
+
+        items = [self.get_battle_response(state) for state in states]
+        if not include_messages:
+            items = [item.model_copy(update={"messages": []}) for item in items]
+        return BattlePage(items=items, next_cursor=next_cursor)
+
     async def run_battle(self, battle_id: str) -> BattleState:
         """Run a complete battle (all rounds). One Galileo session per battle."""
-        state = self._battles.get(battle_id)
+        state = await self.get_battle(battle_id)
         if not state:
             raise ValueError(f"Battle not found: {battle_id}")
 
-        galileo_context.start_session(name=f"Battle {battle_id}")
+        trace_session.set(f"Battle {battle_id}")
+        BATTLES_ACTIVE.inc()
         try:
             state.status = BattleStatus.IN_PROGRESS
             for round_num in range(1, state.config.rounds + 1):
@@ -141,29 +669,42 @@ class BattleService:
                 await self._run_round(state, round_num)
 
             state.status = BattleStatus.COMPLETED
-            self.save_battle(state)
+            await self.save_battle(state)
+            await self._publish_status(state)
         except Exception as e:
             state.status = BattleStatus.ERROR
             state.error_message = str(e)
-            self.save_battle(state)
+            BATTLE_ERRORS_TOTAL.inc()
+            await self.save_battle(state)
+            await self._publish_status(state)
         finally:
-            galileo_context.clear_session()
+            trace_session.set(None)
+            BATTLES_ACTIVE.dec()
 
         return state
 
     async def run_battle_streaming(
         self,
         battle_id: str,
-    ) -> AsyncGenerator[BattleMessage, None]:
-        """Run battle and yield messages as they're generated. One Galileo session per battle."""
+        stream_tokens: bool = False,
+    ) -> AsyncGenerator[BattleMessage | BattleEvent, None]:
+        """
+        Run battle and yield messages as they're generated. One Galileo session per battle.
+
+        With stream_tokens, yields message_start/delta/message_end BattleEvents
+        instead of whole BattleMessages. Generation is not paced; wrap the
+        generator in a DeliveryScheduler to control viewer-facing timing.
+        """
         print(f"🎬 Starting battle streaming for: {battle_id}")
-        state = self._battles.get(battle_id)
+        state = await self.get_battle(battle_id)
         if not state:
             raise ValueError(f"Battle not found: {battle_id}")
 
-        galileo_context.start_session(name=f"Battle {battle_id}")
+        trace_session.set(f"Battle {battle_id}")
+        BATTLES_ACTIVE.inc()
         try:
-            state.messages = []
+            if state.messages:
+                await self._clear_messages(state)
             state.status = BattleStatus.IN_PROGRESS
             state.current_round = 0
             state.error_message = None
@@ -173,6 +714,19 @@ class BattleService:
                 print(f"🔄 Starting round {round_num}/{state.config.rounds}")
                 state.current_round = round_num
 
+                if stream_tokens:
+                    async for event in self._stream_round(state, round_num):
+                        yield event
+                    continue
+
+                if state.config.round_mode == RoundMode.SIMULTANEOUS:
+                    print(f"🤖 [Round {round_num}] Generating all responses concurrently...")
+                    for message in await self._generate_simultaneous_round(state, round_num):
+                        await self._add_message(state, message)
+                        print(f"📤 [Round {round_num}] Yielding message from {message.provider} (round_number={message.round_number})...")
+                        yield message
+                    continue
+
                 for llm_config in state.config.llms:
                     print(f"🤖 [Round {round_num}] Generating response for {llm_config.provider}...")
                     print(f"   Current state: round={state.current_round}, messages_count={len(state.messages)}")
@@ -183,21 +737,23 @@ class BattleService:
                     message = self._create_message(llm_config, response, round_num)
                     print(f"   Created message: provider={message.provider}, round={message.round_number}")
 
-                    state.messages.append(message)
+                    await self._add_message(state, message)
                     print(f"📤 [Round {round_num}] Yielding message from {llm_config.provider} (round_number={message.round_number})...")
                     yield message
 
-                    await asyncio.sleep(2.0)
-
             state.status = BattleStatus.COMPLETED
-            self.save_battle(state)
+            await self.save_battle(state)
+            await self._publish_status(state)
         except Exception as e:
             state.status = BattleStatus.ERROR
             state.error_message = str(e)
-            self.save_battle(state)
+            BATTLE_ERRORS_TOTAL.inc()
+            await self.save_battle(state)
+            await self._publish_status(state)
             raise
         finally:
-            galileo_context.clear_session()
+            trace_session.set(None)
+            BATTLES_ACTIVE.dec()
 
     def _create_message(
         self, llm_config: LLMConfig, content: str, round_num: int
@@ -211,62 +767,180 @@ class BattleService:
         )
 
     async def _generate_llm_response(
-        self, state: BattleState, llm_config: LLMConfig, round_num: int
+        self,
+        state: BattleState,
+        llm_config: LLMConfig,
+        round_num: int,
+        history: list[BattleMessage] | None = None,
     ) -> str:
         """Generate response from an LLM"""
         # Pass a copy of messages to ensure each LLM sees the conversation as it was
         # at the time of the call, preventing race conditions
-        conversation_history = state.messages.copy()
+        window = self._context_window.fit((state.messages if history is None else history).copy())
+        state.context_tokens_saved += window.tokens_saved
         return await self._llm_service.generate_response(
             provider=llm_config.provider,
             persona=llm_config.persona,
             message=state.config.topic,
             mode=state.config.mode,
             language=state.config.language,
-            conversation_history=conversation_history,
+            conversation_history=window.messages,
             current_round=round_num,
             total_rounds=state.config.rounds,
+            cache_mode=state.config.cache_mode,
+            history_summary=window.summary,
         )
 
+    async def _generate_simultaneous_round(
+        self, state: BattleState, round_num: int
+    ) -> list[BattleMessage]:
+        """Generate every participant's turn concurrently from the previous round's history"""
+        history = state.messages.copy()
+        responses = await asyncio.gather(
+            *(
+                self._generate_llm_response(state, llm_config, round_num, history)
+                for llm_config in state.config.llms
+            )
+        )
+        # gather preserves argument order, so messages follow participant order
+        return [
+            self._create_message(llm_config, response, round_num)
+            for llm_config, response in zip(state.config.llms, responses)
+        ]
+
+    async def _stream_turn(
+        self,
+        state: BattleState,
+        llm_config: LLMConfig,
+        round_num: int,
+        history: list[BattleMessage],
+    ) -> AsyncGenerator[BattleEvent, None]:
+        """Stream one LLM turn as events; message_end carries the assembled content"""
+        event_fields = {
+            "provider": llm_config.provider,
+            "name": llm_config.name,
+            "round_number": round_num,
+        }
+        yield BattleEvent(type=BattleEventType.MESSAGE_START, **event_fields)
+
+        window = self._context_window.fit(history.copy())
+        state.context_tokens_saved += window.tokens_saved
+        parts: list[str] = []
+        async for delta in self._llm_service.generate_response_stream(
+            provider=llm_config.provider,
+            persona=llm_config.persona,
+            message=state.config.topic,
+            mode=state.config.mode,
+            language=state.config.language,
+            conversation_history=window.messages,
+            current_round=round_num,
+            total_rounds=state.config.rounds,
+            cache_mode=state.config.cache_mode,
+            history_summary=window.summary,
+        ):
+            parts.append(delta)
+            yield BattleEvent(type=BattleEventType.DELTA, delta=delta, **event_fields)
+
+        yield BattleEvent(type=BattleEventType.MESSAGE_END, content="".join(parts), **event_fields)
+
+    async def _stream_round(
+        self, state: BattleState, round_num: int
+    ) -> AsyncGenerator[BattleEvent, None]:
+        """
+        Stream a round's turns as events, appending each message to state.
+
+        In simultaneous mode all turns are generated concurrently; the first
+        participant streams live and the others replay from their buffers, so
+        events and stored messages keep participant order.
+        """
+        if state.config.round_mode != RoundMode.SIMULTANEOUS:
+            for llm_config in state.config.llms:
+                print(f"🤖 [Round {round_num}] Streaming response for {llm_config.provider}...")
+                async for event in self._stream_turn(state, llm_config, round_num, state.messages):
+                    if event.type == BattleEventType.MESSAGE_END:
+                        await self._add_message(state, self._create_message(llm_config, event.content, round_num))
+                    yield event
+            return
+
+        print(f"🤖 [Round {round_num}] Streaming all responses concurrently...")
+        history = state.messages.copy()
+        queues: list[asyncio.Queue] = [asyncio.Queue() for _ in state.config.llms]
+
+        async def pump(llm_config: LLMConfig, queue: asyncio.Queue) -> None:
+            try:
+                async for event in self._stream_turn(state, llm_config, round_num, history):
+                    await queue.put(event)
+            except Exception as e:
+                await queue.put(e)
+
+        tasks = [
+            asyncio.create_task(pump(llm_config, queue))
+            for llm_config, queue in zip(state.config.llms, queues)
+        ]
+        try:
+            for llm_config, queue in zip(state.config.llms, queues):
+                while True:
+                    event = await queue.get()
+                    if isinstance(event, Exception):
+                        raise event
+                    if event.type == BattleEventType.MESSAGE_END:
+                        await self._add_message(state, self._create_message(llm_config, event.content, round_num))
+                    yield event
+                    if event.type == BattleEventType.MESSAGE_END:
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def _run_round(self, state: BattleState, round_num: int) -> None:
-        """Run a single round - each LLM responds once"""
+        """Run a single round - each LLM responds once (concurrently in simultaneous mode)"""
+        if state.config.round_mode == RoundMode.SIMULTANEOUS:
+            for message in await self._generate_simultaneous_round(state, round_num):
+                await self._add_message(state, message)
+            return
+
         for llm_config in state.config.llms:
             response = await self._generate_llm_response(state, llm_config, round_num)
             message = self._create_message(llm_config, response, round_num)
-            state.messages.append(message)
-
-    def get_all_battles(self) -> list[BattleResponse]:
-        """Get all battles as responses"""
-        return [self.get_battle_response(state) for state in self._battles.values()]
+            await self._add_message(state, message)
 
     def clear_battles(self) -> None:
         """Clear all battles (for testing)"""
         self._battles.clear()
 
-    def save_vote(self, battle_id: str, provider: str) -> None:
-        """Save a vote for a battle"""
-        if not self._db_session:
-            return
+    async def save_vote(self, battle_id: str, provider: str) -> None:
+        """
+        Save a vote for a battle (group-committed with concurrent votes) and,
+        once it is committed, apply it to the leaderboard here and, through
+        the state backend, in every other worker
+        """
+        if self._vote_buffer:
+            await self._vote_buffer.add(battle_id, provider)
 
-        try:
-            vote = Vote(battle_id=battle_id, provider=provider)
-            self._db_session.add(vote)
-            self._db_session.commit()
-        except Exception as e:
-            self._db_session.rollback()
-            print(f"Error saving vote to database: {e}")
-            raise
-
-    def get_vote_counts(self, battle_id: str) -> dict[str, int]:
-        """Get vote counts for a battle by provider"""
+        state = await self.get_battle(battle_id)
+        if not state:
+            return
+        participants = [(llm.provider.value, llm.persona) for llm in state.config.llms]
+        self._record_vote(provider, participants)
+        await self._state_backend.publish(battle_id, {
+            "type": "vote",
+            "provider": provider,
+            "participants": participants,
+        })
+
+    async def get_vote_counts(self, battle_id: str) -> dict[str, int]:
+        """Get vote counts for a battle by provider (from the vote_counts table)"""
         default_counts = {"openai": 0, "claude": 0, "grok": 0}
 
-        if not self._db_session:
+        if not self._session_factory:
             return default_counts
 
         try:
-            votes = self._db_session.query(Vote).filter(Vote.battle_id == battle_id).all()
-            counts = Counter(vote.provider for vote in votes)
+            async with self._session("vote_counts") as session:
+                result = await session.execute(
+                    select(VoteCount.provider, VoteCount.count).where(VoteCount.battle_id == battle_id)
+                )
+                counts = {provider: count for provider, count in result.all()}
             return {**default_counts, **counts}
         except Exception as e:
             print(f"Error getting vote counts from database: {e}")
@@ -0,0 +1,107 @@
+"""
+Battle Store - Bounded in-memory cache of battle states with LRU + TTL eviction
+"""
+
+import time
+from collections import OrderedDict
+
+from ..models.battle import BattleState, BattleStatus
+
+
+class BattleStore:
+    """
+    LRU + TTL cache for BattleState.
+
+    Holds at most `max_size` battles; entries idle for longer than
+    `ttl_seconds` expire: get() treats them as misses, and they are dropped
+    by the next put() or expire(). IN_PROGRESS battles are never evicted, so the store
+    may briefly exceed max_size while many battles are running; the battle
+    being inserted is never evicted by its own insert. Evicted
+    states are returned to the caller so it can persist them.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 3600) -> None:
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[BattleState, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, battle_id: str) -> bool:
+        return battle_id in self._entries
+
+    def get(self, battle_id: str) -> BattleState | None:
+        """Return a cached battle and mark it as recently used (an expired one is a miss)"""
+        entry = self._entries.get(battle_id)
+        now = time.monotonic()
+        if entry is None or self._expired(*entry, now):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        state, _ = entry
+        self._entries[battle_id] = (state, now)
+        self._entries.move_to_end(battle_id)
+        return state
+
+    def peek(self, battle_id: str) -> BattleState | None:
+        """Return a cached battle without touching recency or counters"""
+        entry = self._entries.get(battle_id)
+        return entry[0] if entry else None
+
+    def put(self, state: BattleState) -> list[BattleState]:
+        """Cache a battle; returns the battles evicted to make room"""
+        self._entries[state.id] = (state, time.monotonic())
+        self._entries.move_to_end(state.id)
+        return self._evict(keep=state.id)
+
+    def expire(self) -> list[BattleState]:
+        """Drop battles idle for longer than the TTL; returns them so the caller can persist them"""
+        return self._evict(enforce_size=False)
+
+    def discard(self, battle_id: str) -> None:
+        """Forget a battle (e.g. changed by another worker) so the next get reloads it"""
+        self._entries.pop(battle_id, None)
+
+    def values(self) -> list[BattleState]:
+        return [state for state, _ in self._entries.values()]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _expired(self, state: BattleState, last_access: float, now: float) -> bool:
+        return state.status != BattleStatus.IN_PROGRESS and now - last_access > self._ttl_seconds
+
+    def _evict(self, keep: str | None = None, enforce_size: bool = True) -> list[BattleState]:
+        """Drop expired battles, then (if enforce_size) least recently used ones over capacity; never `keep`"""
+        now = time.monotonic()
+        evicted: list[BattleState] = []
+        overflow = len(self._entries) - self._max_size if enforce_size else 0
+
+        # Entries are in access order, so scanning stops at the first live one
+        # once capacity is satisfied; IN_PROGRESS battles are skipped in place
+        for state, last_access in self._entries.values():
+            if state.status == BattleStatus.IN_PROGRESS or state.id == keep:
+                continue
+            if not self._expired(state, last_access, now) and overflow <= 0:
+                break
+            evicted.append(state)
+            overflow -= 1
+
+        for state in evicted:
+            del self._entries[state.id]
+        self.evictions += len(evicted)
+        return evicted
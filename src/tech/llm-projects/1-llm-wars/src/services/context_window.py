@@ -0,0 +1,93 @@
+"""
+Context Window - Token-budgeted conversation history for LLM turns
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+from ..models.battle import BattleMessage
+
+# Shared by gpt-4o and close enough for Claude and Grok, whose tokenizers aren't public
+ENCODING_NAME = "o200k_base"
+SUMMARY_LINE_MAX_CHARS = 120
+
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s")
+
+
+@lru_cache(maxsize=1)
+def load_encoding():
+    """tiktoken encoding, or None if tiktoken or its BPE file is unavailable (offline)"""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception as e:
+        print(f"⚠️  tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    encoding = load_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+def format_turn(message: BattleMessage) -> str:
+    """How a past turn is shown to the model"""
+    return f"[{message.name}]: {message.content}"
+
+
+@lru_cache(maxsize=4096)
+def _summary_line(name: str, round_number: int, content: str) -> str:
+    """First sentence of a turn, truncated; cached because old turns recur every turn"""
+    first = _SENTENCE_END.split(content.strip(), maxsplit=1)[0]
+    if len(first) > SUMMARY_LINE_MAX_CHARS:
+        first = first[: SUMMARY_LINE_MAX_CHARS - 1].rstrip() + "…"
+    return f"- {name} (round {round_number}): {first}"
+
+
+class WindowedHistory(NamedTuple):
+    """History to send verbatim, a digest of what was collapsed, and the tokens saved"""
+
+    messages: list[BattleMessage]
+    summary: str | None
+    tokens_saved: int
+
+
+class ContextWindow:
+    """
+    Keeps conversation history within `budget_tokens`.
+
+    Under budget, history is sent unchanged. Over budget, the latest
+    `keep_recent_turns` turns stay verbatim and older turns collapse into
+    a one-line-per-turn summary; if that is still too long, the oldest
+    summary lines are dropped. Recent turns are never cut.
+    """
+
+    SUMMARY_HEADER = "Earlier in the debate (summarized):"
+
+    def __init__(self, budget_tokens: int = 1000, keep_recent_turns: int = 6) -> None:
+        self._budget_tokens = budget_tokens
+        self._keep_recent_turns = max(keep_recent_turns, 1)
+
+    def fit(self, history: list[BattleMessage]) -> WindowedHistory:
+        full_tokens = sum(count_tokens(format_turn(m)) for m in history)
+        if self._budget_tokens <= 0 or full_tokens <= self._budget_tokens or len(history) <= self._keep_recent_turns:
+            return WindowedHistory(history, None, 0)
+
+        older = history[: -self._keep_recent_turns]
+        recent = history[-self._keep_recent_turns :]
+        recent_tokens = sum(count_tokens(format_turn(m)) for m in recent)
+
+        lines = [_summary_line(m.name, m.round_number, m.content) for m in older]
+        available = self._budget_tokens - recent_tokens - count_tokens(self.SUMMARY_HEADER)
+        # Drop the oldest lines first; the latest context matters most for replies
+        while lines and sum(count_tokens(line) for line in lines) > available:
+            lines.pop(0)
+
+        summary = "\n".join([self.SUMMARY_HEADER, *lines]) if lines else None
+        sent_tokens = recent_tokens + (count_tokens(summary) if summary else 0)
+        return WindowedHistory(recent, summary, max(full_tokens - sent_tokens, 0))
@@ -0,0 +1,147 @@
+"""
+Early Stop - Ends a streamed turn once it has said the requested amount
+"""
+
+from ..models.battle import BattleMode, Language
+
+SENTENCE_ENDS = {
+    Language.ENGLISH: frozenset(".!?…"),
+    Language.HINDI: frozenset(".!?…।॥"),  # Devanagari danda and double danda
+}
+CLOSERS = frozenset("\"')]”’»")  # May follow a terminator: "Really?!" he said
+
+ZWJ = "\u200d"
+
+
+def _is_emoji_modifier(codepoint: int) -> bool:
+    """Variation selectors, skin tones, keycap and tag characters extend the emoji before them"""
+    return (
+        codepoint in (0xFE0E, 0xFE0F, 0x20E3)
+        or 0x1F3FB <= codepoint <= 0x1F3FF
+        or 0xE0020 <= codepoint <= 0xE007F
+    )
+
+
+def _is_emoji(codepoint: int) -> bool:
+    return (
+        0x1F000 <= codepoint <= 0x1FAFF
+        or 0x2600 <= codepoint <= 0x27BF
+        or 0x2B00 <= codepoint <= 0x2BFF
+        or codepoint in (0x00A9, 0x00AE, 0x203C, 0x2049, 0x2122, 0x2139, 0x3030, 0x303D, 0x3297, 0x3299)
+        or 0x2190 <= codepoint <= 0x21FF
+        or 0x2300 <= codepoint <= 0x23FF
+    )
+
+
+def _is_regional_indicator(codepoint: int) -> bool:
+    return 0x1F1E6 <= codepoint <= 0x1F1FF  # Flags are pairs of these
+
+
+class StopController:
+    """
+    Watches a turn's deltas and says when to stop generating.
+
+    Text turns stop after `max_sentences` sentences: a terminator (plus
+    any closing quotes) followed by whitespace, so "3.5" or a stream that
+    simply ends never count early. An ellipsis ("…" or "..") ends a
+    sentence only when a capitalised word follows ("Well… I think" does
+    not), so the whitespace after one is held back until that is known.
+    Emoji turns stop before emoji number `max_emojis + 1`, counting ZWJ
+    sequences, skin tones and flags as one. A limit of 0 disables that
+    mode's check.
+    """
+
+    def __init__(self, mode: BattleMode, language: Language, max_sentences: int = 2, max_emojis: int = 12) -> None:
+        self.emoji = mode == BattleMode.EMOJI
+        self.limit = max_emojis if self.emoji else max_sentences
+        self.reason = "emojis" if self.emoji else "sentences"
+        self.stopped = False
+        self._terminators = SENTENCE_ENDS.get(language, SENTENCE_ENDS[Language.ENGLISH])
+        self._count = 0
+        self._after_terminator = False
+        self._previous = ""
+        self._ellipsis = False  # The terminator run ended in an ellipsis
+        self._after_ellipsis = ""  # "space", then "I" while deciding whether it ended a sentence
+        self._held = ""  # Text after an ellipsis that is not yet known to be kept
+        self._joined = False
+        self._regional = 0
+
+    def feed(self, delta: str) -> str:
+        """The part of `delta` to keep; sets `stopped` once the limit is reached"""
+        if self.stopped:
+            return ""
+        if self.limit <= 0:
+            return delta
+        text, self._held = self._held + delta, ""
+        held_from = 0 if self._after_ellipsis else None
+        for index, char in enumerate(text):
+            if self._ends_turn(char):
+                self.stopped = True
+                return text[:index if held_from is None else held_from]
+            if not self._after_ellipsis:
+                held_from = None
+            elif held_from is None:
+                held_from = index
+        if held_from is not None:
+            self._held = text[held_from:]
+            return text[:held_from]
+        return text
+
+    def _ends_turn(self, char: str) -> bool:
+        return self._ends_emoji_turn(ord(char)) if self.emoji else self._ends_text_turn(char)
+
+    def _ends_text_turn(self, char: str) -> bool:
+        previous, self._previous = self._previous, char
+        if self._after_ellipsis == "space":
+            if char.isspace():
+                return False
+            if char == "I":
+                self._after_ellipsis = "I"  # "It…" starts a sentence, the pronoun doesn't
+                return False
+            self._after_ellipsis = ""
+            if char.isupper():
+                return self._end_sentence()
+        elif self._after_ellipsis == "I":
+            self._after_ellipsis = ""
+            if char.isalpha():
+                return self._end_sentence()
+
+        if char in self._terminators:
+            self._after_terminator = True
+            self._ellipsis = char == "…" or (char == "." and previous == ".")
+            return False
+        if not self._after_terminator or char in CLOSERS:
+            return False
+        self._after_terminator = False
+        if not char.isspace():
+            return False  # "3.5", "e.g.": not the end of a sentence
+        if self._ellipsis:
+            self._after_ellipsis = "space"
+            return False
+        return self._end_sentence()
+
+    def _end_sentence(self) -> bool:
+        self._count += 1
+        return self._count >= self.limit
+
+    def _ends_emoji_turn(self, codepoint: int) -> bool:
+        if chr(codepoint) == ZWJ:
+            self._joined = True
+            return False
+        if _is_emoji_modifier(codepoint):
+            return False
+        if not _is_emoji(codepoint):
+            self._joined = False
+            self._regional = 0
+            return False
+        if self._joined:
+            self._joined = False
+            return False
+        if _is_regional_indicator(codepoint):
+            self._regional += 1
+            if self._regional % 2 == 0:
+                return False  # Second half of a flag
+        else:
+            self._regional = 0
+        self._count += 1
+        return self._count > self.limit
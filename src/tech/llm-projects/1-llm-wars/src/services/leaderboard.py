@@ -0,0 +1,266 @@
+"""
+Leaderboard - Elo ratings for providers and personas, updated on every vote
+"""
+
+import argparse
+import asyncio
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..models.battle import LeaderboardEntry, LeaderboardResponse
+from ..models.database import BattleParticipant, Rating, Vote, upsert_ratings, utcnow
+
+# Ratings are keyed (provider, persona); provider-level ratings use persona ""
+RatingKey = tuple[str, str]
+
+
+class RatingRecord(NamedTuple):
+    rating: float
+    games: int
+    wins: int
+
+
+class EloRatings:
+    """
+    Elo ratings with a sorted view maintained incrementally.
+
+    A vote is a win of the voted participant over each of the others, with
+    the K-factor split across those pairings. Each update moves only the
+    changed keys in the sorted order (bisect), so reading the top N never
+    sorts.
+    """
+
+    def __init__(self, k_factor: float = 32, initial_rating: float = 1000) -> None:
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+        self._records: dict[RatingKey, RatingRecord] = {}
+        self._order: list[tuple[float, RatingKey]] = []  # (-rating, key), best first
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key: RatingKey) -> bool:
+        return key in self._records
+
+    def get(self, key: RatingKey) -> RatingRecord:
+        return self._records.get(key) or RatingRecord(self.initial_rating, 0, 0)
+
+    def record(self, winners: list[RatingKey], losers: list[RatingKey]) -> None:
+        """Apply one vote; every winner beats every loser, using ratings from before the vote"""
+        before = {key: self.get(key) for key in [*winners, *losers]}
+        change = dict.fromkeys(before, 0.0)
+        if winners and losers:
+            k = self.k_factor / len(losers)
+            for winner in winners:
+                for loser in losers:
+                    expected = 1 / (1 + 10 ** ((before[loser].rating - before[winner].rating) / 400))
+                    change[winner] += k * (1 - expected)
+                    change[loser] -= k * (1 - expected)
+        for key, record in before.items():
+            won = key in winners
+            self.set(key, RatingRecord(record.rating + change[key], record.games + 1, record.wins + won))
+
+    def top(self, limit: int) -> list[tuple[RatingKey, RatingRecord]]:
+        return [(key, self._records[key]) for _, key in self._order[:limit]]
+
+    def items(self) -> list[tuple[RatingKey, RatingRecord]]:
+        return list(self._records.items())
+
+    def set(self, key: RatingKey, record: RatingRecord) -> None:
+        old = self._records.get(key)
+        if old:
+            del self._order[bisect_left(self._order, (-old.rating, key))]
+        self._records[key] = record
+        insort(self._order, (-record.rating, key))
+
+
+class Leaderboard:
+    """
+    Provider and (provider, persona) Elo ratings, kept in memory.
+
+    Every worker applies every vote (its own and, through the state backend,
+    the other workers') and checkpoints the ratings to the database now and
+    then. A checkpoint or load never replaces a record with one that has
+    fewer games, so a worker that is behind cannot roll back the table. The
+    API response is built at most once per change, then served as-is.
+    """
+
+    def __init__(self, k_factor: float = 32, initial_rating: float = 1000, view_size: int = 50) -> None:
+        self.providers = EloRatings(k_factor, initial_rating)
+        self.personas = EloRatings(k_factor, initial_rating)
+        self.view_size = view_size
+        self.votes = 0
+        self.updated_at: datetime | None = None
+        self.dirty = False  # Votes recorded since the last checkpoint
+        self._view: LeaderboardResponse | None = None
+
+    def record_vote(self, provider: str, participants: list[tuple[str, str]]) -> None:
+        """
+        Apply a vote for `provider` in a battle between (provider, persona)
+        participants. A vote for a battle whose participants are unknown
+        changes nothing, live and in rebuild_leaderboard alike.
+        """
+        if not participants:
+            return
+        providers = list(dict.fromkeys(seat_provider for seat_provider, _ in participants))
+        winners = [(provider, "")]
+        losers = [(other, "") for other in providers if other != provider]
+        self.providers.record(winners, losers)
+        seats = list(dict.fromkeys(participants))
+        seat_winners = [seat for seat in seats if seat[0] == provider]
+        seat_losers = [seat for seat in seats if seat[0] != provider]
+        self.personas.record(seat_winners, seat_losers)
+        self.votes += 1
+        self.dirty = True
+        self._changed(utcnow())
+
+    def merge(self, records: dict[RatingKey, RatingRecord], updated_at: datetime | None = None) -> None:
+        """Adopt checkpointed ratings; a record with fewer games than the one held is stale and skipped"""
+        for key, record in records.items():
+            ratings = self._ratings(key)
+            current = ratings.get(key) if key in ratings else None
+            if current and record.games < current.games:
+                continue
+            if not key[1]:
+                self.votes += record.wins - (current.wins if current else 0)  # One provider win per vote
+            ratings.set(key, record)
+        if records:
+            self._changed(updated_at or utcnow())
+
+    def view(self) -> LeaderboardResponse:
+        """Top providers and personas, best first (cached until the next vote)"""
+        if self._view is None:
+            self._view = LeaderboardResponse(
+                providers=self._entries(self.providers, with_persona=False),
+                personas=self._entries(self.personas, with_persona=True),
+                votes=self.votes,
+                updated_at=self.updated_at,
+            )
+        return self._view
+
+    def _ratings(self, key: RatingKey) -> EloRatings:
+        return self.personas if key[1] else self.providers
+
+    def _changed(self, updated_at: datetime) -> None:
+        self.updated_at = max(self.updated_at or updated_at, updated_at)
+        self._view = None
+
+    def _entries(self, ratings: EloRatings, with_persona: bool) -> list[LeaderboardEntry]:
+        return [
+            LeaderboardEntry(
+                provider=provider,
+                persona=persona if with_persona else None,
+                rating=round(record.rating, 1),
+                games=record.games,
+                wins=record.wins,
+                win_rate=round(record.wins / record.games, 3) if record.games else 0.0,
+            )
+            for (provider, persona), record in ratings.top(self.view_size)
+        ]
+
+    def stats(self) -> dict[str, int]:
+        return {"votes": self.votes, "providers": len(self.providers), "personas": len(self.personas)}
+
+    async def load(self, session_factory: async_sessionmaker) -> bool:
+        """Merge in the ratings table; False if it is empty"""
+        async with session_factory() as session:
+            rows = (await session.execute(select(Rating))).scalars().all()
+        if not rows:
+            return False
+        self.merge(
+            {(row.provider, row.persona): RatingRecord(row.rating, row.games, row.wins) for row in rows},
+            max(row.updated_at for row in rows),
+        )
+        return True
+
+    async def checkpoint(self, session_factory: async_sessionmaker, batch_size: int = 500) -> None:
+        """Write every rating to the ratings table, except over rows with more games"""
+        self.dirty = False
+        updated_at = self.updated_at or utcnow()
+        rows = [
+            _rating_row(key, record, updated_at)
+            for ratings in (self.providers, self.personas)
+            for key, record in ratings.items()
+        ]
+        async with session_factory() as session:
+            try:
+                for start in range(0, len(rows), batch_size):
+                    await upsert_ratings(session, rows[start:start + batch_size])
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                self.dirty = True
+                raise
+
+
+def _rating_row(key: RatingKey, record: RatingRecord, updated_at: datetime) -> dict:
+    provider, persona = key
+    return {
+        "provider": provider,
+        "persona": persona,
+        "rating": record.rating,
+        "games": record.games,
+        "wins": record.wins,
+        "updated_at": updated_at,
+    }
+
+
+async def rebuild_leaderboard(
+    session_factory: async_sessionmaker, leaderboard: Leaderboard | None = None, batch_size: int = 1000
+) -> Leaderboard:
+    """Replay every vote, oldest first, into a fresh Leaderboard"""
+    leaderboard = leaderboard or Leaderboard()
+    last: tuple[datetime, str] | None = None
+    while True:
+        async with session_factory() as session:
+            query = select(Vote.created_at, Vote.id, Vote.battle_id, Vote.provider)
+            if last:
+                query = query.where(tuple_(Vote.created_at, Vote.id) > last)
+            votes = (await session.execute(query.order_by(Vote.created_at, Vote.id).limit(batch_size))).all()
+            if not votes:
+                return leaderboard
+            participants: dict[str, list[tuple[str, str]]] = {}
+            seats = await session.execute(
+                select(BattleParticipant.battle_id, BattleParticipant.provider, BattleParticipant.persona)
+                .where(BattleParticipant.battle_id.in_({vote.battle_id for vote in votes}))
+                .order_by(BattleParticipant.battle_id, BattleParticipant.seat)
+            )
+            for battle_id, provider, persona in seats:
+                participants.setdefault(battle_id, []).append((provider, persona))
+
+        for vote in votes:
+            leaderboard.record_vote(vote.provider, participants.get(vote.battle_id, []))
+        last = (votes[-1].created_at, votes[-1].id)
+
+
+async def _rebuild(database_url: str) -> None:
+    from ..config import get_settings
+    from ..models.database import get_engine, get_session_factory, init_db
+
+    settings = get_settings()
+    engine = get_engine(database_url or settings.database_url)
+    try:
+        await init_db(engine)
+        session_factory = get_session_factory(engine)
+        leaderboard = await rebuild_leaderboard(
+            session_factory,
+            Leaderboard(settings.leaderboard_k_factor, settings.leaderboard_initial_rating),
+        )
+        await leaderboard.checkpoint(session_factory)
+        print(f"🏆 Leaderboard rebuilt from {leaderboard.votes} votes: {leaderboard.stats()}")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute leaderboard ratings from the votes table")
+    parser.add_argument("--database-url", default="", help="Defaults to DATABASE_URL")
+    asyncio.run(_rebuild(parser.parse_args().database_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,104 @@
 LLM Service - Unified interface for calling different LLM providers
 """
 
-import json
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Awaitable
+from contextlib import aclosing
 from datetime import datetime
+from functools import cached_property, lru_cache
 from pathlib import Path
+from typing import Any, NamedTuple
 
-from anthropic import Anthropic
-from galileo import galileo_context
-from galileo.openai import openai as galileo_openai
+import httpx
 
 from ..config import get_settings
-from ..models.battle import BattleMessage, BattleMode, Language, LLMProvider
-
-
-def _openai_client(api_key: str, base_url: str | None = None):
-    """OpenAI client: Galileo-wrapped for tracing (GALILEO_API_KEY assumed set)."""
-    return galileo_openai.OpenAI(api_key=api_key, base_url=base_url)
+from ..models.battle import BattleMessage, BattleMode, CacheMode, Language, LLMProvider
+from .context_window import count_tokens, format_turn
+from .early_stop import StopController
+from .metrics import (
+    EARLY_STOP_SECONDS_SAVED,
+    EARLY_STOP_TOKENS_SAVED,
+    EARLY_STOPS_TOTAL,
+    PROVIDER_ERRORS_TOTAL,
+    PROVIDER_REQUEST_SECONDS,
+    TIME_TO_FIRST_TOKEN_SECONDS,
+    TOKENS_TOTAL,
+    TURN_TOKENS,
+)
+from .persona_registry import get_persona_registry
+from .rate_limiter import ProviderScheduler
+from .resilience import CircuitBreaker, LatencyTracker, hedged
+from .response_cache import ResponseCache, cache_key
+from .tracing import TraceRecord, get_tracer, trace_session
+
+
+def _pool_limits() -> httpx.Limits:
+    """Connection pool limits shared by every provider transport."""
+    settings = get_settings()
+    return httpx.Limits(
+        max_connections=settings.provider_max_connections,
+        max_keepalive_connections=settings.provider_max_keepalive_connections,
+    )
+
+
+# The provider SDKs take seconds to import, so they are imported when the
+# first client is built rather than at startup.
+def _openai_client(
+    api_key: str,
+    base_url: str | None = None,
+    max_retries: int | None = None,
+    timeout_seconds: float | None = None,
+):
+    """Async OpenAI client with its own pooled transport (traced via the background exporter)."""
+    import openai
+
+    return openai.AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=openai.DEFAULT_MAX_RETRIES if max_retries is None else max_retries,
+        timeout=openai.DEFAULT_TIMEOUT if timeout_seconds is None else openai.Timeout(timeout_seconds, connect=5.0),
+        http_client=openai.DefaultAsyncHttpxClient(limits=_pool_limits()),
+    )
+
+
+def _import_provider_sdks() -> None:
+    import anthropic  # noqa: F401
+    import openai  # noqa: F401
+
+
+async def load_provider_sdks() -> None:
+    """Import the provider SDKs in a worker thread so the event loop keeps serving"""
+    await asyncio.to_thread(_import_provider_sdks)
+
+
+def _anthropic_client(
+    api_key: str,
+    base_url: str | None = None,
+    max_retries: int | None = None,
+    timeout_seconds: float | None = None,
+):
+    """Async Anthropic client with its own pooled transport."""
+    import anthropic
+
+    # anthropic.Timeout, not httpx.Timeout: the SDK may ship its own httpx build
+    return anthropic.AsyncAnthropic(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=anthropic.DEFAULT_MAX_RETRIES if max_retries is None else max_retries,
+        timeout=anthropic.DEFAULT_TIMEOUT if timeout_seconds is None else anthropic.Timeout(timeout_seconds, connect=5.0),
+        http_client=anthropic.DefaultAsyncHttpxClient(limits=_pool_limits()),
+    )
+
+
+def _now_ns() -> int:
+    return int(datetime.now().timestamp() * 1_000_000_000)
+
+# Anthropic ignores cache_control and OpenAI skips automatic prefix caching below this many
+# prompt tokens, so a persona prefix only saves input tokens once it is at least this long
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+RESPONSE_CACHE_DIR = Path(__file__).parent.parent.parent / "data" / "battles" / "responses"
 
 EMOJI_MODE_INSTRUCTION = """
 IMPORTANT: You must respond using ONLY emojis. No text, no punctuation, no numbers.
@@ -34,17 +117,148 @@ MODEL_MAP = {
     LLMProvider.GROK: "grok-3-latest",
 }
 
+TRACE_NAMES = {
+    LLMProvider.OPENAI: "OpenAI (LLM Wars)",
+    LLMProvider.CLAUDE: "Claude (LLM Wars)",
+    LLMProvider.GROK: "Grok (LLM Wars)",
+}
+
+# Sampling parameters per provider; part of the response cache key
+SAMPLING_PARAMS = {
+    LLMProvider.OPENAI: {"max_tokens": 100, "temperature": 0.9},
+    LLMProvider.CLAUDE: {"max_tokens": 100},
+    LLMProvider.GROK: {"max_tokens": 100, "temperature": 0.9},
+}
+
+
+ROUND_INSTRUCTIONS = {
+    "opening": "\nThis is the OPENING. Give your character's confused, opinionated, or clueless first take on this topic.\n",
+    "middle": "\nMIDDLE ROUND. You MUST directly respond to something another character said. Take a completely new angle. Escalate the absurdity.\n",
+    "final": "\nFINAL ROUND. Go completely unhinged. Most dramatic, absurd, over-the-top closing statement your character can muster.\n",
+}
+
+
+class SystemPrompt(NamedTuple):
+    """System prompt split into a stable, cacheable prefix and the per-round instruction"""
+
+    prefix: str
+    round_instruction: str
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.round_instruction
+
+
+class TokenUsage(NamedTuple):
+    """Normalized token counts; input_tokens includes cached_input_tokens"""
+
+    input_tokens: int
+    cached_input_tokens: int
+    output_tokens: int
+
+
+def _round_phase(current_round: int, total_rounds: int) -> str:
+    if current_round == 1:
+        return "opening"
+    if current_round == total_rounds:
+        return "final"
+    return "middle"
+
+
+@lru_cache(maxsize=1024)
+def _system_prompt_prefix(
+    persona: str, world: str, topic: str, mode: BattleMode, language: Language
+) -> str:
+    """Everything in the system prompt that is fixed for a participant across a battle"""
+    lang = LANGUAGE_INSTRUCTIONS.get(language, LANGUAGE_INSTRUCTIONS[Language.ENGLISH])
+
+    prefix = f"""You are a character in a comedy debate show. Three wildly different characters argue about a topic. The goal is to be FUNNY.
+
+Your character: {persona}
+"""
+
+    if world:
+        prefix += f"""
+YOUR ENTIRE WORLD: {world}
+You ONLY know about these things. You have ZERO knowledge of anything outside your world.
+If the topic is outside your world, you are genuinely confused by it and drag the conversation back to what you know.
+Example: A Medieval Knight debating "Tabs vs Spaces" has no idea what code is. They might say "I know not these 'tabs' — but I once chose a sword over a shield, and that's the only choice a knight needs!"
+Example: A Pigeon debating anything just coos about breadcrumbs and struts around confused.
+"""
+
+    prefix += f"""
+Topic: {topic}
+
+RULES:
+- STAY IN YOUR WORLD. Do NOT suddenly become knowledgeable about the topic. Your character's ignorance IS the comedy.
+- Relate everything back to what you know. A Gordon Ramsay character makes it about cooking. A Toddler asks "but why?". A Pigeon just wants breadcrumbs.
+- NEVER repeat a joke, analogy, or point you already made. Each response MUST be a completely new angle.
+- REACT to what others said — roast them, misunderstand them, get offended, agree for the wrong reasons.
+- Keep it SHORT: 1-2 punchy sentences max. Brevity is funnier.
+- {lang}
+"""
+
+    if mode == BattleMode.EMOJI:
+        prefix += f"\n{EMOJI_MODE_INSTRUCTION}"
+
+    return prefix
+
+
+def _openai_usage(usage) -> TokenUsage:
+    """OpenAI/xAI usage; cached_tokens comes from automatic prefix caching"""
+    if not usage:
+        return TokenUsage(0, 0, 0)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+    return TokenUsage(usage.prompt_tokens, cached, usage.completion_tokens)
 
-def _load_persona_worlds() -> dict[str, str]:
-    """Load persona worlds from shared JSON. Maps description -> world."""
-    personas_path = Path(__file__).parent.parent.parent / "shared" / "personas.json"
+
+def _anthropic_usage(usage) -> TokenUsage:
+    """Anthropic usage; input_tokens there excludes cache reads and writes"""
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    return TokenUsage(usage.input_tokens + cache_read + cache_write, cache_read, usage.output_tokens)
+
+
+def _parse_fallback(value: str) -> tuple[LLMProvider, str] | None:
+    """Parse a "provider/model" fallback setting; the model defaults to the provider's"""
+    if not value:
+        return None
+    provider_name, _, model = value.partition("/")
     try:
-        with open(personas_path) as f:
-            personas = json.load(f)
-        return {p["description"]: p.get("world", "") for p in personas}
-    except Exception as e:
-        print(f"⚠️  Could not load persona worlds: {e}")
-        return {}
+        provider = LLMProvider(provider_name.strip().lower())
+    except ValueError:
+        print(f"⚠️  Ignoring fallback {value!r}: unknown provider")
+        return None
+    return provider, model.strip() or MODEL_MAP[provider]
+
+
+def _estimate_tokens(provider: LLMProvider, system_prompt: SystemPrompt, messages: list[dict]) -> int:
+    """Rough rate-limit cost of a request: ~4 chars per prompt token plus max_tokens"""
+    chars = len(system_prompt.text) + sum(len(m["content"]) for m in messages)
+    return chars // 4 + SAMPLING_PARAMS[provider]["max_tokens"]
+
+
+def _estimated_usage(
+    provider: LLMProvider, system_prompt: SystemPrompt, messages: list[dict], output: str
+) -> TokenUsage:
+    """Usage of a stream closed before the provider reported it"""
+    input_tokens = _estimate_tokens(provider, system_prompt, messages) - SAMPLING_PARAMS[provider]["max_tokens"]
+    return TokenUsage(input_tokens, 0, count_tokens(output))
+
+
+@lru_cache(maxsize=1024)
+def _is_cacheable(prefix: str) -> bool:
+    """Whether the prefix is long enough for the providers to cache it"""
+    return count_tokens(prefix) >= PROMPT_CACHE_MIN_TOKENS
+
+
+def _claude_system_blocks(system_prompt: SystemPrompt) -> list[dict]:
+    """Anthropic system blocks, with a cache breakpoint after the prefix when it is long enough to cache"""
+    prefix_block = {"type": "text", "text": system_prompt.prefix}
+    if _is_cacheable(system_prompt.prefix):
+        prefix_block["cache_control"] = {"type": "ephemeral"}
+    return [prefix_block, {"type": "text", "text": system_prompt.round_instruction}]
 
 
 class LLMService:
@@ -52,13 +266,127 @@ class LLMService:
 
     def __init__(self) -> None:
         settings = get_settings()
-        self._openai_client = _openai_client(settings.openai_api_key)
-        self._anthropic_client = Anthropic(api_key=settings.anthropic_api_key)
-        self._grok_client = _openai_client(
-            settings.grok_api_key,
-            base_url="https://api.x.ai/v1",
+        self._settings = settings
+        self._call_deadline = settings.provider_call_deadline_seconds
+        self._hedge_requests = settings.hedge_requests
+        self._latency = {
+            provider: LatencyTracker(min_samples=settings.hedge_min_samples) for provider in LLMProvider
+        }
+        self._breakers = {
+            provider: CircuitBreaker(settings.fallback_after_failures, settings.fallback_cooldown_seconds)
+            for provider in LLMProvider
+        }
+        self._fallbacks = {
+            provider: fallback
+            for provider in LLMProvider
+            if (fallback := _parse_fallback(getattr(settings, f"{provider.value}_fallback")))
+        }
+        self._schedulers = {
+            provider: ProviderScheduler(
+                provider.value,
+                requests_per_minute=getattr(settings, f"{provider.value}_requests_per_minute"),
+                tokens_per_minute=getattr(settings, f"{provider.value}_tokens_per_minute"),
+                max_concurrency=getattr(settings, f"{provider.value}_max_concurrency"),
+                max_queue_depth=settings.provider_max_queue_depth,
+                max_retries=settings.provider_max_retries,
+                backoff_base_seconds=settings.provider_backoff_base_seconds,
+                backoff_max_seconds=settings.provider_backoff_max_seconds,
+            )
+            for provider in LLMProvider
+        }
+        self._personas = get_persona_registry()
+        self._response_cache = ResponseCache(
+            Path(settings.response_cache_dir) if settings.response_cache_dir else RESPONSE_CACHE_DIR,
+            memory_max_entries=settings.response_cache_memory_entries,
+            disk_max_bytes=settings.response_cache_disk_max_mb * 1_000_000,
+        )
+        self._cache_write_through = settings.response_cache_write_through
+        self._token_usage = {
+            provider.value: {"calls": 0, "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0}
+            for provider in LLMProvider
+        }
+        self._early_stop_sentences = settings.early_stop_sentences
+        self._early_stop_max_emojis = settings.early_stop_max_emojis
+        self._early_stops = {
+            provider.value: {"turns": 0, "tokens_saved": 0, "seconds_saved": 0.0} for provider in LLMProvider
+        }
+
+    def get_usage_stats(self) -> dict[str, dict[str, int]]:
+        """Cumulative token usage per provider, including prompt-cache hits"""
+        return {provider: dict(counts) for provider, counts in self._token_usage.items()}
+
+    def get_early_stop_stats(self) -> dict[str, dict[str, float]]:
+        """Streamed turns cut at the sentence/emoji limit, and the output tokens and time saved"""
+        return {provider: dict(counts) for provider, counts in self._early_stops.items()}
+
+    def get_cache_stats(self) -> dict[str, int]:
+        """Response cache size and hit counters"""
+        return self._response_cache.stats()
+
+    def get_scheduler_stats(self) -> dict[str, dict[str, float]]:
+        """Queue depth, retries and admission wait times per provider"""
+        return {provider.value: scheduler.stats() for provider, scheduler in self._schedulers.items()}
+
+    # Provider clients are built on first use (see _openai_client). Retries are
+    # owned by the per-provider schedulers, not the SDKs; the timeout bounds
+    # each HTTP request (and each gap between stream chunks).
+    @cached_property
+    def _openai_client(self):
+        return _openai_client(
+            self._settings.openai_api_key,
+            base_url=self._settings.openai_base_url or None,
+            max_retries=0,
+            timeout_seconds=self._settings.provider_request_timeout_seconds,
         )
-        self._persona_worlds = _load_persona_worlds()
+
+    @cached_property
+    def _anthropic_client(self):
+        return _anthropic_client(
+            self._settings.anthropic_api_key,
+            base_url=self._settings.anthropic_base_url or None,
+            max_retries=0,
+            timeout_seconds=self._settings.provider_request_timeout_seconds,
+        )
+
+    @cached_property
+    def _grok_client(self):
+        return _openai_client(
+            self._settings.grok_api_key,
+            base_url=self._settings.grok_base_url,
+            max_retries=0,
+            timeout_seconds=self._settings.provider_request_timeout_seconds,
+        )
+
+    async def warmup(self) -> None:
+        """Open a pooled connection to each provider so the first turn skips TLS setup."""
+        await load_provider_sdks()
+        results = await asyncio.gather(
+            self._openai_client.models.list(),
+            self._anthropic_client.models.list(),
+            self._grok_client.models.list(),
+            return_exceptions=True,
+        )
+        for provider, result in zip(LLMProvider, results):
+            if isinstance(result, Exception):
+                print(f"⚠️  Warmup failed for {provider.value}: {result}")
+
+    async def aclose(self) -> None:
+        """Close the pooled provider transports that were opened."""
+        clients = ("_openai_client", "_anthropic_client", "_grok_client")
+        await asyncio.gather(*(vars(self)[name].close() for name in clients if name in vars(self)))
+
+    async def complete_chat(self, provider: LLMProvider, messages: list[dict], **params):
+        """
+        A raw chat.completions call on an OpenAI-compatible provider for other
+        services (surprise configs), sharing the battle turns' pooled client,
+        request timeout, rate-limit scheduler and call deadline
+        """
+        client = self._grok_client if provider == LLMProvider.GROK else self._openai_client
+        estimated_tokens = sum(len(message["content"]) for message in messages) // 4 + params.get("max_tokens", 0)
+        async with asyncio.timeout(self._call_deadline):
+            return await self._schedulers[provider].run(
+                lambda: client.chat.completions.create(messages=messages, **params), estimated_tokens,
+            )
 
     async def generate_response(
         self,
@@ -70,23 +398,278 @@ class LLMService:
         conversation_history: list[BattleMessage],
         current_round: int,
         total_rounds: int = 3,
+        cache_mode: CacheMode = CacheMode.FRESH,
+        history_summary: str | None = None,
     ) -> str:
-        """Generate a response from the specified LLM provider"""
-        world = self._persona_worlds.get(persona, "")
-        system_prompt = self._build_system_prompt(
-            provider, persona, message, mode, language, current_round, total_rounds, world,
+        """Generate a response from the specified LLM provider (or the response cache)"""
+        system_prompt, messages = self._build_request(
+            provider, persona, message, mode, language, conversation_history, current_round, total_rounds,
+            history_summary,
         )
-        messages = self._build_messages(conversation_history, current_round, total_rounds)
+        key = self._cache_key(provider, system_prompt, messages)
+        if cache_mode == CacheMode.CACHED:
+            cached = await self._response_cache.get(key)
+            if cached is not None:
+                return cached
+
+        output, answered_by = await self._complete(provider, system_prompt, messages)
+        # A fallback model's reply must not be replayed as if the primary had given it
+        if self._writes_cache(cache_mode) and answered_by == (provider, MODEL_MAP[provider]):
+            await self._response_cache.put(key, output)
+        return output
 
+    async def generate_response_stream(
+        self,
+        provider: LLMProvider,
+        persona: str,
+        message: str,
+        mode: BattleMode,
+        language: Language,
+        conversation_history: list[BattleMessage],
+        current_round: int,
+        total_rounds: int = 3,
+        cache_mode: CacheMode = CacheMode.FRESH,
+        history_summary: str | None = None,
+    ) -> AsyncGenerator[str, None]:
+        """Stream a response from the specified LLM provider as text deltas (a cache hit is one delta)"""
+        system_prompt, messages = self._build_request(
+            provider, persona, message, mode, language, conversation_history, current_round, total_rounds,
+            history_summary,
+        )
+        stop = self._stop_controller(mode, language)
+        # Streamed replies are cut by the stop policy, so they are cached apart from full ones
+        key = self._cache_key(provider, system_prompt, messages, stop)
+        if cache_mode == CacheMode.CACHED:
+            cached = await self._response_cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        fallback = self._fallbacks.get(provider)
+        breaker = self._breakers[provider]
+        target = fallback if fallback and breaker.is_open else (provider, MODEL_MAP[provider])
+
+        parts: list[str] = []
+        try:
+            async for delta in self._stream_within_deadline(target, system_prompt, messages, stop):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            if target == fallback:
+                raise
+            breaker.record_failure()
+            # Once deltas have reached the viewer, switching models would garble the turn
+            if parts or not fallback:
+                raise
+            print(f"⚠️  {provider.value} stream failed ({e!r}); falling back to {fallback[0].value}/{fallback[1]}")
+            target = fallback
+            stop = self._stop_controller(mode, language)
+            async for delta in self._stream_within_deadline(fallback, system_prompt, messages, stop):
+                parts.append(delta)
+                yield delta
+        else:
+            if target != fallback:
+                breaker.record_success()
+        if self._writes_cache(cache_mode) and target == (provider, MODEL_MAP[provider]):
+            await self._response_cache.put(key, "".join(parts))
+
+    async def _stream_within_deadline(
+        self,
+        target: tuple[LLMProvider, str],
+        system_prompt: SystemPrompt,
+        messages: list[dict],
+        stop: StopController,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream one model's attempt under the call deadline, which covers
+        queueing, retries and every chunk. Each read is bounded separately
+        (timeout_at one shared deadline), so the timeout can only fire while
+        this generator is waiting on the provider, never inside the consumer.
+        """
+        deadline = asyncio.get_running_loop().time() + self._call_deadline
+        async with aclosing(self._stream_provider(*target, system_prompt, messages, stop)) as stream:
+            while True:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        delta = await anext(stream)
+                except StopAsyncIteration:
+                    return
+                yield delta
+
+    def _stop_controller(self, mode: BattleMode, language: Language) -> StopController:
+        return StopController(mode, language, self._early_stop_sentences, self._early_stop_max_emojis)
+
+    def _record_early_stop(
+        self, provider: LLMProvider, stop: StopController, output: str, streaming_seconds: float,
+    ) -> None:
+        """
+        Count a stream closed at the limit. Tokens saved is what remained of
+        max_tokens (an upper bound: the model might have stopped sooner);
+        time saved extrapolates this stream's own token rate.
+        """
+        kept = count_tokens(output)
+        saved = max(SAMPLING_PARAMS[provider]["max_tokens"] - kept, 0)
+        seconds = saved * streaming_seconds / kept if kept else 0.0
+        counts = self._early_stops[provider.value]
+        counts["turns"] += 1
+        counts["tokens_saved"] += saved
+        counts["seconds_saved"] += seconds
+        EARLY_STOPS_TOTAL.inc(provider=provider.value, reason=stop.reason)
+        EARLY_STOP_TOKENS_SAVED.inc(saved, provider=provider.value)
+        EARLY_STOP_SECONDS_SAVED.inc(seconds, provider=provider.value)
+
+    async def _complete(
+        self, provider: LLMProvider, system_prompt: SystemPrompt, messages: list[dict],
+    ) -> tuple[str, tuple[LLMProvider, str]]:
+        """One turn: primary model under a deadline, else the configured fallback; also returns who answered"""
+        fallback = self._fallbacks.get(provider)
+        breaker = self._breakers[provider]
+        if fallback and breaker.is_open:
+            return await self._complete_with(*fallback, system_prompt, messages), fallback
+
+        try:
+            output = await self._complete_with(provider, MODEL_MAP[provider], system_prompt, messages)
+        except Exception as e:
+            breaker.record_failure()
+            if not fallback:
+                raise
+            print(f"⚠️  {provider.value} failed ({e!r}); falling back to {fallback[0].value}/{fallback[1]}")
+            return await self._complete_with(*fallback, system_prompt, messages), fallback
+        breaker.record_success()
+        return output, (provider, MODEL_MAP[provider])
+
+    async def _complete_with(
+        self, provider: LLMProvider, model: str, system_prompt: SystemPrompt, messages: list[dict],
+    ) -> str:
+        """
+        Call one model within the call deadline, hedging once the provider's
+        p95 round trip has passed. No hedge is sent while requests are queued
+        for the provider: it would only wait behind them. Usage and the trace
+        are recorded for the reply that is used, never for a hedge loser.
+        """
+        scheduler = self._schedulers[provider]
+
+        async def attempt() -> tuple[str, TokenUsage, int]:
+            start_time_ns = _now_ns()
+            output, usage = await self._call_provider(provider, model, system_prompt, messages)
+            return output, usage, start_time_ns
+
+        hedge_after = self._latency[provider].quantile(0.95) if self._hedge_requests else None
+        async with asyncio.timeout(self._call_deadline):
+            output, usage, start_time_ns = await hedged(
+                attempt, hedge_after, can_hedge=lambda: scheduler.queue_depth == 0,
+            )
+        self._log_llm_span(TRACE_NAMES[provider], provider, model, system_prompt, messages, output, usage, start_time_ns)
+        return output
+
+    async def _round_trip(self, provider: LLMProvider, request: Awaitable[Any]) -> Any:
+        """Await one admitted provider request, recording how long the provider took (for hedging)"""
+        start = time.monotonic()
+        response = await request
+        self._latency[provider].record(time.monotonic() - start)
+        return response
+
+    async def _call_provider(
+        self, provider: LLMProvider, model: str, system_prompt: SystemPrompt, messages: list[dict],
+    ) -> tuple[str, TokenUsage]:
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            if provider == LLMProvider.OPENAI:
+                reply = await self._call_openai(system_prompt, messages, model)
+            elif provider == LLMProvider.CLAUDE:
+                reply = await self._call_claude(system_prompt, messages, model)
+            elif provider == LLMProvider.GROK:
+                reply = await self._call_grok(system_prompt, messages, model)
+            else:
+                raise ValueError(f"Unsupported provider: {provider}")
+            outcome = "success"
+            return reply
+        except asyncio.CancelledError:
+            outcome = "cancelled"  # Hedge losers and deadline expiries
+            raise
+        except Exception as e:
+            PROVIDER_ERRORS_TOTAL.inc(provider=provider.value, error=type(e).__name__)
+            raise
+        finally:
+            PROVIDER_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, provider=provider.value, model=model, outcome=outcome,
+            )
+
+    async def _stream_provider(
+        self,
+        provider: LLMProvider,
+        model: str,
+        system_prompt: SystemPrompt,
+        messages: list[dict],
+        stop: StopController,
+    ) -> AsyncGenerator[str, None]:
         if provider == LLMProvider.OPENAI:
-            return await self._call_openai(system_prompt, messages)
+            stream = self._stream_openai_compatible(
+                self._openai_client, provider, model, "OpenAI (LLM Wars)", system_prompt, messages, stop,
+            )
         elif provider == LLMProvider.CLAUDE:
-            return await self._call_claude(system_prompt, messages)
+            stream = self._stream_claude(system_prompt, messages, stop, model)
         elif provider == LLMProvider.GROK:
-            return await self._call_grok(system_prompt, messages)
+            stream = self._stream_openai_compatible(
+                self._grok_client, provider, model, "Grok (LLM Wars)", system_prompt, messages, stop,
+            )
         else:
             raise ValueError(f"Unsupported provider: {provider}")
 
+        start = time.perf_counter()
+        outcome = "error"
+        first_delta = True
+        try:
+            async for delta in stream:
+                if first_delta:
+                    TIME_TO_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - start, provider=provider.value, model=model)
+                    first_delta = False
+                yield delta
+            outcome = "success"
+        except Exception as e:
+            PROVIDER_ERRORS_TOTAL.inc(provider=provider.value, error=type(e).__name__)
+            raise
+        finally:
+            PROVIDER_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, provider=provider.value, model=model, outcome=outcome,
+            )
+
+    def _writes_cache(self, cache_mode: CacheMode) -> bool:
+        return cache_mode == CacheMode.CACHED or self._cache_write_through
+
+    def _cache_key(
+        self,
+        provider: LLMProvider,
+        system_prompt: SystemPrompt,
+        messages: list[dict],
+        stop: StopController | None = None,
+    ) -> str:
+        params = SAMPLING_PARAMS[provider]
+        if stop and stop.limit > 0:
+            params = {**params, "stop_after": {stop.reason: stop.limit}}
+        return cache_key(provider.value, MODEL_MAP[provider], system_prompt.text, messages, params)
+
+    def _build_request(
+        self,
+        provider: LLMProvider,
+        persona: str,
+        message: str,
+        mode: BattleMode,
+        language: Language,
+        conversation_history: list[BattleMessage],
+        current_round: int,
+        total_rounds: int,
+        history_summary: str | None = None,
+    ) -> tuple[SystemPrompt, list[dict]]:
+        """Build the system prompt and message list for a single turn"""
+        world = self._personas.world(persona)
+        system_prompt = self._build_system_prompt(
+            provider, persona, message, mode, language, current_round, total_rounds, world,
+        )
+        messages = self._build_messages(conversation_history, current_round, total_rounds, history_summary)
+        return system_prompt, messages
+
     def _build_system_prompt(
         self,
         provider: LLMProvider,
@@ -97,60 +680,34 @@ class LLMService:
         current_round: int,
         total_rounds: int,
         world: str = "",
-    ) -> str:
-        """Build the system prompt for the LLM"""
-        lang = LANGUAGE_INSTRUCTIONS.get(language, LANGUAGE_INSTRUCTIONS[Language.ENGLISH])
-
-        base_prompt = f"""You are a character in a comedy debate show. Three wildly different characters argue about a topic. The goal is to be FUNNY.
-
-Your character: {persona}
-"""
-
-        if world:
-            base_prompt += f"""
-YOUR ENTIRE WORLD: {world}
-You ONLY know about these things. You have ZERO knowledge of anything outside your world.
-If the topic is outside your world, you are genuinely confused by it and drag the conversation back to what you know.
-Example: A Medieval Knight debating "Tabs vs Spaces" has no idea what code is. They might say "I know not these 'tabs' — but I once chose a sword over a shield, and that's the only choice a knight needs!"
-Example: A Pigeon debating anything just coos about breadcrumbs and struts around confused.
-"""
-
-        base_prompt += f"""
-Topic: {message}
-
-RULES:
-- STAY IN YOUR WORLD. Do NOT suddenly become knowledgeable about the topic. Your character's ignorance IS the comedy.
-- Relate everything back to what you know. A Gordon Ramsay character makes it about cooking. A Toddler asks "but why?". A Pigeon just wants breadcrumbs.
-- NEVER repeat a joke, analogy, or point you already made. Each response MUST be a completely new angle.
-- REACT to what others said — roast them, misunderstand them, get offended, agree for the wrong reasons.
-- Keep it SHORT: 1-2 punchy sentences max. Brevity is funnier.
-- {lang}
-"""
-
-        if current_round == 1:
-            base_prompt += "\nThis is the OPENING. Give your character's confused, opinionated, or clueless first take on this topic.\n"
-        elif current_round == total_rounds:
-            base_prompt += "\nFINAL ROUND. Go completely unhinged. Most dramatic, absurd, over-the-top closing statement your character can muster.\n"
-        else:
-            base_prompt += "\nMIDDLE ROUND. You MUST directly respond to something another character said. Take a completely new angle. Escalate the absurdity.\n"
-
-        if mode == BattleMode.EMOJI:
-            base_prompt += f"\n{EMOJI_MODE_INSTRUCTION}"
-
-        return base_prompt
+    ) -> SystemPrompt:
+        """
+        Build the system prompt for the LLM.
+
+        The memoized prefix is identical on every turn for a participant, so
+        providers can serve it from their prompt cache; only the round
+        instruction at the end varies.
+        """
+        return SystemPrompt(
+            prefix=_system_prompt_prefix(persona, world, message, mode, language),
+            round_instruction=ROUND_INSTRUCTIONS[_round_phase(current_round, total_rounds)],
+        )
 
     def _build_messages(
         self,
         conversation_history: list[BattleMessage],
         current_round: int,
         total_rounds: int,
+        history_summary: str | None = None,
     ) -> list[dict]:
-        """Convert battle messages to provider-agnostic message format"""
+        """Convert battle messages (plus a summary of collapsed turns) to provider-agnostic format"""
         messages = []
+        if history_summary:
+            messages.append({"role": "user", "content": history_summary})
         for msg in conversation_history:
             messages.append({
                 "role": "assistant" if msg.provider else "user",
-                "content": f"[{msg.name}]: {msg.content}",
+                "content": format_turn(msg),
             })
 
         if not messages:
@@ -171,84 +728,219 @@ RULES:
 
         return messages
 
-    async def _call_openai(
+    def _log_llm_span(
         self,
-        system_prompt: str,
+        trace_name: str,
+        provider: LLMProvider,
+        model: str,
+        system_prompt: SystemPrompt,
         messages: list[dict],
-    ) -> str:
-        """Call OpenAI API; trace named for Galileo."""
-        logger = galileo_context.get_logger_instance()
-        trace_input = messages[-1]["content"] if messages else ""
-        logger.start_trace(name="OpenAI (LLM Wars)", input=trace_input)
-
-        response = self._openai_client.chat.completions.create(
-            model=MODEL_MAP[LLMProvider.OPENAI],
-            messages=[
-                {"role": "system", "content": system_prompt},
-                *messages,
-            ],
-            max_tokens=100,
-            temperature=0.9,
+        output: str,
+        usage: TokenUsage,
+        start_time_ns: int,
+    ) -> None:
+        """Record token usage and queue the turn's Galileo trace for background export."""
+        counts = self._token_usage[provider.value]
+        counts["calls"] += 1
+        counts["input_tokens"] += usage.input_tokens
+        counts["cached_input_tokens"] += usage.cached_input_tokens
+        counts["output_tokens"] += usage.output_tokens
+        TOKENS_TOTAL.inc(usage.input_tokens - usage.cached_input_tokens, provider=provider.value, kind="input")
+        TOKENS_TOTAL.inc(usage.cached_input_tokens, provider=provider.value, kind="cached_input")
+        TOKENS_TOTAL.inc(usage.output_tokens, provider=provider.value, kind="output")
+        TURN_TOKENS.observe(usage.input_tokens + usage.output_tokens, provider=provider.value)
+
+        tracer = get_tracer()
+        if not tracer.enabled:
+            return
+        tracer.record(TraceRecord(
+            session=trace_session.get(),
+            name=trace_name,
+            input=messages[-1]["content"] if messages else "",
+            output=output,
+            span={
+                "input": [{"role": "system", "content": system_prompt.text}] + messages,
+                "output": output,
+                "model": model,
+                "num_input_tokens": usage.input_tokens,
+                "num_output_tokens": usage.output_tokens,
+                "total_tokens": usage.input_tokens + usage.output_tokens,
+                "duration_ns": _now_ns() - start_time_ns,
+                "metadata": {"cached_input_tokens": usage.cached_input_tokens},
+            },
+        ))
+
+    async def _call_openai_compatible(
+        self,
+        client,
+        provider: LLMProvider,
+        model: str,
+        system_prompt: SystemPrompt,
+        messages: list[dict],
+    ) -> tuple[str, TokenUsage]:
+        """Call an OpenAI-compatible chat completions API."""
+        response = await self._schedulers[provider].run(
+            lambda: self._round_trip(provider, client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt.text},
+                    *messages,
+                ],
+                **SAMPLING_PARAMS[provider],
+            )),
+            _estimate_tokens(provider, system_prompt, messages),
         )
-        output = response.choices[0].message.content or ""
-        logger.conclude(output=output)
-        return output
+        return response.choices[0].message.content or "", _openai_usage(response.usage)
 
-    async def _call_claude(
+    async def _stream_openai_compatible(
         self,
-        system_prompt: str,
+        client,
+        provider: LLMProvider,
+        model: str,
+        trace_name: str,
+        system_prompt: SystemPrompt,
         messages: list[dict],
-    ) -> str:
-        """Call Anthropic Claude API; logs to Galileo via manual Logger API."""
-        logger = galileo_context.get_logger_instance()
-        trace_input = messages[-1]["content"] if messages else ""
-        logger.start_trace(name="Claude (LLM Wars)", input=trace_input)
-        start_time_ns = int(datetime.now().timestamp() * 1_000_000_000)
-
-        response = self._anthropic_client.messages.create(
-            model=MODEL_MAP[LLMProvider.CLAUDE],
-            max_tokens=100,
-            system=system_prompt,
-            messages=messages,
+        stop: StopController,
+    ) -> AsyncGenerator[str, None]:
+        """Stream an OpenAI-compatible chat completion, closing it early once `stop` says so."""
+        start_time_ns = _now_ns()
+
+        async def chunks():
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt.text},
+                    *messages,
+                ],
+                **SAMPLING_PARAMS[provider],
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.close()  # Releases the HTTP response when the turn stops early
+
+        parts: list[str] = []
+        usage = None
+        first_delta_at = None
+        # aclosing: breaking out closes the scheduler's generator and, through it, the HTTP stream
+        async with aclosing(self._schedulers[provider].stream(
+            chunks, _estimate_tokens(provider, system_prompt, messages),
+        )) as stream:
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    first_delta_at = first_delta_at or time.perf_counter()
+                    delta = stop.feed(chunk.choices[0].delta.content)
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                    if stop.stopped:
+                        break
+
+        output = "".join(parts)
+        if stop.stopped:
+            self._record_early_stop(provider, stop, output, time.perf_counter() - first_delta_at)
+        token_usage = _openai_usage(usage) if usage else _estimated_usage(provider, system_prompt, messages, output)
+        self._log_llm_span(trace_name, provider, model, system_prompt, messages, output, token_usage, start_time_ns)
+
+    async def _stream_claude(
+        self,
+        system_prompt: SystemPrompt,
+        messages: list[dict],
+        stop: StopController,
+        model: str = MODEL_MAP[LLMProvider.CLAUDE],
+    ) -> AsyncGenerator[str, None]:
+        """Stream from Anthropic Claude API, closing the stream early once `stop` says so."""
+        start_time_ns = _now_ns()
+
+        final: dict = {}
+
+        async def deltas():
+            async with self._anthropic_client.messages.stream(
+                model=model,
+                **SAMPLING_PARAMS[LLMProvider.CLAUDE],
+                system=_claude_system_blocks(system_prompt),
+                messages=messages,
+            ) as stream:
+                async for delta in stream.text_stream:
+                    yield delta
+                final["response"] = await stream.get_final_message()
+
+        parts: list[str] = []
+        first_delta_at = None
+        async with aclosing(self._schedulers[LLMProvider.CLAUDE].stream(
+            deltas, _estimate_tokens(LLMProvider.CLAUDE, system_prompt, messages),
+        )) as stream:
+            async for delta in stream:
+                first_delta_at = first_delta_at or time.perf_counter()
+                delta = stop.feed(delta)
+                if delta:
+                    parts.append(delta)
+                    yield delta
+                if stop.stopped:
+                    break
+
+        if stop.stopped:
+            # Closed before message_stop, so there is no final message with usage
+            output_text = "".join(parts)
+            self._record_early_stop(LLMProvider.CLAUDE, stop, output_text, time.perf_counter() - first_delta_at)
+            usage = _estimated_usage(LLMProvider.CLAUDE, system_prompt, messages, output_text)
+        else:
+            response = final["response"]
+            output_text = response.content[0].text if response.content else ""
+            usage = _anthropic_usage(response.usage)
+        self._log_llm_span(
+            "Claude (LLM Wars)",
+            LLMProvider.CLAUDE,
+            model,
+            system_prompt,
+            messages,
+            output_text,
+            usage,
+            start_time_ns,
         )
-        output_text = response.content[0].text if response.content else ""
 
-        logged_messages = [{"role": "system", "content": system_prompt}] + messages
-        duration_ns = int(datetime.now().timestamp() * 1_000_000_000) - start_time_ns
-        usage = response.usage
-        logger.add_llm_span(
-            input=logged_messages,
-            output=output_text,
-            model=MODEL_MAP[LLMProvider.CLAUDE],
-            num_input_tokens=usage.input_tokens,
-            num_output_tokens=usage.output_tokens,
-            total_tokens=usage.input_tokens + usage.output_tokens,
-            duration_ns=duration_ns,
+    async def _call_openai(
+        self,
+        system_prompt: SystemPrompt,
+        messages: list[dict],
+        model: str = MODEL_MAP[LLMProvider.OPENAI],
+    ) -> tuple[str, TokenUsage]:
+        """Call OpenAI API."""
+        return await self._call_openai_compatible(
+            self._openai_client, LLMProvider.OPENAI, model, system_prompt, messages,
         )
-        logger.conclude(output=output_text)
-        logger.flush()
 
-        return output_text
+    async def _call_claude(
+        self,
+        system_prompt: SystemPrompt,
+        messages: list[dict],
+        model: str = MODEL_MAP[LLMProvider.CLAUDE],
+    ) -> tuple[str, TokenUsage]:
+        """Call Anthropic Claude API."""
+        response = await self._schedulers[LLMProvider.CLAUDE].run(
+            lambda: self._round_trip(LLMProvider.CLAUDE, self._anthropic_client.messages.create(
+                model=model,
+                **SAMPLING_PARAMS[LLMProvider.CLAUDE],
+                system=_claude_system_blocks(system_prompt),
+                messages=messages,
+            )),
+            _estimate_tokens(LLMProvider.CLAUDE, system_prompt, messages),
+        )
+        output_text = response.content[0].text if response.content else ""
+        return output_text, _anthropic_usage(response.usage)
 
     async def _call_grok(
         self,
-        system_prompt: str,
+        system_prompt: SystemPrompt,
         messages: list[dict],
-    ) -> str:
-        """Call xAI Grok API (OpenAI-compatible); trace named for Galileo."""
-        logger = galileo_context.get_logger_instance()
-        trace_input = messages[-1]["content"] if messages else ""
-        logger.start_trace(name="Grok (LLM Wars)", input=trace_input)
-
-        response = self._grok_client.chat.completions.create(
-            model=MODEL_MAP[LLMProvider.GROK],
-            messages=[
-                {"role": "system", "content": system_prompt},
-                *messages,
-            ],
-            max_tokens=100,
-            temperature=0.9,
+        model: str = MODEL_MAP[LLMProvider.GROK],
+    ) -> tuple[str, TokenUsage]:
+        """Call xAI Grok API (OpenAI-compatible)."""
+        return await self._call_openai_compatible(
+            self._grok_client, LLMProvider.GROK, model, system_prompt, messages,
         )
-        output = response.choices[0].message.content or ""
-        logger.conclude(output=output)
-        return output
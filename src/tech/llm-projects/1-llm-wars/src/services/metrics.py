@@ -0,0 +1,261 @@
+"""
+Metrics - In-process counters, gauges and histograms in Prometheus text format
+"""
+
+import asyncio
+import bisect
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value: float, **labels: str) -> None:
+        """Mirror a cumulative count that another component keeps"""
+        self._values[self._key(labels)] = value
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labels)
+        self._buckets = tuple(buckets)
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._values: dict[LabelValues, tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts, total = self._values.get(key) or ([0] * (len(self._buckets) + 1), 0.0)
+        counts[bisect.bisect_left(self._buckets, value)] += 1
+        self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the block (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self._buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Every metric exposed on /metrics"""
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry()
+
+PROVIDER_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "llm_provider_request_seconds", "LLM provider call latency", ("provider", "model", "outcome"),
+))
+TIME_TO_FIRST_TOKEN_SECONDS = REGISTRY.register(Histogram(
+    "llm_time_to_first_token_seconds", "Time from request to first streamed delta", ("provider", "model"),
+))
+TURN_TOKENS = REGISTRY.register(Histogram(
+    "llm_turn_tokens", "Input plus output tokens per LLM turn", ("provider",), buckets=TOKEN_BUCKETS,
+))
+TOKENS_TOTAL = REGISTRY.register(Counter(
+    "llm_tokens_total", "Tokens billed by providers", ("provider", "kind"),
+))
+EARLY_STOPS_TOTAL = REGISTRY.register(Counter(
+    "llm_early_stops_total", "Streamed turns closed at the sentence or emoji limit", ("provider", "reason"),
+))
+EARLY_STOP_TOKENS_SAVED = REGISTRY.register(Counter(
+    "llm_early_stop_tokens_saved_total", "Output tokens left of max_tokens when a stream was closed early",
+    ("provider",),
+))
+EARLY_STOP_SECONDS_SAVED = REGISTRY.register(Counter(
+    "llm_early_stop_seconds_saved_total", "Estimated generation time those tokens would have taken",
+    ("provider",),
+))
+PROVIDER_ERRORS_TOTAL = REGISTRY.register(Counter(
+    "llm_provider_errors_total", "Failed LLM provider calls", ("provider", "error"),
+))
+DB_OPERATION_SECONDS = REGISTRY.register(Histogram(
+    "db_operation_seconds", "Database unit-of-work latency", ("operation",),
+))
+BATTLES_ACTIVE = REGISTRY.register(Gauge(
+    "battles_active", "Battles currently being generated",
+))
+BATTLE_ERRORS_TOTAL = REGISTRY.register(Counter(
+    "battle_errors_total", "Battles that ended in the error state",
+))
+SSE_STREAMS_ACTIVE = REGISTRY.register(Gauge(
+    "sse_streams_active", "Open battle SSE connections",
+))
+PROVIDER_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "llm_provider_queue_depth", "Requests waiting for provider rate-limit admission", ("provider",),
+))
+PROVIDER_IN_FLIGHT = REGISTRY.register(Gauge(
+    "llm_provider_in_flight", "Provider requests currently running", ("provider",),
+))
+BATTLE_STORE_SIZE = REGISTRY.register(Gauge(
+    "battle_store_size", "Battles held in the in-memory store",
+))
+BATTLE_STORE_LOOKUPS_TOTAL = REGISTRY.register(Counter(
+    "battle_store_lookups_total", "In-memory battle store lookups", ("result",),
+))
+BATTLE_STORE_EVICTIONS_TOTAL = REGISTRY.register(Counter(
+    "battle_store_evictions_total", "Battles evicted from the in-memory store",
+))
+PROVIDER_SCHEDULER_EVENTS_TOTAL = REGISTRY.register(Counter(
+    "llm_provider_scheduler_events_total", "Provider scheduler requests, retries, failures and rejections",
+    ("provider", "event"),
+))
+PROVIDER_ADMISSION_WAIT_MAX_SECONDS = REGISTRY.register(Gauge(
+    "llm_provider_admission_wait_max_seconds", "Longest wait for provider rate-limit admission", ("provider",),
+))
+RESPONSE_CACHE_ENTRIES = REGISTRY.register(Gauge(
+    "llm_response_cache_entries", "Replies held in the response cache", ("tier",),
+))
+RESPONSE_CACHE_DISK_BYTES = REGISTRY.register(Gauge(
+    "llm_response_cache_disk_bytes", "Size of the on-disk response cache",
+))
+RESPONSE_CACHE_LOOKUPS_TOTAL = REGISTRY.register(Counter(
+    "llm_response_cache_lookups_total", "Response cache lookups", ("result",),
+))
+STATE_EVENTS_TOTAL = REGISTRY.register(Counter(
+    "state_events_total", "Battle events published, dropped by slow subscribers, or received from other workers",
+    ("event",),
+))
+STATE_SUBSCRIBERS = REGISTRY.register(Gauge(
+    "state_subscribers", "Subscribers to the battle state backend",
+))
+BATTLE_HUBS = REGISTRY.register(Gauge(
+    "battle_hubs", "Live battle stream hubs in this worker", ("state",),
+))
+BATTLE_HUB_SUBSCRIBERS = REGISTRY.register(Gauge(
+    "battle_hub_subscribers", "Viewers attached to battle stream hubs",
+))
+LEADERBOARD_VOTES = REGISTRY.register(Gauge(
+    "leaderboard_votes", "Votes reflected in this worker's ratings",
+))
+PERSONA_REGISTRY_VERSION = REGISTRY.register(Gauge(
+    "persona_registry_version", "Successful persona and topic file reloads",
+))
+PERSONA_RELOAD_ERRORS_TOTAL = REGISTRY.register(Counter(
+    "persona_reload_errors_total", "Persona or topic file reloads that failed",
+))
+BATCH_JOBS = REGISTRY.register(Gauge(
+    "batch_jobs", "Batch jobs kept for progress polling",
+))
+BATCH_BATTLES = REGISTRY.register(Gauge(
+    "batch_battles", "Batch battles waiting for or holding a batch worker", ("state",),
+))
+SURPRISE_POOL_SIZE = REGISTRY.register(Gauge(
+    "surprise_pool_size", "Pre-generated surprise battle ideas ready to serve",
+))
+TRACING_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "tracing_queue_depth", "Trace spans waiting for export",
+))
+TRACING_SPANS_TOTAL = REGISTRY.register(Counter(
+    "tracing_spans_total", "Trace spans by export outcome", ("outcome",),
+))
+EVENT_LOOP_LAG_SECONDS = REGISTRY.register(Gauge(
+    "event_loop_lag_seconds", "How late the last event-loop heartbeat woke up",
+))
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Sleep `interval` in a loop and record how late each wake-up was"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.set(max(loop.time() - start - interval, 0.0))
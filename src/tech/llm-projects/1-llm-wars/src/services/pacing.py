@@ -0,0 +1,88 @@
+"""
+Pacing - Releases battle stream items to viewers independently of generation
+"""
+
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator
+from typing import Any
+
+from ..models.battle import BattleEvent, BattleEventType, BattleMessage
+
+_DONE = object()
+
+
+def _is_turn_end(item: Any) -> bool:
+    """A turn ends with a whole BattleMessage or a message_end event (possibly wrapped in a HubEvent)"""
+    item = getattr(item, "item", item)
+    if isinstance(item, BattleMessage):
+        return True
+    return isinstance(item, BattleEvent) and item.type == BattleEventType.MESSAGE_END
+
+
+class DeliveryScheduler:
+    """
+    Generate-ahead buffer plus pacing for battle streams.
+
+    A producer task drains the battle generator into a queue, running at most
+    `generate_ahead` turns ahead of what has been delivered. Delivery waits
+    `pace_seconds` between turns; with a pace of 0, buffered turns are
+    handed over as soon as they exist.
+    """
+
+    def __init__(self, pace_seconds: float, generate_ahead: int = 1) -> None:
+        self._pace_seconds = max(pace_seconds, 0.0)
+        self._generate_ahead = max(generate_ahead, 1)
+
+    async def deliver(self, source: AsyncIterator[Any]) -> AsyncGenerator[Any, None]:
+        """Yield items from source, paced per turn"""
+        queue: asyncio.Queue = asyncio.Queue()
+        turn_slots = asyncio.Semaphore(self._generate_ahead)
+
+        async def produce() -> None:
+            # A slot is taken before a turn starts generating and given back once it is delivered
+            iterator = aiter(source)
+            in_turn = False
+            try:
+                while True:
+                    if not in_turn:
+                        await turn_slots.acquire()
+                        in_turn = True
+                    try:
+                        item = await anext(iterator)
+                    except StopAsyncIteration:
+                        break
+                    await queue.put(item)
+                    if _is_turn_end(item):
+                        in_turn = False
+            except Exception as e:
+                await queue.put(e)
+            finally:
+                await queue.put(_DONE)
+
+        producer = asyncio.create_task(produce())
+        loop = asyncio.get_running_loop()
+        release_at = loop.time()
+        turn_open = False
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                if not turn_open:
+                    delay = release_at - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    turn_open = True
+
+                yield item
+
+                if _is_turn_end(item):
+                    turn_open = False
+                    release_at = loop.time() + self._pace_seconds
+                    turn_slots.release()
+        finally:
+            if not producer.done():
+                producer.cancel()
@@ -0,0 +1,165 @@
+"""
+Persona Registry - Shared personas and topics, reloaded when their files change
+"""
+
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+SHARED_DIR = Path(__file__).parent.parent.parent / "shared"
+SEATS = ("openai", "claude", "grok")
+
+
+class Persona(NamedTuple):
+    id: str
+    label: str
+    description: str
+    world: str
+    prompt_line: str  # " - Label: description", as listed in the surprise prompt
+
+
+class Topic(NamedTuple):
+    id: str
+    topic: str
+    characters: tuple[Persona, ...]
+
+
+class RegistrySnapshot(NamedTuple):
+    """One consistent load of personas.json and topics.json with its lookup tables"""
+
+    personas: tuple[Persona, ...]
+    topics: tuple[Topic, ...]
+    by_key: dict[str, Persona]  # id, label and description -> persona
+    persona_prompt: str  # Every prompt_line, newline-joined
+    presets: tuple[dict, ...]  # Topics with three known characters, as raw surprise configs
+
+    @classmethod
+    def empty(cls) -> "RegistrySnapshot":
+        return cls((), (), {}, " - (Could not load personas)", ())
+
+    @classmethod
+    def load(cls, directory: Path) -> "RegistrySnapshot":
+        with open(directory / "personas.json") as f:
+            personas = tuple(
+                Persona(
+                    id=p["id"],
+                    label=p["label"],
+                    description=p["description"],
+                    world=p.get("world", ""),
+                    prompt_line=f" - {p['label']}: {p['description']}",
+                )
+                for p in json.load(f)
+            )
+        by_key: dict[str, Persona] = {}
+        for persona in personas:
+            # Descriptions win over ids and labels: they are what battles send as the persona
+            for key in (persona.id, persona.label):
+                by_key.setdefault(key, persona)
+        by_key.update({persona.description: persona for persona in personas})
+
+        topics_path = directory / "topics.json"
+        topics: tuple[Topic, ...] = ()
+        if topics_path.exists():
+            with open(topics_path) as f:
+                by_id = {persona.id: persona for persona in personas}
+                topics = tuple(
+                    Topic(
+                        id=t.get("id", ""),
+                        topic=t["topic"],
+                        characters=tuple(by_id[c] for c in t.get("characters", []) if c in by_id),
+                    )
+                    for t in json.load(f)
+                )
+
+        return cls(
+            personas=personas,
+            topics=topics,
+            by_key=by_key,
+            persona_prompt="\n".join(persona.prompt_line for persona in personas),
+            presets=tuple(
+                {
+                    "topic": topic.topic,
+                    "personas": dict(zip(SEATS, (persona.description for persona in topic.characters))),
+                }
+                for topic in topics
+                if len(topic.characters) == 3
+            ),
+        )
+
+
+class PersonaRegistry:
+    """
+    Personas and topics from the shared/ JSON files, indexed for O(1) lookup.
+
+    Every load builds a complete RegistrySnapshot and swaps it in with one
+    assignment, so readers never see a half-updated registry. Lookups stat
+    the files at most every `check_interval_seconds` and reload when an
+    mtime changed; a file that fails to parse keeps the previous snapshot.
+    """
+
+    def __init__(self, directory: Path = SHARED_DIR, check_interval_seconds: float = 2.0) -> None:
+        self._directory = directory
+        self._check_interval = check_interval_seconds
+        self._snapshot = RegistrySnapshot.empty()
+        self._mtimes: tuple[int | None, ...] | None = None
+        self._checked_at = float("-inf")
+        self.version = 0  # Bumped on every successful reload
+        self.reload_errors = 0
+
+    def snapshot(self) -> RegistrySnapshot:
+        now = time.monotonic()
+        if now - self._checked_at >= self._check_interval:
+            self._checked_at = now
+            self._reload_if_changed()
+        return self._snapshot
+
+    def persona(self, key: str) -> Persona | None:
+        """Persona by id, label or description"""
+        return self.snapshot().by_key.get(key)
+
+    def world(self, persona: str) -> str:
+        """The persona's world ("" for custom personas)"""
+        found = self.persona(persona)
+        return found.world if found else ""
+
+    def stats(self) -> dict[str, int]:
+        snapshot = self._snapshot
+        return {
+            "personas": len(snapshot.personas),
+            "topics": len(snapshot.topics),
+            "version": self.version,
+            "reload_errors": self.reload_errors,
+        }
+
+    def _file_mtimes(self) -> tuple[int | None, ...]:
+        mtimes = []
+        for name in ("personas.json", "topics.json"):
+            try:
+                mtimes.append((self._directory / name).stat().st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _reload_if_changed(self) -> None:
+        mtimes = self._file_mtimes()
+        if mtimes == self._mtimes:
+            return
+        self._mtimes = mtimes
+        try:
+            snapshot = RegistrySnapshot.load(self._directory)
+        except Exception as e:
+            self.reload_errors += 1
+            print(f"⚠️  Could not load personas/topics (keeping the previous ones): {e}")
+            return
+        self._snapshot = snapshot
+        self.version += 1
+        if self.version > 1:
+            print(f"🔄 Reloaded {len(snapshot.personas)} personas and {len(snapshot.topics)} topics")
+
+
+@lru_cache()
+def get_persona_registry() -> PersonaRegistry:
+    """Process-wide registry of the shared personas and topics"""
+    return PersonaRegistry()
@@ -0,0 +1,222 @@
+"""
+Rate Limiter - Per-provider request scheduling with token buckets, retries and backoff
+"""
+
+import asyncio
+import random
+import sys
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+from contextlib import aclosing, asynccontextmanager
+from typing import Any
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class ProviderOverloadedError(Exception):
+    """Raised when a provider's request queue is full"""
+
+
+class TokenBucket:
+    """Refills `per_minute` units evenly over a minute; a limit of 0 means unlimited"""
+
+    def __init__(self, per_minute: float) -> None:
+        self._capacity = per_minute
+        self._rate = per_minute / 60
+        self._available = per_minute
+        self._updated = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available"""
+        if self._capacity <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._available = min(self._capacity, self._available + (now - self._updated) * self._rate)
+        self._updated = now
+        # A request larger than the bucket waits for a full bucket instead of forever
+        missing = min(amount, self._capacity) - self._available
+        return max(missing / self._rate, 0.0)
+
+    def take(self, amount: float) -> None:
+        if self._capacity > 0:
+            self._available -= min(amount, self._capacity)
+
+
+def _status_code(error: Exception) -> int | None:
+    return getattr(error, "status_code", None)
+
+
+def _connection_errors() -> tuple[type[Exception], ...]:
+    """APIConnectionError of each provider SDK imported so far (they are imported lazily)"""
+    return tuple(sys.modules[sdk].APIConnectionError for sdk in ("openai", "anthropic") if sdk in sys.modules)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts, 5xx and dropped connections are worth retrying"""
+    if isinstance(error, _connection_errors()):
+        return True
+    status = _status_code(error)
+    return status is not None and (status in RETRYABLE_STATUS or status >= 500)
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Server-requested delay in seconds, from Retry-After(-ms) headers"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass  # HTTP-date form; fall back to exponential backoff
+    return None
+
+
+class ProviderScheduler:
+    """
+    Admission control for one LLM provider.
+
+    Requests queue FIFO (so large prompts are not starved by small ones) for
+    a request/min bucket, a token/min bucket and a concurrency slot. When
+    more than `max_queue_depth` requests are waiting, new ones fail fast
+    with ProviderOverloadedError. Retryable failures back off exponentially
+    with jitter; a Retry-After header pauses the whole provider for the
+    requested time, since every queued request would hit the same limit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 10,
+        max_queue_depth: int = 200,
+        max_retries: int = 4,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 30.0,
+    ) -> None:
+        self.name = name
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._concurrency = asyncio.Semaphore(max_concurrency)
+        self._admission = asyncio.Lock()  # asyncio.Lock wakes waiters in FIFO order
+        self._max_queue_depth = max_queue_depth
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base_seconds
+        self._backoff_max = backoff_max_seconds
+        self._paused_until = 0.0
+        self._waiting = 0
+        self._in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def run(self, call: Callable[[], Awaitable[Any]], estimated_tokens: int) -> Any:
+        """Await call() once admitted, retrying retryable failures"""
+        attempt = 0
+        while True:
+            async with self._slot(estimated_tokens):
+                try:
+                    return await call()
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        self.failures += 1
+                        raise
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def stream(
+        self, open_stream: Callable[[], AsyncIterator[Any]], estimated_tokens: int
+    ) -> AsyncGenerator[Any, None]:
+        """Yield from open_stream() once admitted; retries only until the first item arrives"""
+        attempt = 0
+        while True:
+            started = False
+            async with self._slot(estimated_tokens):
+                try:
+                    # A consumer that stops early closes this generator; pass that on to the provider stream
+                    async with aclosing(open_stream()) as items:
+                        async for item in items:
+                            started = True
+                            yield item
+                    return
+                except Exception as e:
+                    delay = None if started else self._retry_delay(e, attempt)
+                    if delay is None:
+                        self.failures += 1
+                        raise
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting for admission"""
+        return self._waiting
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "queue_depth": self._waiting,
+            "in_flight": self._in_flight,
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "wait_seconds_avg": self.wait_seconds_total / self.requests if self.requests else 0.0,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+    @asynccontextmanager
+    async def _slot(self, estimated_tokens: int) -> AsyncGenerator[None, None]:
+        """Wait in line for rate budget and a concurrency slot"""
+        if self._waiting >= self._max_queue_depth:
+            self.rejected += 1
+            raise ProviderOverloadedError(f"{self.name} request queue is full ({self._waiting} waiting)")
+
+        loop = asyncio.get_running_loop()
+        enqueued_at = loop.time()
+        self._waiting += 1
+        try:
+            async with self._admission:
+                while True:
+                    delay = max(
+                        self._paused_until - loop.time(),
+                        self._requests.wait_time(1),
+                        self._tokens.wait_time(estimated_tokens),
+                    )
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                self._requests.take(1)
+                self._tokens.take(estimated_tokens)
+            await self._concurrency.acquire()
+        finally:
+            self._waiting -= 1
+
+        waited = loop.time() - enqueued_at
+        self.requests += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._concurrency.release()
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float | None:
+        """Seconds to wait before retrying, or None if the error is final"""
+        if attempt >= self._max_retries or not _is_retryable(error):
+            return None
+
+        self.retries += 1
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            self._paused_until = max(self._paused_until, asyncio.get_running_loop().time() + retry_after)
+            return retry_after
+
+        backoff = min(self._backoff_max, self._backoff_base * 2**attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2)
@@ -0,0 +1,83 @@
+"""
+Resilience - Latency tracking, hedged requests and provider circuit breaking
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window: int = 100, min_samples: int = 20) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """Latency at quantile q, or None until enough samples exist"""
+        if len(self._samples) < max(self._min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and stays open for `cooldown_seconds`"""
+
+    def __init__(self, failure_threshold: int = 3, cooldown_seconds: float = 60.0) -> None:
+        self._failure_threshold = failure_threshold
+        self._cooldown_seconds = cooldown_seconds
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self._failure_threshold:
+            self._open_until = time.monotonic() + self._cooldown_seconds
+            self._consecutive_failures = 0
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    hedge_after: float | None,
+    can_hedge: Callable[[], bool] = lambda: True,
+) -> T:
+    """
+    Await call(); if it is still running after `hedge_after` seconds and
+    can_hedge() allows it then, start a duplicate and return whichever
+    succeeds first (the other is cancelled).
+    """
+    tasks = [asyncio.ensure_future(call())]
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done and can_hedge():
+                tasks.append(asyncio.ensure_future(call()))
+
+        pending = set(tasks)
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
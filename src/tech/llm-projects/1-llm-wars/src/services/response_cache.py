@@ -0,0 +1,154 @@
+"""
+Response Cache - Content-addressed cache of LLM turn replies (memory + disk)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+
+def cache_key(provider: str, model: str, system_prompt: str, messages: list[dict], params: dict) -> str:
+    """SHA-256 over everything that determines a provider's reply"""
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "system": system_prompt,
+            "messages": messages,
+            "params": params,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier reply cache keyed by `cache_key`.
+
+    The memory tier is an LRU of at most `memory_max_entries` replies. The
+    disk tier stores one JSON file per key under `directory` and evicts the
+    least recently used files once they exceed `disk_max_bytes`. Disk I/O
+    runs in a worker thread so lookups never block the event loop.
+    """
+
+    def __init__(self, directory: Path, memory_max_entries: int = 1000, disk_max_bytes: int = 100_000_000) -> None:
+        self._directory = directory
+        self._memory_max_entries = memory_max_entries
+        self._disk_max_bytes = disk_max_bytes
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        # key -> file size, in access order; built lazily from the directory
+        self._disk_index: OrderedDict[str, int] | None = None
+        self._disk_bytes = 0
+        self._lock = asyncio.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> str | None:
+        """Return a cached reply, promoting disk hits into memory"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return self._memory[key]
+
+        if self._disk_max_bytes > 0:
+            async with self._lock:
+                index = await self._index()
+                if key in index:
+                    reply = await asyncio.to_thread(self._read, key)
+                    if reply is not None:
+                        index.move_to_end(key)
+                        self.disk_hits += 1
+                        self._remember(key, reply)
+                        return reply
+                    self._disk_bytes -= index.pop(key)
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, reply: str) -> None:
+        """Store a reply in both tiers"""
+        self._remember(key, reply)
+        if self._disk_max_bytes <= 0:
+            return
+
+        async with self._lock:
+            index = await self._index()
+            try:
+                size = await asyncio.to_thread(self._write, key, reply)
+            except OSError as e:
+                print(f"⚠️  Could not write response cache entry: {e}")
+                return
+            self._disk_bytes += size - index.pop(key, 0)
+            index[key] = size
+
+            stale = []
+            while self._disk_bytes > self._disk_max_bytes and len(index) > 1:
+                old_key, old_size = index.popitem(last=False)
+                self._disk_bytes -= old_size
+                stale.append(old_key)
+            if stale:
+                await asyncio.to_thread(self._delete, stale)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "memory_size": len(self._memory),
+            "disk_size": len(self._disk_index or {}),
+            "disk_bytes": self._disk_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    def _remember(self, key: str, reply: str) -> None:
+        self._memory[key] = reply
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_max_entries:
+            self._memory.popitem(last=False)
+
+    async def _index(self) -> OrderedDict[str, int]:
+        if self._disk_index is None:
+            self._disk_index = await asyncio.to_thread(self._scan)
+            self._disk_bytes = sum(self._disk_index.values())
+        return self._disk_index
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{key}.json"
+
+    def _scan(self) -> OrderedDict[str, int]:
+        """Index existing entries, oldest modification first"""
+        if not self._directory.is_dir():
+            return OrderedDict()
+        entries = []
+        for path in self._directory.glob("*.json"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        return OrderedDict((key, size) for _, key, size in sorted(entries))
+
+    def _read(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                reply = json.load(f)["reply"]
+            os.utime(path)  # Keeps recency across restarts
+            return reply
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write(self, key: str, reply: str) -> int:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"reply": reply}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path.stat().st_size
+
+    def _delete(self, keys: list[str]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
@@ -0,0 +1,247 @@
+"""
+State Backend - Battle claims and live event fan-out shared by API workers
+"""
+
+import asyncio
+import json
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, NamedTuple
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..models.battle import BattleStatus
+from ..models.database import Battle, get_engine, is_postgres_url
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7900
+
+
+class BattleNotPersistedError(LookupError):
+    """A battle the shared backend cannot claim or share because it has no database row"""
+
+
+class StateEvent(NamedTuple):
+    """A battle change published by this worker or (remote=True) another one"""
+
+    battle_id: str
+    payload: dict[str, Any]
+    remote: bool = False
+
+
+class InProcessStateBackend:
+    """
+    Single-worker backend: claims always succeed (the caller has already
+    checked the battle's status, without yielding to the event loop) and
+    events only reach subscribers in this process.
+
+    Subscriber queues are bounded; a subscriber that falls behind loses its
+    oldest events rather than blocking the publisher.
+    """
+
+    QUEUE_SIZE = 1000
+
+    def __init__(self) -> None:
+        # Battle id (None = every battle) -> subscriber queues
+        self._subscribers: dict[str | None, set[asyncio.Queue]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def shared(self) -> bool:
+        """Whether other workers see this worker's claims and events"""
+        return False
+
+    @property
+    def connected(self) -> bool:
+        """Whether events from other workers are currently being received"""
+        return True
+
+    async def start(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+    async def claim(self, battle_id: str) -> bool:
+        """Mark a pending battle as running; False if another worker already did"""
+        return True
+
+    async def publish(self, battle_id: str, payload: dict[str, Any]) -> None:
+        self.published += 1
+        self._deliver(StateEvent(battle_id, payload))
+
+    @asynccontextmanager
+    async def subscribe(self, battle_id: str | None = None) -> AsyncIterator[asyncio.Queue]:
+        """Queue of StateEvents for one battle, or for every battle when battle_id is None"""
+        queue: asyncio.Queue[StateEvent] = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._subscribers.setdefault(battle_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(battle_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[battle_id]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": "memory",
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+    def _deliver(self, event: StateEvent) -> None:
+        for key in (event.battle_id, None):
+            for queue in self._subscribers.get(key, ()):
+                if queue.full():
+                    queue.get_nowait()
+                    self.dropped += 1
+                queue.put_nowait(event)
+
+
+class PostgresStateBackend(InProcessStateBackend):
+    """
+    Multi-worker backend on the battles table and LISTEN/NOTIFY.
+
+    A claim is a conditional UPDATE (pending -> in_progress), so exactly one
+    worker runs each battle. Events are delivered locally right away and
+    NOTIFYed to the other workers, each of which holds one connection
+    LISTENing on the channel (re-established if it drops). That connection
+    comes from `listen_engine`, an unpooled engine, so it is not taken out
+    of the request pool for the life of the process. Payloads too
+    large for NOTIFY are sent as {"type": "invalidate"} so receivers reload
+    the battle from the database instead.
+    """
+
+    CHANNEL = "llm_wars_battle_events"
+    RECONNECT_SECONDS = 1.0
+
+    def __init__(self, engine: AsyncEngine, listen_engine: AsyncEngine | None = None) -> None:
+        super().__init__()
+        self._engine = engine
+        self._listen_engine = listen_engine or engine
+        self._worker_id = uuid.uuid4().hex
+        self._listen_task: asyncio.Task | None = None
+        self._listening = asyncio.Event()
+        self.received = 0
+
+    @property
+    def shared(self) -> bool:
+        return True
+
+    @property
+    def connected(self) -> bool:
+        return self._listening.is_set()
+
+    async def start(self) -> None:
+        if self._listen_task is None:
+            self._listen_task = asyncio.create_task(self._listen())
+            await asyncio.wait_for(self._listening.wait(), timeout=10)
+
+    async def aclose(self) -> None:
+        if self._listen_task:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+            self._listen_task = None
+        if self._listen_engine is not self._engine:
+            await self._listen_engine.dispose()
+
+    async def claim(self, battle_id: str) -> bool:
+        """Raises BattleNotPersistedError when the battle has no row to claim"""
+        async with self._engine.begin() as conn:
+            result = await conn.execute(
+                update(Battle)
+                .where(Battle.id == battle_id, Battle.status == BattleStatus.PENDING.value)
+                .values(status=BattleStatus.IN_PROGRESS.value)
+            )
+            if result.rowcount == 0 and await conn.scalar(select(Battle.id).where(Battle.id == battle_id)) is None:
+                raise BattleNotPersistedError(f"Battle {battle_id} was never saved to the database")
+        return result.rowcount == 1
+
+    async def publish(self, battle_id: str, payload: dict[str, Any]) -> None:
+        await super().publish(battle_id, payload)
+        try:
+            await self._notify(self._notify_payload(battle_id, payload))
+        except Exception as e:
+            print(f"⚠️  Could not NOTIFY battle event for {battle_id}: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), "backend": "postgres", "listening": self._listening.is_set(), "received": self.received}
+
+    async def _notify(self, message: str) -> None:
+        async with self._engine.begin() as conn:
+            await conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.CHANNEL, "payload": message})
+
+    def _notify_payload(self, battle_id: str, payload: dict[str, Any]) -> str:
+        envelope = {"origin": self._worker_id, "battle_id": battle_id, "payload": payload}
+        message = json.dumps(envelope, default=str)
+        if len(message.encode()) > NOTIFY_MAX_BYTES:
+            message = json.dumps({**envelope, "payload": {"type": "invalidate"}})
+        return message
+
+    def _on_notify(self, connection, pid, channel, message: str) -> None:
+        try:
+            envelope = json.loads(message)
+        except ValueError:
+            return
+        if envelope.get("origin") == self._worker_id:
+            return  # Already delivered locally by publish
+        self.received += 1
+        self._deliver(StateEvent(envelope["battle_id"], envelope["payload"], remote=True))
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._listen_engine.connect() as conn:
+                    raw = (await conn.get_raw_connection()).driver_connection
+                    closed = asyncio.Event()
+
+                    def on_termination(_, closed: asyncio.Event = closed) -> None:
+                        closed.set()
+
+                    raw.add_termination_listener(on_termination)
+                    await raw.add_listener(self.CHANNEL, self._on_notify)
+                    self._listening.set()
+                    try:
+                        await closed.wait()
+                    finally:
+                        self._listening.clear()
+                        # The connection may go back to a pool: leave no listeners behind on it
+                        raw.remove_termination_listener(on_termination)
+                        if not raw.is_closed():
+                            await raw.remove_listener(self.CHANNEL, self._on_notify)
+                print("⚠️  Battle event listener disconnected, reconnecting...")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Battle event listener failed: {e}")
+            await asyncio.sleep(self.RECONNECT_SECONDS)
+
+
+def shared_backend_requested(backend: str, database_url: str) -> bool:
+    """Whether the `state_backend` setting selects the Postgres backend for this DATABASE_URL"""
+    return backend == "postgres" or (backend == "auto" and is_postgres_url(database_url))
+
+
+def create_state_backend(
+    backend: str, engine: AsyncEngine | None, database_url: str = ""
+) -> InProcessStateBackend:
+    """
+    Backend for the `state_backend` setting: memory, postgres, or auto
+    (postgres when the DB is). The postgres backend LISTENs on its own
+    unpooled connection to `database_url`.
+    """
+    is_postgres = engine is not None and engine.url.get_backend_name() == "postgresql"
+    if backend == "postgres" and not is_postgres:
+        raise ValueError("STATE_BACKEND=postgres requires a PostgreSQL DATABASE_URL")
+    if backend == "postgres" or (backend == "auto" and is_postgres):
+        return PostgresStateBackend(engine, get_engine(database_url, pooled=False) if database_url else None)
+    return InProcessStateBackend()
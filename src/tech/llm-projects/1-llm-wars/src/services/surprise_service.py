@@ -2,30 +2,18 @@
 Surprise Service - LLM-driven random battle configuration generator
 """
 
+import asyncio
 import json
+import random
+from collections import deque
+from functools import cached_property
 from pathlib import Path
 
-from galileo import galileo_context
-from galileo.openai import openai as galileo_openai
-
 from ..config import get_settings
 from ..models.battle import LLMProvider
-
-
-def _load_personas() -> str:
-    """Load personas from shared JSON file and format for prompt."""
-    personas_path = Path(__file__).parent.parent.parent / "shared" / "personas.json"
-    
-    try:
-        with open(personas_path) as f:
-            personas = json.load(f)
-        
-        lines = []
-        for p in personas:
-            lines.append(f" - {p['label']}: {p['description']}")
-        return "\n".join(lines)
-    except Exception:
-        return " - (Could not load personas)"
+from .llm_service import LLMService, load_provider_sdks
+from .persona_registry import get_persona_registry
+from .tracing import TraceRecord, get_tracer
 
 
 def _load_pre_vetted_battles() -> str:
@@ -152,36 +140,152 @@ You must generate something in the SAME STYLE, but NOT copy them exactly.
 """
 
 class SurpriseService:
-    """Service for generating random battle configurations using LLM."""
-
-    def __init__(self) -> None:
+    """
+    Service for generating random battle configurations using LLM.
+
+    A background refiller keeps up to `pool_size` validated, de-duplicated
+    configs ready, so "surprise me" is served from memory. When the pool is
+    empty the config is generated live, and if that fails a preset from
+    shared/topics.json is returned.
+
+    Calls go through the LLMService's OpenAI scheduler and client, so they
+    count against the same rate limits and timeouts as battle turns. Failed
+    refills back off exponentially; a rejected API key stops the refiller.
+    """
+
+    MAX_TOPIC_LENGTH = 120
+    REFILL_RETRY_SECONDS = 5.0
+    REFILL_MAX_RETRY_SECONDS = 300.0
+    AUTH_ERROR_STATUS = (401, 403)
+
+    def __init__(
+        self,
+        pool_size: int | None = None,
+        refill_concurrency: int | None = None,
+        llm_service: LLMService | None = None,
+    ) -> None:
         settings = get_settings()
-        self._client = galileo_openai.OpenAI(api_key=settings.openai_api_key)
-        # Build prompt once at init with personas loaded from shared JSON
-        self._prompt = SURPRISE_PROMPT_TEMPLATE.format(
-            personas=_load_personas(), 
-            pre_vetted_battles=_load_pre_vetted_battles()
+        self._settings = settings
+        self._llm = llm_service or LLMService()
+        # The prompt is built on first use and rebuilt only when the persona registry reloads
+        self._personas = get_persona_registry()
+        self._prompt = ""
+        self._prompt_version = -1
+        self._pool_size = settings.surprise_pool_size if pool_size is None else pool_size
+        self._refill_concurrency = max(
+            settings.surprise_refill_concurrency if refill_concurrency is None else refill_concurrency, 1
         )
+        self._pool: deque[dict] = deque()
+        # Topics pooled or recently served; a duplicate is discarded on refill
+        self._recent_topics: deque[str] = deque(maxlen=max(self._pool_size * 4, 1))
+        self._needs_refill = asyncio.Event()
+        self._refill_task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start the background refiller (called from main.py lifespan)"""
+        if self._pool_size > 0 and not self._settings.openai_api_key:
+            print("⚠️  No OPENAI_API_KEY - surprise pool disabled (configs come from presets)")
+            return
+        if self._pool_size > 0 and self._refill_task is None:
+            self._needs_refill.set()
+            self._refill_task = asyncio.create_task(self._refill_loop())
+
+    async def aclose(self) -> None:
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+
+    def get_pool_stats(self) -> dict[str, int]:
+        return {"size": len(self._pool), "max_size": self._pool_size}
+
+    async def _refill_loop(self) -> None:
+        if "_openai_client" not in vars(self._llm):
+            await load_provider_sdks()  # Off the event loop, before the first client access
+        failures = 0
+        while True:
+            await self._needs_refill.wait()
+            self._needs_refill.clear()
+            while len(self._pool) < self._pool_size:
+                batch = min(self._refill_concurrency, self._pool_size - len(self._pool))
+                results = await asyncio.gather(
+                    *(self._generate_config() for _ in range(batch)), return_exceptions=True
+                )
+                added = 0
+                for result in results:
+                    if isinstance(result, BaseException):
+                        if getattr(result, "status_code", None) in self.AUTH_ERROR_STATUS:
+                            print(f"   ⚠️  Surprise refill stopped, the API key was rejected: {result}")
+                            return
+                        print(f"   ⚠️  Surprise refill failed: {result}")
+                        continue
+                    config = self._validate(result)
+                    if config and len(self._pool) < self._pool_size:
+                        self._pool.append(config)
+                        added += 1
+                if added:
+                    failures = 0
+                    continue
+                await asyncio.sleep(min(self.REFILL_RETRY_SECONDS * 2 ** failures, self.REFILL_MAX_RETRY_SECONDS))
+                failures += 1
+
+    def _validate(self, json_str: str) -> dict | None:
+        """Parse an LLM config; returns it formatted, or None if malformed or a duplicate"""
+        try:
+            result = json.loads(json_str)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(result, dict) or not isinstance(result.get("personas"), dict):
+            return None
+
+        topic = result.get("topic")
+        personas = result["personas"]
+        if not isinstance(topic, str) or not topic.strip() or len(topic) > self.MAX_TOPIC_LENGTH:
+            return None
+        if not all(isinstance(personas.get(p), str) and personas[p].strip() for p in ("openai", "claude", "grok")):
+            return None
+
+        key = topic.strip().lower()
+        if key in self._recent_topics:
+            return None
+        self._recent_topics.append(key)
+        return self._format_response(json_str)
+
+    @cached_property
+    def _pre_vetted_battles(self) -> str:
+        return _load_pre_vetted_battles()
+
+    def _system_prompt(self) -> str:
+        snapshot = self._personas.snapshot()
+        if self._prompt_version != self._personas.version:
+            self._prompt = SURPRISE_PROMPT_TEMPLATE.format(
+                personas=snapshot.persona_prompt,
+                pre_vetted_battles=self._pre_vetted_battles,
+            )
+            self._prompt_version = self._personas.version
+        return self._prompt
 
     async def _generate_config(self) -> str:
-        """Generate a battle configuration via LLM call; trace named for Galileo."""
+        """Generate a battle configuration via LLM call; traced in the background."""
         user_msg = "Generate a fresh, creative battle configuration. Be inventive!"
-        logger = galileo_context.get_logger_instance()
-        logger.start_trace(name="Topic generation (LLM Wars)", input=user_msg)
 
-        response = self._client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": self._prompt},
+        response = await self._llm.complete_chat(
+            LLMProvider.OPENAI,
+            [
+                {"role": "system", "content": self._system_prompt()},
                 {"role": "user", "content": user_msg},
             ],
+            model="gpt-4o",
             max_tokens=300,
             temperature=1.0,  # High creativity
             response_format={"type": "json_object"},
         )
 
         content = response.choices[0].message.content or "{}"
-        logger.conclude(output=content)
+        get_tracer().record(TraceRecord(session=None, name="Topic generation (LLM Wars)", input=user_msg, output=content))
         return content
 
     def _format_response(self, json_str: str) -> dict:
@@ -223,8 +327,20 @@ class SurpriseService:
         }
 
     async def generate_surprise(self) -> dict:
-        """Generate a random battle configuration."""
+        """Return a random battle configuration, from the pool when one is ready."""
+        if self._pool:
+            config = self._pool.popleft()
+            self._needs_refill.set()
+            return config
+
         print("🎲 Generating surprise config...")
-        json_str = await self._generate_config()
+        try:
+            json_str = await self._generate_config()
+        except Exception as e:
+            print(f"   ⚠️  Live generation failed, using a preset: {e}")
+            presets = self._personas.snapshot().presets
+            if not presets:
+                raise
+            return self._format_response(json.dumps(random.choice(presets)))
         print("   ✅ Config generated!")
         return self._format_response(json_str)
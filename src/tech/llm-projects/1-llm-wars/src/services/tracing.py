@@ -0,0 +1,173 @@
+"""
+Tracing - Background export of Galileo traces, off the request path
+"""
+
+import asyncio
+import random
+import zlib
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+from ..config import get_settings
+
+# Galileo session the current battle's traces belong to (set per battle task)
+trace_session: ContextVar[str | None] = ContextVar("trace_session", default=None)
+
+
+class TraceRecord(NamedTuple):
+    """One Galileo trace, captured in-process and exported later"""
+
+    session: str | None
+    name: str
+    input: str
+    output: str
+    span: dict[str, Any] | None = None  # add_llm_span keyword arguments
+
+
+class TraceExporter:
+    """
+    Bounded queue of traces drained by a background batch exporter.
+
+    `record` never blocks: when the queue is full the oldest trace is
+    dropped. Traces are sampled per battle session (all of a battle's
+    turns or none). Export runs in a worker thread because the Galileo
+    logger's flush is synchronous; export errors are counted, never raised.
+    Without GALILEO_API_KEY nothing is queued at all.
+    """
+
+    MAX_SESSIONS = 1000
+
+    def __init__(
+        self,
+        enabled: bool,
+        sample_rate: float = 1.0,
+        max_queue: int = 1000,
+        batch_size: int = 50,
+        flush_interval_seconds: float = 2.0,
+    ) -> None:
+        self._enabled = enabled
+        self._sample_rate = sample_rate
+        self._queue: deque[TraceRecord] = deque(maxlen=max_queue)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_seconds
+        self._batch_ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        # Session name -> Galileo session id, so a battle's turns share one session
+        self._sessions: OrderedDict[str, str] = OrderedDict()
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self.sampled_out = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def record(self, trace: TraceRecord) -> None:
+        """Queue a trace for export (drop-oldest when full)"""
+        if not self._enabled:
+            return
+        if not self._sampled(trace.session):
+            self.sampled_out += 1
+            return
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(trace)
+        if len(self._queue) >= self._batch_size:
+            self._batch_ready.set()
+
+    def start(self) -> None:
+        if self._enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        """Stop the exporter after it flushes what is queued (called on shutdown)"""
+        if self._task:
+            self._closing = True
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+        while self._queue:
+            await self._export_batch()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "enabled": self._enabled,
+            "queued": len(self._queue),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "sampled_out": self.sampled_out,
+        }
+
+    def _sampled(self, session: str | None) -> bool:
+        if self._sample_rate >= 1:
+            return True
+        if session is None:
+            return random.random() < self._sample_rate
+        return zlib.crc32(session.encode()) / 2**32 < self._sample_rate
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            while self._queue:
+                await self._export_batch()
+
+    async def _export_batch(self) -> None:
+        batch = [self._queue.popleft() for _ in range(min(self._batch_size, len(self._queue)))]
+        try:
+            await asyncio.to_thread(self._export, batch)
+            self.exported += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"⚠️  Galileo export failed ({len(batch)} traces dropped): {e}")
+
+    def _export(self, batch: list[TraceRecord]) -> None:
+        logger = _galileo_logger()
+        for trace in batch:
+            if trace.session:
+                self._use_session(logger, trace.session)
+            else:
+                logger.clear_session()
+            logger.start_trace(name=trace.name, input=trace.input)
+            if trace.span:
+                logger.add_llm_span(**trace.span)
+            logger.conclude(output=trace.output)
+        logger.flush()
+
+    def _use_session(self, logger, session: str) -> None:
+        session_id = self._sessions.get(session)
+        if session_id is None:
+            session_id = logger.start_session(name=session)
+            self._sessions[session] = session_id
+            while len(self._sessions) > self.MAX_SESSIONS:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session)
+            logger.set_session(session_id)
+
+
+def _galileo_logger():
+    """Galileo's logger; the SDK is imported on first export since it is slow to load"""
+    from galileo import galileo_context
+
+    return galileo_context.get_logger_instance()
+
+
+@lru_cache()
+def get_tracer() -> TraceExporter:
+    settings = get_settings()
+    return TraceExporter(
+        enabled=bool(settings.galileo_api_key),
+        sample_rate=settings.trace_sample_rate,
+        max_queue=settings.trace_queue_size,
+        batch_size=settings.trace_batch_size,
+        flush_interval_seconds=settings.trace_flush_interval_seconds,
+    )
@@ -0,0 +1,123 @@
+"""
+Vote Buffer - Write-behind batching for vote inserts and counter updates
+"""
+
+import asyncio
+from collections import Counter
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..models.database import Vote, increment_vote_counts
+from .metrics import DB_OPERATION_SECONDS
+
+
+class VoteBuffer:
+    """
+    Group-commits votes: every `flush_interval_ms` or `max_batch` votes, the
+    pending votes are inserted and their counters incremented in one
+    transaction. Callers await their batch, so write errors still surface.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        flush_interval_ms: int = 50,
+        max_batch: int = 100,
+    ) -> None:
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval_ms / 1000
+        self._max_batch = max_batch
+        self._pending: list[tuple[str, str, asyncio.Future]] = []
+        self._batch_full = asyncio.Event()
+        self._flush_task: asyncio.Task | None = None
+        self._writes: set[asyncio.Task] = set()  # Batches being committed
+
+    async def add(self, battle_id: str, provider: str) -> None:
+        """Queue a vote and wait until its batch is committed"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((battle_id, provider, future))
+
+        if len(self._pending) >= self._max_batch:
+            self._batch_full.set()
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+        await future
+
+    async def close(self) -> None:
+        """Commit pending votes and wait for batches already being written (called on shutdown)"""
+        timer = self._flush_task
+        self._batch_full.set()  # A waiting timer fires now instead of being cancelled
+        await self.flush()
+        if timer:
+            await timer
+        while self._writes:
+            await asyncio.wait(set(self._writes))
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.wait_for(self._batch_full.wait(), timeout=self._flush_interval)
+        except asyncio.TimeoutError:
+            pass
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Commit every pending vote now"""
+        batch, self._pending = self._pending, []
+        self._batch_full.clear()
+        self._flush_task = None
+        if not batch:
+            return
+        # Tracked so close() can wait for it: the timer no longer points at this flush
+        write = asyncio.create_task(self._commit(batch))
+        self._writes.add(write)
+        write.add_done_callback(self._writes.discard)
+        await write
+
+    async def _commit(self, batch: list[tuple[str, str, asyncio.Future]]) -> None:
+        try:
+            await self._write(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self._settle(batch, e)
+                return
+            # Retry one by one so a single bad vote doesn't reject the whole batch
+            for vote in batch:
+                try:
+                    await self._write([vote])
+                except Exception as vote_error:
+                    self._settle([vote], vote_error)
+                else:
+                    self._settle([vote], None)
+            return
+
+        self._settle(batch, None)
+
+    async def _write(self, batch: list[tuple[str, str, asyncio.Future]]) -> None:
+        """Insert votes and bump their counters in a single transaction"""
+        with DB_OPERATION_SECONDS.time(operation="flush_votes"):
+            async with self._session_factory() as session:
+                try:
+                    await session.execute(
+                        insert(Vote),
+                        [{"battle_id": battle_id, "provider": provider} for battle_id, provider, _ in batch],
+                    )
+                    await increment_vote_counts(
+                        session, Counter((battle_id, provider) for battle_id, provider, _ in batch)
+                    )
+                    await session.commit()
+                except Exception as e:
+                    await session.rollback()
+                    print(f"Error saving votes to database: {e}")
+                    raise
+
+    @staticmethod
+    def _settle(batch: list[tuple[str, str, asyncio.Future]], error: Exception | None) -> None:
+        for _, _, future in batch:
+            if future.done():
+                continue
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
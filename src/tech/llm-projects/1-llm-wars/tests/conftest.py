@@ -0,0 +1,176 @@
+"""Shared pytest fixtures for LLM Wars"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+# Provider SDKs refuse to build clients without a key; tests never hit the network.
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-anthropic-key")
+os.environ.setdefault("GROK_API_KEY", "test-grok-key")
+# Keep the response cache in memory so test runs don't write into data/battles
+os.environ.setdefault("RESPONSE_CACHE_DISK_MAX_MB", "0")
+
+
+@pytest.fixture(autouse=True)
+def no_galileo(monkeypatch):
+    """Keep tracing disabled so tests never talk to Galileo"""
+    from src.services import llm_service, surprise_service, tracing
+
+    disabled = tracing.TraceExporter(enabled=False)
+    for module in (llm_service, surprise_service, tracing):
+        monkeypatch.setattr(module, "get_tracer", lambda: disabled)
+
+
+def _openai_usage():
+    return SimpleNamespace(
+        prompt_tokens=10, completion_tokens=5, prompt_tokens_details=SimpleNamespace(cached_tokens=6)
+    )
+
+
+class FakeCompletions:
+    """Async chat.completions stand-in with a fixed round-trip latency"""
+
+    def __init__(self, reply: str, latency: float) -> None:
+        self.reply = reply
+        self.latency = latency
+        self.calls: list[dict] = []
+        self.streams: list[_FakeChunkStream] = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.latency)
+        if kwargs.get("stream"):
+            self.streams.append(_FakeChunkStream(self._chunks()))
+            return self.streams[-1]
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.reply))],
+            usage=_openai_usage(),
+        )
+
+    async def _chunks(self):
+        for word in self.reply.split(" "):
+            delta = SimpleNamespace(content=f"{word} ")
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])
+        yield SimpleNamespace(usage=_openai_usage(), choices=[])
+
+
+class _FakeChunkStream:
+    """Async iterator with close(), mimicking openai's AsyncStream"""
+
+    def __init__(self, chunks) -> None:
+        self._chunks = chunks
+        self.chunks_read = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await self._chunks.__anext__()
+        self.chunks_read += 1
+        return chunk
+
+    async def close(self) -> None:
+        self.closed = True
+        await self._chunks.aclose()
+
+
+class FakeMessages:
+    """Async Anthropic messages stand-in with a fixed round-trip latency"""
+
+    def __init__(self, reply: str, latency: float) -> None:
+        self.reply = reply
+        self.latency = latency
+        self.calls: list[dict] = []
+        self.streams: list[_FakeMessageStream] = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.latency)
+        return self._final_message()
+
+    def stream(self, **kwargs):
+        self.calls.append(kwargs)
+        self.streams.append(_FakeMessageStream(self))
+        return self.streams[-1]
+
+    def _final_message(self):
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=self.reply)],
+            usage=SimpleNamespace(input_tokens=2, cache_read_input_tokens=8, output_tokens=5),
+        )
+
+
+class _FakeMessageStream:
+    """Async context manager mimicking anthropic's MessageStream"""
+
+    def __init__(self, messages: FakeMessages) -> None:
+        self._messages = messages
+        self.closed = False
+
+    async def __aenter__(self):
+        await asyncio.sleep(self._messages.latency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+        return None
+
+    @property
+    async def text_stream(self):
+        for word in self._messages.reply.split(" "):
+            yield f"{word} "
+
+    async def get_final_message(self):
+        return self._messages._final_message()
+
+
+@pytest.fixture
+def make_battle_service():
+    """Build a BattleService whose provider clients are in-process fakes"""
+    from src.services.battle_service import BattleService
+
+    def factory(
+        openai: float = 0.2,
+        claude: float = 0.2,
+        grok: float = 0.2,
+        session_factory=None,
+    ) -> BattleService:
+        service = BattleService(session_factory=session_factory)
+        llm = service._llm_service
+        llm._openai_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions("openai reply", openai)))
+        llm._anthropic_client = SimpleNamespace(messages=FakeMessages("claude reply", claude))
+        llm._grok_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions("grok reply", grok)))
+        return service
+
+    return factory
+
+
+@pytest.fixture
+def make_battle_request():
+    """Build a three-participant BattleRequest"""
+    from src.models.battle import BattleRequest, LLMConfig, LLMProvider
+
+    def factory(**overrides) -> BattleRequest:
+        fields = {
+            "topic": "Is water wet?",
+            "rounds": 1,
+            "llms": [
+                LLMConfig(provider=LLMProvider.OPENAI, persona="Angry startup founder"),
+                LLMConfig(provider=LLMProvider.CLAUDE, persona="Overly polite HR manager"),
+                LLMConfig(provider=LLMProvider.GROK, persona="Tired Roman general"),
+            ],
+        }
+        fields.update(overrides)
+        return BattleRequest(**fields)
+
+    return factory
+
+
+@pytest.fixture
+def database_url(tmp_path) -> str:
+    """File-backed SQLite URL (mapped onto aiosqlite by get_engine)"""
+    return f"sqlite:///{tmp_path / 'llm_wars.db'}"
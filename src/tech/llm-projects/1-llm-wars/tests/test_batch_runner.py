@@ -0,0 +1,86 @@
+"""Tests for batch battle jobs on a bounded worker pool"""
+
+import asyncio
+
+import pytest
+
+from src.models.battle import BatchJobStatus, BattleStatus
+from src.services.batch_runner import BatchQueueFullError, BatchRunner
+
+
+def test_batch_runs_every_battle_within_the_concurrency_limit(make_battle_service, make_battle_request):
+    service = make_battle_service(0.02, 0.02, 0.02)
+    running = peak = 0
+    run_battle = service.run_battle
+
+    async def tracked_run_battle(battle_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            return await run_battle(battle_id)
+        finally:
+            running -= 1
+
+    service.run_battle = tracked_run_battle
+
+    async def run():
+        runner = BatchRunner(service, concurrency=2)
+        job = await runner.submit([make_battle_request(rounds=1) for _ in range(5)])
+        submitted = job.response()
+        while not job.done:
+            await asyncio.sleep(0.01)
+        await runner.aclose()
+        return submitted, job.response(), runner.get(job.id)
+
+    submitted, finished, stored = asyncio.run(run())
+
+    assert submitted.status == BatchJobStatus.PENDING and submitted.total == 5
+    assert finished.status == BatchJobStatus.COMPLETED
+    assert finished.completed == 5 and finished.failed == 0
+    assert all(result.status == BattleStatus.COMPLETED for result in finished.battles)
+    assert finished.finished_at is not None and stored is not None
+    assert peak == 2
+
+
+def test_battles_started_elsewhere_are_reported_as_failed(make_battle_service, make_battle_request):
+    service = make_battle_service(0, 0, 0)
+
+    async def run():
+        runner = BatchRunner(service, concurrency=1)
+        job = await runner.submit([make_battle_request(rounds=1) for _ in range(2)])
+        taken = await service.get_battle(job.response().battles[0].battle_id)
+        await service.claim_battle(taken)  # e.g. someone hit /start first
+        while not job.done:
+            await asyncio.sleep(0.01)
+        await runner.aclose()
+        return job.response()
+
+    response = asyncio.run(run())
+
+    assert response.completed == 1 and response.failed == 1
+    assert response.battles[0].error_message == "Battle was started outside the batch"
+
+
+def test_submissions_are_rejected_while_max_jobs_are_unfinished(make_battle_service, make_battle_request):
+    service = make_battle_service(0.05, 0.05, 0.05)
+
+    async def run():
+        runner = BatchRunner(service, concurrency=1, max_jobs=2)
+        jobs = [await runner.submit([make_battle_request(rounds=1)]) for _ in range(2)]
+        with pytest.raises(BatchQueueFullError):
+            await runner.submit([make_battle_request(rounds=1)])
+        battles_when_full = len(service._battles)
+
+        while not all(job.done for job in jobs):
+            await asyncio.sleep(0.01)
+        accepted = await runner.submit([make_battle_request(rounds=1)])
+        while not accepted.done:
+            await asyncio.sleep(0.01)
+        await runner.aclose()
+        return battles_when_full, runner.stats()
+
+    battles_when_full, stats = asyncio.run(run())
+
+    assert battles_when_full == 2
+    assert stats["jobs"] == 2
@@ -0,0 +1,78 @@
+"""Tests for multi-viewer battle streaming and Last-Event-ID resumption"""
+
+import asyncio
+
+from src.models.battle import BattleEvent, BattleEventType, LLMProvider
+from src.services.battle_hub import BattleHub, parse_event_id
+
+
+def _message(hub: BattleHub, text: str) -> None:
+    fields = {"provider": LLMProvider.OPENAI, "name": "OpenAI", "round_number": 1}
+    hub.publish(BattleEvent(type=BattleEventType.MESSAGE_START, **fields))
+    for word in text.split():
+        hub.publish(BattleEvent(type=BattleEventType.DELTA, delta=word, **fields))
+    hub.publish(BattleEvent(type=BattleEventType.MESSAGE_END, content=text, **fields))
+
+
+async def _ids(hub: BattleHub, after: str | None = None) -> list[str]:
+    return [event.id async for event in hub.subscribe(parse_event_id(after))]
+
+
+def test_viewers_share_one_stream_and_resume_after_last_event_id():
+    async def run():
+        hub = BattleHub("b")
+        early = asyncio.create_task(_ids(hub))
+        await asyncio.sleep(0)
+        _message(hub, "one two")
+        _message(hub, "three")
+        hub.finish()
+        return await early, await _ids(hub), await _ids(hub, "0"), await _ids(hub, "1.0")
+
+    early, late, after_first, mid_message = asyncio.run(run())
+
+    assert early == late == ["0.0", "0.1", "0.2", "0", "1.0", "1.1", "1"]
+    assert after_first == ["1.0", "1.1", "1"]
+    assert mid_message == ["1.1", "1"]
+
+
+def test_viewer_behind_the_ring_catches_up_on_whole_messages():
+    async def run():
+        hub = BattleHub("b", replay_size=3)
+        _message(hub, "a b c")  # 0.0 0.1 0.2 0.3 0
+        _message(hub, "d e")  # 1.0 1.1 1.2 1 -> ring holds 1.1 1.2 1
+        hub.finish(error="boom")
+        return await _ids(hub), hub.error
+
+    ids, error = asyncio.run(run())
+
+    # Message 1 lost its start, so only its message_end is sent; nothing is repeated
+    assert ids == ["0", "1"]
+    assert error == "boom"
+
+
+def test_spectators_watch_running_and_finished_battles(make_battle_service, make_battle_request):
+    service = make_battle_service(0.01, 0.01, 0.01)
+
+    async def watch(battle_id, after=None):
+        return [(event.id, event.item.type.value) async for event in service.watch_battle(battle_id, after)]
+
+    async def run():
+        state = await service.create_battle(make_battle_request(rounds=1))
+        assert await service.claim_battle(state)
+        service.start_battle_run(state.id)
+        live = await asyncio.gather(watch(state.id), watch(state.id))
+
+        service._hubs._hubs.clear()  # As if the finished hub had been retired
+        replay = await watch(state.id, after=parse_event_id("0"))
+
+        synced = await service.create_battle(make_battle_request(rounds=1))
+        assert await service.claim_battle(synced)
+        followed, _ = await asyncio.gather(watch(synced.id), service.run_battle(synced.id))
+        return live, replay, followed
+
+    live, replay, followed = asyncio.run(run())
+
+    assert live[0] == live[1]
+    assert [event_id for event_id, kind in live[0] if kind == "message_end"] == ["0", "1", "2"]
+    assert replay == [("1", "message_end"), ("2", "message_end")]
+    assert followed == [("0", "message_end"), ("1", "message_end"), ("2", "message_end")]
@@ -0,0 +1,67 @@
+"""Tests for BattleService round orchestration"""
+
+import asyncio
+import time
+
+from src.models.battle import BattleEvent, BattleEventType, LLMProvider, RoundMode
+
+PROVIDER_ORDER = [LLMProvider.OPENAI, LLMProvider.CLAUDE, LLMProvider.GROK]
+
+
+def test_simultaneous_round_costs_the_slowest_provider(make_battle_service, make_battle_request):
+    # Claude finishes first and OpenAI last, yet storage keeps participant order
+    service = make_battle_service(openai=0.3, claude=0.1, grok=0.2)
+    state = asyncio.run(service.create_battle(make_battle_request(rounds=2, round_mode=RoundMode.SIMULTANEOUS)))
+
+    start = time.perf_counter()
+    asyncio.run(service.run_battle(state.id))
+    elapsed = time.perf_counter() - start
+
+    assert state.status.value == "completed"
+    assert [m.provider for m in state.messages] == PROVIDER_ORDER * 2
+    assert [m.round_number for m in state.messages] == [1, 1, 1, 2, 2, 2]
+    # Sequential rounds would take 2 * (0.3 + 0.1 + 0.2) = 1.2s
+    assert elapsed < 2 * 0.3 + 0.2
+
+
+def test_simultaneous_round_sees_only_previous_rounds(make_battle_service, make_battle_request):
+    service = make_battle_service(0.01, 0.01, 0.01)
+    state = asyncio.run(service.create_battle(make_battle_request(rounds=2, round_mode=RoundMode.SIMULTANEOUS)))
+
+    asyncio.run(service.run_battle(state.id))
+
+    claude_calls = service._llm_service._anthropic_client.messages.calls
+    # Round 1: just the opening prompt; round 2: three round-1 messages plus the prompt
+    assert [len(call["messages"]) for call in claude_calls] == [1, 4]
+
+
+def test_streaming_simultaneous_round_yields_in_participant_order(make_battle_service, make_battle_request):
+    service = make_battle_service(openai=0.1, claude=0.01, grok=0.05)
+    state = asyncio.run(service.create_battle(make_battle_request(round_mode=RoundMode.SIMULTANEOUS)))
+
+    async def collect():
+        return [item async for item in service.run_battle_streaming(state.id)]
+
+    items = asyncio.run(collect())
+
+    assert not any(isinstance(item, BattleEvent) for item in items)
+    assert [item.provider for item in items] == PROVIDER_ORDER
+    assert [m.provider for m in state.messages] == PROVIDER_ORDER
+
+
+def test_token_streaming_simultaneous_round_keeps_turns_contiguous(make_battle_service, make_battle_request):
+    service = make_battle_service(openai=0.1, claude=0.01, grok=0.05)
+    state = asyncio.run(service.create_battle(make_battle_request(round_mode=RoundMode.SIMULTANEOUS)))
+
+    async def collect():
+        return [item async for item in service.run_battle_streaming(state.id, stream_tokens=True)]
+
+    events = asyncio.run(collect())
+
+    turn_order = [e.provider for e in events if e.type == BattleEventType.MESSAGE_START]
+    assert turn_order == PROVIDER_ORDER
+    # Each turn's events are contiguous: start, deltas, end
+    for i, event in enumerate(events):
+        if event.type != BattleEventType.MESSAGE_START:
+            assert event.provider == events[i - 1].provider
+    assert [m.content for m in state.messages] == ["openai reply ", "claude reply ", "grok reply "]
@@ -0,0 +1,69 @@
+"""Tests for the bounded LRU + TTL battle store"""
+
+from src.models.battle import BattleConfig, BattleState, BattleStatus
+from src.services import battle_store
+from src.services.battle_store import BattleStore
+
+
+def _state(make_battle_request, status: BattleStatus = BattleStatus.PENDING) -> BattleState:
+    request = make_battle_request()
+    config = BattleConfig(topic=request.topic, llms=request.llms)
+    return BattleState(config=config, status=status)
+
+
+def test_least_recently_used_battle_is_evicted(make_battle_request):
+    store = BattleStore(max_size=2)
+    first, second, third = (_state(make_battle_request) for _ in range(3))
+    store.put(first)
+    store.put(second)
+    store.get(first.id)
+
+    evicted = store.put(third)
+
+    assert evicted == [second]
+    assert first.id in store and third.id in store
+    assert store.stats() == {"size": 2, "max_size": 2, "hits": 1, "misses": 0, "evictions": 1}
+
+
+def test_in_progress_battles_are_never_evicted(make_battle_request):
+    store = BattleStore(max_size=1)
+    running = _state(make_battle_request, BattleStatus.IN_PROGRESS)
+    store.put(running)
+
+    newcomer = _state(make_battle_request)
+    assert store.put(newcomer) == []
+    assert len(store) == 2
+
+    running.status = BattleStatus.COMPLETED
+    assert store.put(_state(make_battle_request)) == [running, newcomer]
+
+
+def test_idle_battles_expire(make_battle_request, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(battle_store.time, "monotonic", lambda: clock[0])
+    store = BattleStore(max_size=10, ttl_seconds=60)
+    idle = _state(make_battle_request)
+    store.put(idle)
+
+    clock[0] += 61
+    evicted = store.put(_state(make_battle_request))
+
+    assert evicted == [idle]
+    assert store.get(idle.id) is None
+    assert store.stats()["misses"] == 1
+
+
+def test_expired_battles_are_misses_until_swept(make_battle_request, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(battle_store.time, "monotonic", lambda: clock[0])
+    store = BattleStore(max_size=10, ttl_seconds=60)
+    idle, running = _state(make_battle_request), _state(make_battle_request, BattleStatus.IN_PROGRESS)
+    store.put(idle)
+    store.put(running)
+
+    clock[0] += 61
+
+    assert store.get(idle.id) is None and idle.id in store  # Left for the owner to persist
+    assert store.get(running.id) is running
+    assert store.expire() == [idle]
+    assert idle.id not in store and store.stats()["evictions"] == 1
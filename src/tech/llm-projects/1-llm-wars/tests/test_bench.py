@@ -0,0 +1,97 @@
+"""Tests for the offline benchmark's fake providers and reporting"""
+
+import asyncio
+import json
+
+import httpx
+import openai
+
+from bench.fake_providers import StubBehaviour, create_app
+from bench.load import LoadResults, percentile
+from bench.startup import heaviest_imports, parse_importtime
+
+FAST = StubBehaviour(latency_ms=0, token_delay_ms=0, reply_words=5)
+
+
+def _openai(app) -> openai.AsyncOpenAI:
+    transport = httpx.ASGITransport(app=app)
+    return openai.AsyncOpenAI(
+        api_key="stub",
+        base_url="http://stub/xai/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=transport),
+    )
+
+
+def test_stub_speaks_openai_chat_completions():
+    client = _openai(create_app({"xai": FAST}))
+
+    async def run():
+        response = await client.chat.completions.create(model="grok-3-latest", messages=[{"role": "user", "content": "hi"}])
+        stream = await client.chat.completions.create(
+            model="grok-3-latest",
+            messages=[{"role": "user", "content": "hi"}],
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        chunks = [chunk async for chunk in stream]
+        return response, chunks
+
+    response, chunks = asyncio.run(run())
+
+    assert len(response.choices[0].message.content.split()) == 5
+    assert "".join(c.choices[0].delta.content or "" for c in chunks if c.choices).count(" ") == 5
+    assert chunks[-1].usage.completion_tokens == 5
+
+
+def test_stub_streams_anthropic_events_and_injects_errors():
+    app = create_app({"anthropic": FAST, "openai": FAST._replace(rate_limit_rate=1.0)})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub") as client:
+            stream = await client.post(
+                "/anthropic/v1/messages",
+                json={"model": "claude", "max_tokens": 10, "stream": True, "messages": []},
+            )
+            limited = await client.post("/openai/v1/chat/completions", json={"model": "gpt-4o", "messages": []})
+            return stream, limited
+
+    stream, limited = asyncio.run(run())
+
+    events = [line.split(": ", 1)[1] for line in stream.text.splitlines() if line.startswith("event: ")]
+    assert events[0] == "message_start" and events[-1] == "message_stop"
+    assert events.count("content_block_delta") == 5
+    assert limited.status_code == 429
+    assert limited.headers["retry-after-ms"] == "200"
+    assert json.loads(limited.text)["error"]["type"] == "rate_limit_error"
+
+
+def test_load_results_report_percentiles_per_endpoint():
+    results = LoadResults()
+    for ms in range(1, 101):
+        results.record("vote", ms / 1000)
+    results.record("run", 2.0, ok=False)
+    results.battles_completed, results.elapsed = 10, 5.0
+
+    summary = results.summary()
+
+    assert percentile([], 99) == 0.0
+    assert summary["battles_per_second"] == 2.0
+    assert summary["endpoints"]["vote"] == {"count": 100, "errors": 0, "p50_ms": 50.0, "p95_ms": 95.0, "p99_ms": 99.0}
+    assert summary["endpoints"]["run"]["errors"] == 1
+    assert "create" not in summary["endpoints"]
+
+
+def test_importtime_output_is_ranked_by_package():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       500 |        900 |     openai._client",
+        "import time:       100 |       1000 |   openai",
+        "import time:       300 |        300 |   fastapi",
+        "import time:        50 |       1400 | src.main",
+    ])
+
+    modules = parse_importtime(output)
+
+    assert modules[0] == ("openai._client", 2, 900) and modules[-1] == ("src.main", 0, 1400)
+    assert heaviest_imports(modules, exclude="src") == [("openai", 1.0), ("fastapi", 0.3)]
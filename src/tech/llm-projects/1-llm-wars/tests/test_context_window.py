@@ -0,0 +1,55 @@
+"""Tests for token-budgeted conversation history"""
+
+import asyncio
+
+from src.models.battle import BattleMessage, LLMProvider
+from src.services.context_window import ContextWindow, count_tokens, format_turn
+
+
+def _history(turns: int) -> list[BattleMessage]:
+    return [
+        BattleMessage(
+            provider=LLMProvider.OPENAI,
+            name=f"Speaker{i % 3}",
+            content=f"Point number {i} is obviously correct. Also, more words to pad this turn out a bit.",
+            round_number=i // 3 + 1,
+        )
+        for i in range(turns)
+    ]
+
+
+def test_history_under_budget_is_untouched():
+    history = _history(6)
+    window = ContextWindow(budget_tokens=10_000, keep_recent_turns=3).fit(history)
+    assert window == (history, None, 0)
+
+
+def test_older_turns_collapse_into_summary_within_budget():
+    history = _history(30)
+    budget = 400
+    window = ContextWindow(budget_tokens=budget, keep_recent_turns=6).fit(history)
+
+    assert window.messages == history[-6:]
+    assert window.summary.startswith(ContextWindow.SUMMARY_HEADER)
+    assert "Point number 23 is obviously correct." in window.summary
+    assert "pad this turn" not in window.summary
+    sent = sum(count_tokens(format_turn(m)) for m in window.messages) + count_tokens(window.summary)
+    assert sent <= budget
+    assert window.tokens_saved == sum(count_tokens(format_turn(m)) for m in history) - sent
+
+
+def test_battle_reports_tokens_saved(make_battle_service, make_battle_request):
+    service = make_battle_service(0, 0, 0)
+    service._context_window = ContextWindow(budget_tokens=50, keep_recent_turns=3)
+
+    async def scenario():
+        state = await service.create_battle(make_battle_request(rounds=4))
+        return await service.run_battle(state.id)
+
+    state = asyncio.run(scenario())
+
+    last_call = service._llm_service._grok_client.chat.completions.calls[-1]["messages"]
+    # system + summary + 3 recent turns + the round instruction
+    assert len(last_call) == 6
+    assert state.context_tokens_saved > 0
+    assert service.get_battle_response(state).context_tokens_saved == state.context_tokens_saved
@@ -0,0 +1,276 @@
+"""Tests for the async database layer"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src.models.battle import BattleStatus
+from src.models.database import _async_url, get_engine, get_session_factory, init_db
+
+
+def test_async_url_maps_sync_drivers():
+    assert _async_url("postgres://u:p@host/db").drivername == "postgresql+asyncpg"
+    assert _async_url("postgresql://u:p@host/db").drivername == "postgresql+asyncpg"
+    assert _async_url("sqlite:///x.db").drivername == "sqlite+aiosqlite"
+
+
+def _run_with_db(database_url, make_battle_service, scenario):
+    async def run():
+        engine = get_engine(database_url)
+        await init_db(engine)
+        try:
+            service = make_battle_service(0.01, 0.01, 0.01, session_factory=get_session_factory(engine))
+            await scenario(service)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_finished_battle_is_loaded_back_from_database(database_url, make_battle_service, make_battle_request):
+    async def scenario(service):
+        state = await service.create_battle(make_battle_request(rounds=2))
+        await service.run_battle(state.id)
+        service.clear_battles()
+
+        loaded = await service.get_battle(state.id)
+        assert loaded.status == BattleStatus.COMPLETED
+        assert [m.content for m in loaded.messages] == [m.content for m in state.messages]
+        assert (await service.get_battle_config(state.id)).topic == state.config.topic
+
+    _run_with_db(database_url, make_battle_service, scenario)
+
+
+def test_concurrent_votes_use_independent_sessions(database_url, make_battle_service, make_battle_request):
+    async def scenario(service):
+        state = await service.create_battle(make_battle_request())
+        await service.save_battle(state)
+
+        await asyncio.gather(*(service.save_vote(state.id, p) for p in ["openai", "claude", "claude", "grok"] * 5))
+
+        assert await service.get_vote_counts(state.id) == {"openai": 5, "claude": 10, "grok": 5}
+
+    _run_with_db(database_url, make_battle_service, scenario)
+
+
+def test_failed_vote_rolls_back_and_reraises(database_url, make_battle_service, make_battle_request):
+    async def scenario(service):
+        state = await service.create_battle(make_battle_request())
+        await service.save_battle(state)
+
+        with pytest.raises(IntegrityError):
+            await service.save_vote(state.id, None)
+        await service.save_vote(state.id, "grok")
+
+        assert await service.get_vote_counts(state.id) == {"openai": 0, "claude": 0, "grok": 1}
+
+    _run_with_db(database_url, make_battle_service, scenario)
+
+
+def test_vote_burst_is_group_committed(database_url, make_battle_service, make_battle_request):
+    async def scenario(service):
+        state = await service.create_battle(make_battle_request())
+        await service.save_battle(state)
+
+        writes = []
+        buffer = service._vote_buffer
+        original_write = buffer._write
+
+        async def counting_write(batch):
+            writes.append(len(batch))
+            await original_write(batch)
+
+        buffer._write = counting_write
+        await asyncio.gather(*(service.save_vote(state.id, "openai") for _ in range(30)))
+
+        assert writes == [30]
+        assert (await service.get_vote_counts(state.id))["openai"] == 30
+
+    _run_with_db(database_url, make_battle_service, scenario)
+
+
+def test_close_waits_for_a_batch_already_being_written(database_url, make_battle_service, make_battle_request):
+    async def scenario(service):
+        state = await service.create_battle(make_battle_request())
+        await service.save_battle(state)
+
+        buffer = service._vote_buffer
+        original_write = buffer._write
+        writing = asyncio.Event()
+
+        async def slow_write(batch):
+            writing.set()
+            await asyncio.sleep(0.05)
+            return await original_write(batch)
+
+        buffer._write = slow_write
+        vote = asyncio.create_task(service.save_vote(state.id, "claude"))
+        await writing.wait()
+        await buffer.close()
+
+        assert vote.done()  # Committed before close returned, not cut off by engine.dispose()
+        assert (await service.get_vote_counts(state.id))["claude"] == 1
+
+    _run_with_db(database_url, make_battle_service, scenario)
+
+
+def test_vote_counts_are_backfilled_from_existing_votes(database_url):
+    from sqlalchemy import insert
+
+    from src.models.database import Battle, Vote, VoteCount
+
+    async def run():
+        engine = get_engine(database_url)
+        await init_db(engine)
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(Battle).values(id="b1", config={}, messages=[], status="completed", current_round="1")
+            )
+            await conn.execute(insert(Vote), [{"battle_id": "b1", "provider": "claude"}] * 3)
+            await conn.execute(VoteCount.__table__.delete())
+
+        await init_db(engine)
+        async with engine.connect() as conn:
+            rows = (await conn.execute(VoteCount.__table__.select())).all()
+        await engine.dispose()
+        return rows
+
+    assert [(r.battle_id, r.provider, r.count) for r in asyncio.run(run())] == [("b1", "claude", 3)]
+
+
+def test_evicted_battle_is_persisted_and_reloaded(database_url, make_battle_service, make_battle_request):
+    async def scenario(service):
+        service._battles._max_size = 1
+        first = await service.create_battle(make_battle_request(topic="First"))
+        await service.create_battle(make_battle_request(topic="Second"))
+        assert first.id not in service._battles
+
+        reloaded = await service.get_battle(first.id)
+        assert reloaded.config.topic == "First"
+        assert reloaded.status == BattleStatus.PENDING
+        assert service.get_store_stats()["evictions"] == 2
+
+    _run_with_db(database_url, make_battle_service, scenario)
+
+
+def test_expired_battle_is_saved_and_reloaded_on_read(database_url, make_battle_service, make_battle_request):
+    async def scenario(service):
+        state = await service.create_battle(make_battle_request(topic="Idle"))
+        state.current_round = 2  # Changed in memory only
+        service._battles._ttl_seconds = 0
+
+        reloaded = await service.get_battle(state.id)
+        assert reloaded is not state  # A miss: read back from the database
+        assert reloaded.current_round == 2
+        assert service.get_store_stats()["evictions"] == 1
+
+    _run_with_db(database_url, make_battle_service, scenario)
+
+
+def test_battle_listing_pages_through_database(database_url, make_battle_service, make_battle_request):
+    from src.models.battle import Language, LLMConfig, LLMProvider
+
+    async def scenario(service):
+        for i in range(5):
+            await service.create_battle(make_battle_request(topic=f"Topic {i}"))
+        hindi_grok_only = [LLMConfig(provider=LLMProvider.GROK, persona=f"Grok {i}") for i in range(3)]
+        await service.create_battle(
+            make_battle_request(topic="Hindi", language=Language.HINDI, llms=hindi_grok_only)
+        )
+        service.clear_battles()
+
+        first = await service.list_battles(limit=4, include_messages=False)
+        second = await service.list_battles(limit=4, cursor=first.next_cursor)
+        topics = [item.id for item in first.items + second.items]
+        assert len(topics) == len(set(topics)) == 6
+        assert second.next_cursor is None
+        assert [item.created_at for item in first.items] == sorted(
+            (item.created_at for item in first.items), reverse=True
+        )
+
+        hindi = await service.list_battles(language=Language.HINDI)
+        assert len(hindi.items) == 1
+        assert len((await service.list_battles(provider=LLMProvider.OPENAI)).items) == 5
+        assert len((await service.list_battles(status=BattleStatus.COMPLETED)).items) == 0
+
+    _run_with_db(database_url, make_battle_service, scenario)
+
+
+def test_init_db_migrates_legacy_battles_table(database_url):
+    from sqlalchemy import text
+
+    from src.models.database import BattleParticipant
+
+    async def run():
+        engine = get_engine(database_url)
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE TABLE battles (id VARCHAR PRIMARY KEY, config JSON NOT NULL, messages JSON NOT NULL, "
+                "status VARCHAR NOT NULL, current_round VARCHAR, error_message VARCHAR, "
+                "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+            ))
+            await conn.execute(text(
+                "INSERT INTO battles VALUES ('old', :config, '[]', 'completed', '3', NULL, "
+                "'2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+            ), {"config": '{"topic": "Hi", "language": "hi", "llms": [{"provider": "claude", "persona": "x", "name": "C"}]}'})
+
+        await init_db(engine)
+        async with engine.connect() as conn:
+            language = (await conn.execute(text("SELECT language FROM battles WHERE id = 'old'"))).scalar()
+            participants = (await conn.execute(BattleParticipant.__table__.select())).all()
+        await engine.dispose()
+        return language, participants
+
+    language, participants = asyncio.run(run())
+    assert language == "hi"
+    assert [(p.battle_id, p.seat, p.provider) for p in participants] == [("old", 0, "claude")]
+
+
+def test_each_turn_is_persisted_as_it_happens(database_url, make_battle_service, make_battle_request):
+    from sqlalchemy import func, select
+
+    from src.models.database import BattleMessageRow
+
+    async def scenario(service):
+        state = await service.create_battle(make_battle_request(rounds=2))
+        persisted_counts = []
+
+        async for message in service.run_battle_streaming(state.id):
+            async with service._session_factory() as session:
+                persisted_counts.append(await session.scalar(select(func.count()).select_from(BattleMessageRow)))
+
+        assert persisted_counts == [1, 2, 3, 4, 5, 6]
+        service.clear_battles()
+        reloaded = await service.get_battle(state.id)
+        assert [m.model_dump() for m in reloaded.messages] == [m.model_dump() for m in state.messages]
+
+    _run_with_db(database_url, make_battle_service, scenario)
+
+
+def test_legacy_json_messages_are_readable_and_backfilled(database_url, make_battle_service, make_battle_request):
+    from sqlalchemy import update
+
+    from src.models.database import Battle, backfill_battle_messages
+
+    legacy = [{"provider": "grok", "name": "Grok", "content": "old take", "round_number": 1}]
+
+    async def scenario(service):
+        state = await service.create_battle(make_battle_request())
+        async with service._session_factory() as session:
+            await session.execute(update(Battle).where(Battle.id == state.id).values(messages=legacy))
+            await session.commit()
+        service.clear_battles()
+
+        before = await service.get_battle(state.id)
+        assert [m.content for m in before.messages] == ["old take"]
+
+        engine = service._session_factory.kw["bind"]
+        assert await backfill_battle_messages(engine) == 1
+        assert await backfill_battle_messages(engine) == 0
+
+        service.clear_battles()
+        page = await service.list_battles()
+        assert [m.content for m in page.items[0].messages] == ["old take"]
+
+    _run_with_db(database_url, make_battle_service, scenario)
@@ -0,0 +1,76 @@
+"""Tests for sentence/emoji early stopping of streamed turns"""
+
+import asyncio
+
+from src.models.battle import BattleMode, Language, LLMProvider
+from src.services.early_stop import StopController
+
+
+def _feed(controller: StopController, deltas: list[str]) -> str:
+    return "".join(controller.feed(delta) for delta in deltas)
+
+
+def test_text_turns_stop_after_the_requested_sentences():
+    controller = StopController(BattleMode.TEXT, Language.ENGLISH, max_sentences=2)
+    kept = _feed(controller, ["Pi is 3.", "14, roughly. \"Really?!\"", " he asked. Yes", " it is."])
+
+    assert kept == "Pi is 3.14, roughly. \"Really?!\""
+    assert controller.stopped and controller.reason == "sentences"
+    assert controller.feed("more") == ""
+
+
+def test_an_ellipsis_ends_a_sentence_only_before_a_capitalised_word():
+    controller = StopController(BattleMode.TEXT, Language.ENGLISH, max_sentences=2)
+    kept = _feed(controller, ["Well… I think", " so... maybe… ", "not. Honestly…", " ", "It is! Done."])
+
+    assert kept == "Well… I think so... maybe… not. Honestly…"  # Held whitespace is dropped at the cut
+    assert controller.stopped
+
+    undecided = StopController(BattleMode.TEXT, Language.ENGLISH, max_sentences=1)
+    assert _feed(undecided, ["Hmm… ", "I", " see… ", "you"]) == "Hmm… I see… you"
+    assert not undecided.stopped
+
+
+def test_hindi_danda_ends_a_sentence():
+    controller = StopController(BattleMode.TEXT, Language.HINDI, max_sentences=1)
+    assert _feed(controller, ["पानी गीला है। ", "बिल्कुल।"]) == "पानी गीला है।"
+    assert controller.stopped
+
+    english = StopController(BattleMode.TEXT, Language.ENGLISH, max_sentences=1)
+    assert _feed(english, ["पानी गीला है। ", "बिल्कुल।"]) == "पानी गीला है। बिल्कुल।"
+    assert not english.stopped
+
+
+def test_emoji_turns_count_sequences_and_flags_as_one():
+    controller = StopController(BattleMode.EMOJI, Language.ENGLISH, max_emojis=3)
+    family = "👨‍👩‍👧"
+    kept = _feed(controller, [family, " 👍🏽", "🇮🇳", "🔥🔥"])
+
+    assert kept == f"{family} 👍🏽🇮🇳"
+    assert controller.stopped and controller.reason == "emojis"
+
+
+def test_stream_is_closed_at_the_limit_and_savings_recorded(make_battle_service):
+    service = make_battle_service(0, 0, 0)
+    llm = service._llm_service
+    completions = llm._openai_client.chat.completions
+    messages = llm._anthropic_client.messages
+    completions.reply = messages.reply = "One. Two! Three? Four five six seven."
+
+    async def turn(provider: LLMProvider) -> str:
+        deltas = llm.generate_response_stream(
+            provider, "a pirate", "Is water wet?", BattleMode.TEXT, Language.ENGLISH, [], 1,
+        )
+        return "".join([delta async for delta in deltas])
+
+    assert asyncio.run(turn(LLMProvider.OPENAI)) == "One. Two!"
+    assert asyncio.run(turn(LLMProvider.CLAUDE)) == "One. Two!"
+
+    stream = completions.streams[0]
+    assert stream.closed and stream.chunks_read == 2  # "Two! " ends the turn; nothing after it is read
+    assert messages.streams[0].closed
+
+    stops = service.get_early_stop_stats()
+    assert stops["openai"]["turns"] == stops["claude"]["turns"] == 1
+    assert stops["openai"]["tokens_saved"] > 0 and stops["grok"]["turns"] == 0
+    assert service.get_token_usage()["claude"]["output_tokens"] > 0
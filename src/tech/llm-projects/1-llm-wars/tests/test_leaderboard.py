@@ -0,0 +1,133 @@
+"""Tests for the vote-based Elo leaderboard"""
+
+import asyncio
+
+import pytest
+
+from src.models.database import get_engine, get_session_factory, init_db
+from src.services.leaderboard import EloRatings, Leaderboard, rebuild_leaderboard
+
+SEATS = [("openai", "Pirate"), ("claude", "Poet"), ("grok", "Pirate")]
+
+
+def test_votes_move_ratings_and_keep_the_view_sorted():
+    board = Leaderboard(k_factor=32, initial_rating=1000)
+    board.record_vote("claude", SEATS)
+    first_view = board.view()
+    assert board.view() is first_view  # Served from the precomputed view until the next vote
+
+    for _ in range(3):
+        board.record_vote("grok", SEATS)
+    view = board.view()
+
+    assert [entry.provider.value for entry in view.providers] == ["grok", "claude", "openai"]
+    assert sum(entry.rating for entry in view.providers) == pytest.approx(3000, abs=0.2)
+    assert view.providers[0].wins == 3 and view.providers[0].games == 4
+    assert (view.personas[0].provider.value, view.personas[0].persona) == ("grok", "Pirate")
+    assert view.votes == 4 and view is not first_view
+
+
+def test_first_win_between_equals_is_half_the_k_factor():
+    ratings = EloRatings(k_factor=32, initial_rating=1000)
+    ratings.record([("a", "")], [("b", "")])
+
+    assert ratings.get(("a", "")).rating == pytest.approx(1016)
+    assert ratings.get(("b", "")).rating == pytest.approx(984)
+    assert [key for key, _ in ratings.top(1)] == [("a", "")]
+
+
+def test_merge_keeps_the_record_with_more_games():
+    board = Leaderboard(k_factor=32, initial_rating=1000)
+    board.record_vote("claude", SEATS)
+    stale = dict(board.providers.items())
+    ahead = Leaderboard(k_factor=32, initial_rating=1000)
+    for provider in ("claude", "claude", "grok"):
+        ahead.record_vote(provider, SEATS)
+
+    board.merge(dict(ahead.providers.items()))
+    board.merge(stale)  # Arrives late: fewer games than held, so ignored
+
+    assert board.view().providers[0].games == 3 and board.votes == 3
+    assert [(e.provider, e.rating) for e in board.view().providers] == [
+        (e.provider, e.rating) for e in ahead.view().providers
+    ]
+
+
+def test_checkpoint_never_replaces_a_rating_with_more_games(database_url):
+    async def run():
+        engine = get_engine(database_url)
+        await init_db(engine)
+        session_factory = get_session_factory(engine)
+        try:
+            ahead, behind = Leaderboard(), Leaderboard()
+            for provider in ("claude", "grok"):
+                ahead.record_vote(provider, SEATS)
+            behind.record_vote("openai", SEATS)
+            await ahead.checkpoint(session_factory)
+            await behind.checkpoint(session_factory)  # A worker that is behind checkpoints last
+
+            restored = Leaderboard()
+            await restored.load(session_factory)
+            return ahead.view(), restored.view()
+        finally:
+            await engine.dispose()
+
+    ahead, restored = asyncio.run(run())
+
+    assert restored.votes == 2
+    assert [(e.provider, e.rating, e.games) for e in restored.providers] == [
+        (e.provider, e.rating, e.games) for e in ahead.providers
+    ]
+
+
+def test_live_ratings_match_a_rebuild_of_the_votes_table(database_url, make_battle_service, make_battle_request):
+    async def run():
+        engine = get_engine(database_url)
+        await init_db(engine)
+        session_factory = get_session_factory(engine)
+        try:
+            service = make_battle_service(0, 0, 0, session_factory=session_factory)
+            await service.start()
+            state = await service.create_battle(make_battle_request())
+            await service.save_battle(state)
+            # The second vote's battle is unknown, so it has no participants to rate
+            for battle_id, provider in [(state.id, "claude"), ("missing", "grok"), (state.id, "openai")]:
+                await service.save_vote(battle_id, provider)
+            await service._leaderboard.checkpoint(session_factory)
+
+            checkpoint = Leaderboard()
+            await checkpoint.load(session_factory)
+            rebuilt = await rebuild_leaderboard(session_factory)
+            return checkpoint, rebuilt
+        finally:
+            await engine.dispose()
+
+    checkpoint, rebuilt = asyncio.run(run())
+
+    assert checkpoint.votes == rebuilt.votes == 2
+    for live, replayed in ((checkpoint.providers, rebuilt.providers), (checkpoint.personas, rebuilt.personas)):
+        assert sorted(live.items()) == pytest.approx(sorted(replayed.items()))
+
+
+def test_a_leaderboard_error_does_not_lose_the_vote(
+    database_url, make_battle_service, make_battle_request, monkeypatch
+):
+    async def run():
+        engine = get_engine(database_url)
+        await init_db(engine)
+        session_factory = get_session_factory(engine)
+        try:
+            service = make_battle_service(0, 0, 0, session_factory=session_factory)
+            state = await service.create_battle(make_battle_request())
+            await service.save_battle(state)
+
+            def broken(provider, participants):
+                raise ValueError("rating bug")
+
+            monkeypatch.setattr(service._leaderboard, "record_vote", broken)
+            await service.save_vote(state.id, "claude")
+            return await service.get_vote_counts(state.id)
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == {"openai": 0, "claude": 1, "grok": 0}
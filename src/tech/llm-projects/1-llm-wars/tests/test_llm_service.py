@@ -0,0 +1,140 @@
+"""Tests for LLMService and concurrent battle execution"""
+
+import asyncio
+import time
+
+import pytest
+
+PROVIDER_LATENCY = 0.2
+
+
+def test_concurrent_battles_do_not_serialize(make_battle_service, make_battle_request):
+    """Provider I/O must yield the event loop so battles overlap"""
+    service = make_battle_service(PROVIDER_LATENCY, PROVIDER_LATENCY, PROVIDER_LATENCY)
+    battle_count = 5
+    battle_ids = [asyncio.run(service.create_battle(make_battle_request())).id for _ in range(battle_count)]
+
+    async def run_all():
+        return await asyncio.gather(*(service.run_battle(bid) for bid in battle_ids))
+
+    start = time.perf_counter()
+    states = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    per_battle = 3 * PROVIDER_LATENCY
+    assert all(state.status.value == "completed" for state in states)
+    assert all(len(state.messages) == 3 for state in states)
+    # Serialized execution would take battle_count * per_battle (3s here)
+    assert elapsed < per_battle * 2
+
+
+def test_system_prompt_prefix_is_stable_across_rounds():
+    """Only the trailing round instruction may change between turns"""
+    from src.models.battle import BattleMode, Language, LLMProvider
+    from src.services.llm_service import ROUND_INSTRUCTIONS, LLMService
+
+    llm = LLMService()
+    prompts = [
+        llm._build_system_prompt(
+            LLMProvider.CLAUDE, "a pirate", "Is water wet?", BattleMode.EMOJI, Language.ENGLISH, rnd, 3,
+        )
+        for rnd in (1, 2, 3)
+    ]
+
+    assert prompts[0].prefix is prompts[1].prefix is prompts[2].prefix
+    assert [p.round_instruction for p in prompts] == [
+        ROUND_INSTRUCTIONS["opening"], ROUND_INSTRUCTIONS["middle"], ROUND_INSTRUCTIONS["final"],
+    ]
+    assert prompts[2].text.endswith(ROUND_INSTRUCTIONS["final"])
+
+
+def test_short_prefix_is_not_cache_marked():
+    from src.services.llm_service import SystemPrompt, _claude_system_blocks
+
+    system = _claude_system_blocks(SystemPrompt("You are a pigeon.\n", "Open the debate."))
+
+    assert [block.get("cache_control") for block in system] == [None, None]
+
+
+def test_long_prefix_is_cache_marked():
+    from src.services.llm_service import PROMPT_CACHE_MIN_TOKENS, SystemPrompt, _claude_system_blocks
+
+    prefix = "You are a pigeon who only knows about breadcrumbs. " * PROMPT_CACHE_MIN_TOKENS
+    system = _claude_system_blocks(SystemPrompt(prefix, "Open the debate."))
+
+    assert system[0]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in system[1]
+
+
+def test_cached_input_tokens_are_read_from_provider_usage(make_battle_service, make_battle_request):
+    # The fake clients report cached tokens regardless of prompt length; real APIs report 0
+    # for prompts shorter than PROMPT_CACHE_MIN_TOKENS
+    service = make_battle_service(0, 0, 0)
+    battle_id = asyncio.run(service.create_battle(make_battle_request())).id
+    asyncio.run(service.run_battle(battle_id))
+
+    usage = service.get_token_usage()
+    assert usage["claude"] == {"calls": 1, "input_tokens": 10, "cached_input_tokens": 8, "output_tokens": 5}
+    assert usage["openai"]["cached_input_tokens"] == 6
+
+
+def test_token_stream_yields_deltas_then_the_final_message(make_battle_service, make_battle_request):
+    from src.models.battle import BattleEventType
+
+    service = make_battle_service(0, 0, 0)
+    state = asyncio.run(service.create_battle(make_battle_request()))
+
+    async def collect():
+        return [event async for event in service.run_battle_streaming(state.id, stream_tokens=True)]
+
+    events = asyncio.run(collect())
+
+    openai_turn = [(event.type, event.delta, event.content) for event in events[:4]]
+    assert openai_turn == [
+        (BattleEventType.MESSAGE_START, None, None),
+        (BattleEventType.DELTA, "openai ", None),
+        (BattleEventType.DELTA, "reply ", None),
+        (BattleEventType.MESSAGE_END, None, "openai reply "),
+    ]
+    assert [event.provider.value for event in events if event.type == BattleEventType.MESSAGE_END] == [
+        "openai", "claude", "grok",
+    ]
+    assert state.status.value == "completed"
+    assert [m.content for m in state.messages] == ["openai reply ", "claude reply ", "grok reply "]
+
+
+def test_provider_error_mid_stream_fails_the_battle(make_battle_service, make_battle_request):
+    from src.models.battle import BattleEventType
+
+    service = make_battle_service(0, 0, 0)
+    messages = service._llm_service._anthropic_client.messages
+
+    class BrokenStream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+        @property
+        async def text_stream(self):
+            yield "claude "
+            raise RuntimeError("connection reset mid-stream")
+
+    messages.stream = lambda **kwargs: BrokenStream()
+    state = asyncio.run(service.create_battle(make_battle_request()))
+    events = []
+
+    async def collect():
+        async for event in service.run_battle_streaming(state.id, stream_tokens=True):
+            events.append(event)
+
+    with pytest.raises(RuntimeError, match="mid-stream"):
+        asyncio.run(collect())
+
+    # OpenAI's turn completed; Claude's delta reached the viewer but the turn never ended
+    assert [(event.provider.value, event.type) for event in events[-2:]] == [
+        ("claude", BattleEventType.MESSAGE_START), ("claude", BattleEventType.DELTA),
+    ]
+    assert state.status.value == "error" and "mid-stream" in state.error_message
+    assert [m.provider.value for m in state.messages] == ["openai"]
@@ -0,0 +1,78 @@
+"""Tests for the Prometheus metrics registry and instrumentation"""
+
+import asyncio
+
+from src.services.metrics import PROVIDER_REQUEST_SECONDS, TOKENS_TOTAL, Counter, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("op_seconds", "Op latency", ("op",), buckets=(0.1, 1.0)))
+    counter = registry.register(Counter("ops_total", "Ops", ("op",)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, op='say "hi"')
+    counter.inc(op="a")
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE op_seconds histogram" in lines
+    assert 'op_seconds_bucket{op="say \\"hi\\"",le="0.1"} 2' in lines
+    assert 'op_seconds_bucket{op="say \\"hi\\"",le="1"} 3' in lines
+    assert 'op_seconds_bucket{op="say \\"hi\\"",le="+Inf"} 4' in lines
+    assert 'op_seconds_sum{op="say \\"hi\\""} 3.65' in lines
+    assert 'ops_total{op="a"} 1' in lines
+
+
+def test_battle_turns_feed_provider_metrics(make_battle_service, make_battle_request):
+    service = make_battle_service(0, 0, 0)
+    calls_before = PROVIDER_REQUEST_SECONDS.count(provider="claude", model="claude-sonnet-4-20250514", outcome="success")
+    output_before = TOKENS_TOTAL.value(provider="claude", kind="output")
+
+    async def scenario():
+        state = await service.create_battle(make_battle_request(rounds=2))
+        await service.run_battle(state.id)
+
+    asyncio.run(scenario())
+
+    calls = PROVIDER_REQUEST_SECONDS.count(provider="claude", model="claude-sonnet-4-20250514", outcome="success")
+    assert calls - calls_before == 2
+    assert TOKENS_TOTAL.value(provider="claude", kind="output") - output_before == 10
+
+
+def test_health_reports_checks_and_metrics_carry_the_counters(make_battle_service, monkeypatch):
+    from fastapi import Response
+
+    from src import main
+    from src.routes import battle
+
+    service = make_battle_service(0, 0, 0)
+    monkeypatch.setattr(battle, "battle_service", service)
+    response = Response()
+
+    body = asyncio.run(main.health(response))
+    scrape = asyncio.run(main.metrics()).body.decode()
+
+    assert response.status_code == 200
+    assert body == {
+        "status": "healthy",
+        "checks": {"battle_service": "ok", "database": "disabled", "state_backend": "ok", "tracing": "disabled"},
+    }
+    assert 'llm_response_cache_entries{tier="memory"} 0' in scrape.splitlines()
+    assert "leaderboard_votes 0" in scrape.splitlines()
+
+
+def test_health_is_degraded_while_the_shared_backend_is_disconnected(make_battle_service, monkeypatch):
+    from fastapi import Response
+
+    from src import main
+    from src.routes import battle
+
+    service = make_battle_service(0, 0, 0)
+    monkeypatch.setattr(type(service._state_backend), "connected", property(lambda self: False))
+    monkeypatch.setattr(battle, "battle_service", service)
+    response = Response()
+
+    body = asyncio.run(main.health(response))
+
+    assert response.status_code == 503
+    assert body["status"] == "degraded" and body["checks"]["state_backend"] == "down"
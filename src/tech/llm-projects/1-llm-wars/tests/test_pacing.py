@@ -0,0 +1,74 @@
+"""Tests for the generate-ahead delivery scheduler"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.models.battle import BattleMessage, LLMProvider
+from src.services.pacing import DeliveryScheduler
+
+TURN_LATENCY = 0.1
+
+
+async def _turns(count: int, fail_after: int | None = None):
+    for i in range(count):
+        if fail_after is not None and i == fail_after:
+            raise RuntimeError("provider exploded")
+        await asyncio.sleep(TURN_LATENCY)
+        yield BattleMessage(provider=LLMProvider.OPENAI, name="OpenAI", content=f"turn {i}", round_number=1)
+
+
+async def _collect(scheduler: DeliveryScheduler, source) -> tuple[list, float]:
+    start = time.perf_counter()
+    items = [item async for item in scheduler.deliver(source)]
+    return items, time.perf_counter() - start
+
+
+def test_zero_pace_delivers_as_generated():
+    items, elapsed = asyncio.run(_collect(DeliveryScheduler(pace_seconds=0), _turns(3)))
+
+    assert [item.content for item in items] == ["turn 0", "turn 1", "turn 2"]
+    assert elapsed < 3 * TURN_LATENCY + 0.1
+
+
+def test_next_turn_is_generated_while_current_is_shown():
+    pace = 0.2
+    items, elapsed = asyncio.run(_collect(DeliveryScheduler(pace_seconds=pace), _turns(3)))
+
+    assert len(items) == 3
+    # Generating then sleeping one turn at a time would take 3 * 0.1 + 2 * 0.2 = 0.7s
+    assert elapsed < TURN_LATENCY + 2 * pace + 0.1
+
+
+@pytest.mark.parametrize("generate_ahead", [1, 2])
+def test_generation_runs_at_most_generate_ahead_turns_ahead(generate_ahead):
+    started = 0
+    delivered = 0
+    most_in_flight = 0
+
+    async def counted_turns(count: int):
+        nonlocal started, most_in_flight
+        for i in range(count):
+            started += 1
+            most_in_flight = max(most_in_flight, started - delivered)
+            await asyncio.sleep(0.01)
+            yield BattleMessage(provider=LLMProvider.OPENAI, name="OpenAI", content=f"turn {i}", round_number=1)
+
+    async def run():
+        nonlocal delivered
+        async for _ in DeliveryScheduler(pace_seconds=0.05, generate_ahead=generate_ahead).deliver(counted_turns(5)):
+            delivered += 1
+
+    asyncio.run(run())
+
+    assert delivered == 5
+    assert most_in_flight == generate_ahead
+
+
+def test_generation_errors_reach_the_viewer():
+    async def run():
+        return await _collect(DeliveryScheduler(pace_seconds=0), _turns(3, fail_after=1))
+
+    with pytest.raises(RuntimeError, match="provider exploded"):
+        asyncio.run(run())
@@ -0,0 +1,48 @@
+"""Tests for the shared persona and topic registry"""
+
+import json
+import os
+
+from src.services.persona_registry import PersonaRegistry, get_persona_registry
+
+
+def _write(directory, personas, topics) -> None:
+    for name, data in (("personas.json", personas), ("topics.json", topics)):
+        path = directory / name
+        previous = path.stat().st_mtime_ns if path.exists() else 0
+        path.write_text(json.dumps(data))
+        # Make sure the mtime moves even on filesystems with coarse timestamps
+        os.utime(path, ns=(previous + 1_000_000_000, previous + 1_000_000_000))
+
+
+def _persona(persona_id: str, world: str = "") -> dict:
+    return {"id": persona_id, "label": persona_id.title(), "description": f"A {persona_id}", "world": world}
+
+
+def test_shared_personas_are_indexed_by_id_label_and_description():
+    registry = get_persona_registry()
+    snapshot = registry.snapshot()
+    first = snapshot.personas[0]
+
+    assert registry.persona(first.id) is registry.persona(first.label) is registry.persona(first.description)
+    assert registry.world(first.description) == first.world
+    assert registry.world("Some custom persona") == ""
+    assert snapshot.presets and all(len(preset["personas"]) == 3 for preset in snapshot.presets)
+    assert first.prompt_line in snapshot.persona_prompt
+
+
+def test_registry_reloads_when_files_change(tmp_path):
+    _write(tmp_path, [_persona("pirate", "ships")], [])
+    registry = PersonaRegistry(tmp_path, check_interval_seconds=0)
+    assert registry.world("A pirate") == "ships" and registry.version == 1
+    assert registry.snapshot() is registry.snapshot()  # Unchanged files are not re-parsed
+
+    personas = [_persona("pirate", "treasure"), _persona("a", "x"), _persona("b"), _persona("c")]
+    _write(tmp_path, personas, [{"id": "t", "topic": "Tea?", "characters": ["a", "b", "c"]}])
+    assert registry.world("pirate") == "treasure" and registry.version == 2
+    assert [preset["topic"] for preset in registry.snapshot().presets] == ["Tea?"]
+
+    (tmp_path / "personas.json").write_text("{not json")
+    os.utime(tmp_path / "personas.json", ns=(1, 1))
+    assert registry.world("A pirate") == "treasure"  # A broken edit keeps the last good snapshot
+    assert registry.stats()["reload_errors"] == 1
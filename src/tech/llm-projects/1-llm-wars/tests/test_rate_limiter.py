@@ -0,0 +1,104 @@
+"""Tests for the per-provider request scheduler"""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from src.services.rate_limiter import ProviderOverloadedError, ProviderScheduler
+
+
+def _rate_limit_error(retry_after_ms: str = "10") -> openai.RateLimitError:
+    response = httpx.Response(
+        429, headers={"retry-after-ms": retry_after_ms}, request=httpx.Request("POST", "https://api.test")
+    )
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def test_rate_limit_is_retried_after_the_requested_delay():
+    scheduler = ProviderScheduler("openai", max_retries=3)
+    attempts = []
+
+    async def call():
+        attempts.append(asyncio.get_running_loop().time())
+        if len(attempts) < 3:
+            raise _rate_limit_error()
+        return "ok"
+
+    assert asyncio.run(scheduler.run(call, estimated_tokens=10)) == "ok"
+    assert attempts[2] - attempts[0] >= 0.02
+    assert scheduler.stats()["retries"] == 2
+    assert scheduler.stats()["failures"] == 0
+
+
+def test_non_retryable_errors_and_exhausted_retries_fail():
+    scheduler = ProviderScheduler("openai", max_retries=1)
+
+    async def bad_request():
+        raise ValueError("bad request")
+
+    async def always_limited():
+        raise _rate_limit_error("1")
+
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(bad_request, estimated_tokens=10))
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(scheduler.run(always_limited, estimated_tokens=10))
+    assert scheduler.stats()["failures"] == 2
+    assert scheduler.stats()["retries"] == 1
+
+
+def test_token_budget_and_concurrency_are_enforced():
+    scheduler = ProviderScheduler("claude", tokens_per_minute=600, max_concurrency=1)
+    running = 0
+    peak = 0
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def scenario():
+        # 600 tokens/min refills 10/s: the third request waits ~0.1s for one token
+        await asyncio.gather(*(scheduler.run(call, tokens) for tokens in (300, 300, 1)))
+
+    asyncio.run(scenario())
+
+    assert peak == 1
+    assert scheduler.stats()["wait_seconds_max"] >= 0.08
+
+
+def test_full_queue_rejects_new_requests():
+    scheduler = ProviderScheduler("grok", max_concurrency=1, max_queue_depth=1)
+
+    async def call():
+        await asyncio.sleep(0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(scheduler.run(call, 1) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert isinstance(results[2], ProviderOverloadedError)
+    assert scheduler.stats()["rejected"] == 1
+
+
+def test_stream_is_not_retried_after_the_first_item():
+    scheduler = ProviderScheduler("openai", max_retries=3)
+    opened = 0
+
+    async def open_stream():
+        nonlocal opened
+        opened += 1
+        yield "hello"
+        raise _rate_limit_error()
+
+    async def consume():
+        return [item async for item in scheduler.stream(open_stream, 10)]
+
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(consume())
+    assert opened == 1
@@ -0,0 +1,134 @@
+"""Tests for deadlines, hedged requests and provider fallback"""
+
+import asyncio
+
+import pytest
+
+from src.models.battle import BattleMode, CacheMode, Language, LLMProvider
+from src.services.rate_limiter import ProviderScheduler
+from src.services.resilience import CircuitBreaker, LatencyTracker, hedged
+
+
+def test_hedge_returns_the_faster_duplicate():
+    latencies = [0.5, 0.01]
+    started = []
+
+    async def call():
+        latency = latencies[len(started)]
+        started.append(latency)
+        await asyncio.sleep(latency)
+        return latency
+
+    assert asyncio.run(hedged(call, hedge_after=0.02)) == 0.01
+    assert started == [0.5, 0.01]
+
+
+def test_no_hedge_is_sent_when_it_would_only_queue():
+    started = []
+
+    async def call():
+        started.append(len(started))
+        await asyncio.sleep(0.03)
+        return len(started)
+
+    assert asyncio.run(hedged(call, hedge_after=0.01, can_hedge=lambda: False)) == 1
+    assert started == [0]
+
+
+def test_latency_quantile_needs_min_samples():
+    tracker = LatencyTracker(min_samples=10)
+    for ms in range(1, 10):
+        tracker.record(ms / 1000)
+    assert tracker.quantile(0.95) is None
+
+    tracker.record(0.1)
+    assert tracker.quantile(0.95) == 0.1
+
+
+def _generate(llm, provider=LLMProvider.CLAUDE):
+    return llm.generate_response(provider, "a pirate", "Is water wet?", BattleMode.TEXT, Language.ENGLISH, [], 1, 1)
+
+
+def test_stuck_provider_hits_the_deadline(make_battle_service):
+    llm = make_battle_service(0, 10, 0)._llm_service
+    llm._call_deadline = 0.05
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(_generate(llm))
+
+
+def test_provider_latency_excludes_the_queue_wait(make_battle_service):
+    llm = make_battle_service(0, 0.05, 0)._llm_service
+    llm._schedulers[LLMProvider.CLAUDE] = ProviderScheduler("claude", max_concurrency=1)
+    tracker = llm._latency[LLMProvider.CLAUDE] = LatencyTracker(min_samples=2)
+
+    async def scenario():
+        await asyncio.gather(_generate(llm), _generate(llm))  # The second waits ~50ms for a slot
+
+    asyncio.run(scenario())
+
+    assert tracker.quantile(1.0) < 0.09
+
+
+def test_hedge_loser_is_not_counted(make_battle_service):
+    llm = make_battle_service(0.05, 0, 0)._llm_service
+    llm._hedge_requests = True
+    llm._latency[LLMProvider.OPENAI] = LatencyTracker(min_samples=1)
+    llm._latency[LLMProvider.OPENAI].record(0.0)  # p95 of 0: hedge right away
+
+    assert asyncio.run(_generate(llm, LLMProvider.OPENAI)) == "openai reply"
+    assert len(llm._openai_client.chat.completions.calls) == 2
+    assert llm.get_usage_stats()["openai"]["calls"] == 1
+
+
+def test_failing_provider_falls_back_and_opens_the_breaker(make_battle_service):
+    llm = make_battle_service(0, 10, 0)._llm_service
+    llm._call_deadline = 0.02
+    llm._fallbacks = {LLMProvider.CLAUDE: (LLMProvider.OPENAI, "gpt-4o-mini")}
+    llm._breakers[LLMProvider.CLAUDE] = CircuitBreaker(failure_threshold=2, cooldown_seconds=60)
+    claude_calls = llm._anthropic_client.messages.calls
+    openai_calls = llm._openai_client.chat.completions.calls
+
+    async def scenario():
+        return [await _generate(llm) for _ in range(3)]
+
+    replies = asyncio.run(scenario())
+
+    assert replies == ["openai reply"] * 3
+    # The third turn skips Claude entirely because the breaker is open
+    assert len(claude_calls) == 2
+    assert [call["model"] for call in openai_calls] == ["gpt-4o-mini"] * 3
+
+
+async def _stream(llm, provider=LLMProvider.CLAUDE, cache_mode=CacheMode.FRESH) -> str:
+    deltas = llm.generate_response_stream(
+        provider, "a pirate", "Is water wet?", BattleMode.TEXT, Language.ENGLISH, [], 1, 1, cache_mode,
+    )
+    return "".join([delta async for delta in deltas])
+
+
+def test_stuck_stream_hits_the_deadline_and_falls_back(make_battle_service):
+    llm = make_battle_service(0, 10, 0)._llm_service
+    llm._call_deadline = 0.05
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(_stream(llm))
+
+    llm._fallbacks = {LLMProvider.CLAUDE: (LLMProvider.OPENAI, "gpt-4o-mini")}
+    assert asyncio.run(_stream(llm)) == "openai reply "
+
+
+def test_fallback_replies_are_not_cached_as_the_primary(make_battle_service):
+    llm = make_battle_service(0, 10, 0)._llm_service
+    llm._call_deadline = 0.02
+    llm._fallbacks = {LLMProvider.CLAUDE: (LLMProvider.OPENAI, "gpt-4o-mini")}
+
+    async def scenario():
+        await _generate(llm)
+        await _stream(llm, cache_mode=CacheMode.CACHED)
+        llm._anthropic_client.messages.latency = 0
+        llm._breakers[LLMProvider.CLAUDE] = CircuitBreaker(3, 60)
+        return await _stream(llm, cache_mode=CacheMode.CACHED)
+
+    assert asyncio.run(scenario()) == "claude reply "  # Not the fallback's reply from the cache
+    assert llm.get_cache_stats()["memory_hits"] == 0
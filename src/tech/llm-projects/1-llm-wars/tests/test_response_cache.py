@@ -0,0 +1,74 @@
+"""Tests for the content-addressed LLM response cache"""
+
+import asyncio
+
+from src.models.battle import BattleMode, CacheMode, Language, LLMProvider
+from src.services.response_cache import ResponseCache, cache_key
+
+
+def test_disk_tier_survives_restart_and_evicts_least_recently_used(tmp_path):
+    keys = [cache_key("openai", "gpt-4o", "system", [{"role": "user", "content": str(i)}], {}) for i in range(3)]
+
+    async def scenario():
+        cache = ResponseCache(tmp_path, memory_max_entries=1, disk_max_bytes=10_000)
+        for key in keys:
+            await cache.put(key, "reply " + key[:4])
+
+        restarted = ResponseCache(tmp_path, memory_max_entries=1, disk_max_bytes=10_000)
+        first = await restarted.get(keys[0])
+        entry_bytes = restarted.stats()["disk_bytes"] // 3
+
+        bounded = ResponseCache(tmp_path, memory_max_entries=1, disk_max_bytes=entry_bytes * 3)
+        await bounded.get(keys[0])  # Now most recently used on disk
+        await bounded.put(cache_key("grok", "grok-3", "system", [], {}), "x" * 10)
+        return first, restarted.stats(), bounded, entry_bytes
+
+    first, stats, bounded, entry_bytes = asyncio.run(scenario())
+
+    assert first == "reply " + keys[0][:4]
+    assert stats["disk_hits"] == 1
+    remaining = {path.stem for path in tmp_path.glob("*.json")}
+    # Writes in the same mtime tick may tie, so either of the two older entries can go
+    assert keys[0] in remaining and len(remaining & set(keys)) == 2
+    assert bounded.stats()["disk_bytes"] <= entry_bytes * 3
+
+
+def test_cached_battle_replays_without_provider_calls(make_battle_service, make_battle_request):
+    service = make_battle_service(0, 0, 0)
+    openai_calls = service._llm_service._openai_client.chat.completions.calls
+
+    def run(cache_mode: CacheMode) -> list[str]:
+        async def scenario():
+            state = await service.create_battle(make_battle_request(rounds=2, cache_mode=cache_mode))
+            state = await service.run_battle(state.id)
+            return [message.content for message in state.messages]
+
+        return asyncio.run(scenario())
+
+    run(CacheMode.FRESH)
+    assert service.get_cache_stats()["memory_size"] == 0  # Fresh turns are not written by default
+
+    first = run(CacheMode.CACHED)
+    calls_after_first = len(openai_calls)
+    replay = run(CacheMode.CACHED)
+
+    assert replay == first
+    assert len(openai_calls) == calls_after_first == 4
+    assert service.get_cache_stats()["memory_hits"] == 6
+
+
+def test_streamed_turns_are_cached_apart_from_full_replies(make_battle_service):
+    llm = make_battle_service(0, 0, 0)._llm_service
+    llm._openai_client.chat.completions.reply = "One. Two. Three."
+    turn = (LLMProvider.OPENAI, "a pirate", "Is water wet?", BattleMode.TEXT, Language.ENGLISH, [], 1, 1, CacheMode.CACHED)
+
+    async def scenario():
+        streamed = "".join([delta async for delta in llm.generate_response_stream(*turn)])
+        full = await llm.generate_response(*turn)
+        return streamed, full, "".join([delta async for delta in llm.generate_response_stream(*turn)])
+
+    streamed, full, replayed = asyncio.run(scenario())
+
+    assert streamed == replayed == "One. Two."  # Cut by the stop policy, and replayed as such
+    assert full == "One. Two. Three."  # Not the early-stopped stream
+    assert llm.get_cache_stats()["memory_hits"] == 1
@@ -0,0 +1,95 @@
+"""Tests for the pre-generated surprise config pool"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+
+def _config(topic: str) -> str:
+    return json.dumps({"topic": topic, "personas": {"openai": "Angry founder", "claude": "Calm HR", "grok": "Roman general"}})
+
+
+class ScriptedCompletions:
+    """Returns queued replies in order; raises `error` once they run out"""
+
+    def __init__(self, replies: list[str], error: Exception | None = None) -> None:
+        self.replies = list(replies)
+        self.error = error or RuntimeError("provider down")
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if not self.replies:
+            raise self.error
+        content = self.replies.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class AuthError(Exception):
+    status_code = 401
+
+
+def _service(replies: list[str], pool_size: int = 2, error: Exception | None = None):
+    from src.services.surprise_service import SurpriseService
+
+    service = SurpriseService(pool_size=pool_size, refill_concurrency=2)
+    completions = ScriptedCompletions(replies, error)
+    service._llm._openai_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return service, completions
+
+
+def test_pool_skips_invalid_and_duplicate_configs_and_serves_without_a_call():
+    replies = [_config("Hi"), _config("hi"), "not json", _config(""), _config("Okay")]
+    service, completions = _service(replies)
+    service.REFILL_RETRY_SECONDS = 0
+
+    async def scenario():
+        service.start()
+        for _ in range(50):
+            if len(service._pool) == 2:
+                break
+            await asyncio.sleep(0.01)
+        calls_before = completions.calls
+        served = [await service.generate_surprise() for _ in range(2)]
+        await service.aclose()
+        return served, calls_before
+
+    served, calls_before = asyncio.run(scenario())
+
+    assert [config["topic"] for config in served] == ["Hi", "Okay"]
+    assert calls_before == completions.calls == 5
+    # Refills share the battle turns' OpenAI rate limiter
+    assert service._llm.get_scheduler_stats()["openai"]["requests"] == 5
+
+
+def test_refiller_stops_when_the_api_key_is_rejected():
+    service, completions = _service([_config("Hi")], error=AuthError("invalid api key"))
+    service.REFILL_RETRY_SECONDS = 0
+
+    async def scenario():
+        service.start()
+        await asyncio.wait_for(service._refill_task, timeout=1)
+        return len(service._pool)
+
+    assert asyncio.run(scenario()) == 1
+    assert completions.calls == 2  # The first batch: one config, then the 401 ends the refiller
+
+
+def test_refiller_is_not_started_without_an_api_key(monkeypatch):
+    service, completions = _service([_config("Hi")])
+    monkeypatch.setattr(service._settings, "openai_api_key", "")
+
+    service.start()
+
+    assert service._refill_task is None and completions.calls == 0
+
+
+def test_empty_pool_falls_back_to_live_call_then_preset():
+    service, _ = _service([_config("WiFi is slow")], pool_size=0)
+
+    live = asyncio.run(service.generate_surprise())
+    preset = asyncio.run(service.generate_surprise())
+
+    assert live["topic"] == "WiFi is slow"
+    assert preset["topic"] in {p["topic"] for p in service._personas.snapshot().presets}
+    assert all(p["persona"] for p in preset["personas"])
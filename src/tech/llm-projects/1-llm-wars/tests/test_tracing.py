@@ -0,0 +1,91 @@
+"""Tests for the background Galileo trace exporter"""
+
+import asyncio
+import time
+
+from src.services import tracing
+from src.services.tracing import TraceExporter, TraceRecord
+
+
+class SlowLogger:
+    """Galileo logger stand-in whose flush takes a while"""
+
+    def __init__(self) -> None:
+        self.traces: list[str] = []
+        self.sessions: list[str] = []
+        self.flushes = 0
+
+    def start_session(self, name):
+        self.sessions.append(name)
+        return f"id-{name}"
+
+    def set_session(self, session_id):
+        pass
+
+    def clear_session(self):
+        pass
+
+    def start_trace(self, name, input):
+        self.traces.append(input)
+
+    def add_llm_span(self, **kwargs):
+        pass
+
+    def conclude(self, output):
+        pass
+
+    def flush(self):
+        time.sleep(0.2)
+        self.flushes += 1
+
+
+def _trace(i: int, session: str | None = "Battle 1") -> TraceRecord:
+    return TraceRecord(session=session, name="turn", input=str(i), output="reply")
+
+
+def test_disabled_exporter_queues_nothing():
+    exporter = TraceExporter(enabled=False)
+    exporter.record(_trace(1))
+    assert exporter.stats()["queued"] == 0
+
+
+def test_full_queue_drops_oldest():
+    exporter = TraceExporter(enabled=True, max_queue=2, batch_size=10)
+    for i in range(3):
+        exporter.record(_trace(i))
+    assert [t.input for t in exporter._queue] == ["1", "2"]
+    assert exporter.stats()["dropped"] == 1
+
+
+def test_sampling_keeps_or_drops_whole_battles():
+    exporter = TraceExporter(enabled=True, sample_rate=0.5, max_queue=10_000)
+    for battle in range(200):
+        for turn in range(3):
+            exporter.record(_trace(turn, session=f"Battle {battle}"))
+    kept = len(exporter._queue)
+    assert kept % 3 == 0 and 0 < kept < 600
+
+
+def test_slow_export_does_not_block_the_event_loop(monkeypatch):
+    logger = SlowLogger()
+    monkeypatch.setattr(tracing, "_galileo_logger", lambda: logger)
+    exporter = TraceExporter(enabled=True, batch_size=2, flush_interval_seconds=0.01)
+
+    async def scenario():
+        exporter.start()
+        for i in range(4):
+            exporter.record(_trace(i))
+        # The loop keeps ticking while the worker thread flushes
+        start = asyncio.get_running_loop().time()
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+        ticked = asyncio.get_running_loop().time() - start
+        await exporter.aclose()
+        return ticked
+
+    ticked = asyncio.run(scenario())
+
+    assert ticked < 0.15
+    assert logger.traces == ["0", "1", "2", "3"]
+    assert logger.sessions == ["Battle 1"]
+    assert exporter.stats()["exported"] == 4